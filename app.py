@@ -1,6 +1,11 @@
 #!/usr/bin/env python3
 
-from faster_whisper import WhisperModel
+from faster_whisper import BatchedInferencePipeline, CompactSegments, StreamingInferencePipeline
+from faster_whisper.autotune import load_profile
+from faster_whisper.compact import CompactSegmentsBuilder
+from faster_whisper.metrics import JobMetrics, ResourceSampler
+from faster_whisper.model_pool import configure_default_pool, get_memory_budget_mb, get_model
+from faster_whisper.threads import get_cpu_budget
 import os
 import sys
 from datetime import datetime
@@ -353,7 +358,7 @@ def show_system_info():
     print("\n💻 시스템 정보")
     print("-" * 40)
     print(f"OS: {platform.system()} {platform.release()}")
-    print(f"CPU: {psutil.cpu_count(logical=False)}코어 / {psutil.cpu_count()}스레드")
+    print(f"CPU: {psutil.cpu_count(logical=False)}코어 / {psutil.cpu_count()}스레드 (사용 가능: {get_cpu_budget()}개)")
     
     memory = psutil.virtual_memory()
     print(f"RAM: {memory.total / (1024**3):.1f}GB (사용가능: {memory.available / (1024**3):.1f}GB)")
@@ -379,34 +384,35 @@ def show_system_info():
     print("-" * 40)
 
 def monitor_resources():
-    """자원 사용량 모니터링"""
-    process = psutil.Process()
+    """자원 사용량 모니터링 (백그라운드 스레드에서 1초마다 RSS/CPU 샘플링)"""
+    sampler = ResourceSampler(interval=1.0).start()
     
     # 시작 시점 정보
-    initial_memory = process.memory_info().rss / (1024**2)  # MB
-    initial_cpu = psutil.cpu_percent()
+    sample = sampler.sample()
+    initial_memory = sample.rss / (1024**2)  # MB
     
-    print(f"📊 시작 시점 - 메모리: {initial_memory:.1f}MB, CPU: {initial_cpu:.1f}%")
+    print(f"📊 시작 시점 - 메모리: {initial_memory:.1f}MB")
     
-    return process
+    return sampler
 
-def show_resource_usage(process, stage=""):
-    """현재 자원 사용량 표시"""
+def show_resource_usage(sampler, stage=""):
+    """현재 자원 사용량 표시 (샘플러의 최근 값 사용)"""
     try:
-        memory_mb = process.memory_info().rss / (1024**2)
-        cpu_percent = process.cpu_percent()
+        sample = sampler.latest or sampler.sample()
+        memory_mb = sample.rss / (1024**2)
+        cpu_percent = sample.cpu_percent
         
-        # 시스템 전체 정보
+        # 시스템 전체 정보 (CPU는 마지막 호출 이후 평균, 대기 없음)
         system_memory = psutil.virtual_memory()
         system_cpu = psutil.cpu_percent()
         
         print(f"📊 {stage} - 프로세스: {memory_mb:.1f}MB, {cpu_percent:.1f}% CPU")
         print(f"   시스템: {system_memory.percent:.1f}% RAM, {system_cpu:.1f}% CPU")
         
-        # GPU 메모리 정보
+        # GPU 메모리 정보 (이미 로드된 경우에만, torch import로 멈추지 않도록)
         try:
-            import torch
-            if torch.cuda.is_available():
+            torch = sys.modules.get("torch")
+            if torch is not None and torch.cuda.is_available():
                 for i in range(torch.cuda.device_count()):
                     memory_allocated = torch.cuda.memory_allocated(i) / (1024**3)
                     memory_cached = torch.cuda.memory_reserved(i) / (1024**3)
@@ -419,6 +425,20 @@ def show_resource_usage(process, stage=""):
     except Exception as e:
         print(f"⚠️ 자원 모니터링 오류: {e}")
 
+def show_transcription_progress(progress):
+    """전사 진행률, 실시간 배율(RTF), 예상 남은 시간 표시"""
+    if progress.fraction is not None:
+        status = f"{progress.fraction * 100:5.1f}% ({progress.processed:.0f}s/{progress.total:.0f}s)"
+    else:
+        status = f"{progress.processed:.0f}s 처리"
+    if progress.real_time_factor is not None:
+        status += f" | RTF: {progress.real_time_factor:.2f}"
+    if progress.num_fallbacks:
+        status += f" | 폴백: {progress.num_fallbacks}회"
+    if progress.eta is not None:
+        status += f" | 남은 시간: 약 {progress.eta:.0f}초"
+    print(f"📊 진행 상황: {status}")
+
 def complete_transcription_and_minutes():
     """완전한 STT + 표 형식 회의록 생성"""
     
@@ -429,7 +449,7 @@ def complete_transcription_and_minutes():
     show_system_info()
     
     # 자원 모니터링 시작
-    process = monitor_resources()
+    sampler = monitor_resources()
     
     # 터미널에서 바로 드래그 받기
     print("Drag audio file to terminal:")
@@ -485,6 +505,9 @@ def complete_transcription_and_minutes():
     
     print("=== 음성 전사 및 회의록 생성 ===")
     
+    # 단계별 소요 시간 및 자원 사용량 기록 (작업별 JSON + Prometheus textfile)
+    metrics = JobMetrics(base_name, sampler, labels=dict(app="app"))
+    
     # Check if file is already a text file (STT result)
     if audio_file.endswith('.txt') and 'STT' in os.path.basename(audio_file):
         print("📄 기존 STT 파일을 사용합니다...")
@@ -523,7 +546,8 @@ def complete_transcription_and_minutes():
         print(f"✅ {len(segments)}개 문장 로드 완료")
     else:
         print("🔄 Large-v3 모델로 고품질 전사 시작...")
-        show_resource_usage(process, "모델 로드 전")
+        show_resource_usage(sampler, "모델 로드 전")
+        metrics.start_stage("model_load")
         
         # Large 모델로 최고 품질 GPU 가속
         gpu_success = False
@@ -544,11 +568,32 @@ def complete_transcription_and_minutes():
             
         print(f"🔧 GPU 사용 설정: {'활성화' if use_gpu else '비활성화'}")
         
+        # 상주 모델 메모리 예산 (STT_MODEL_MEMORY_MB, 기본: 시스템 메모리의 절반)
+        # GPU 로드 실패 후 CPU 모델을 올리는 경우 등 예산을 넘으면 오래된 모델부터 해제
+        memory_budget_mb = get_memory_budget_mb()
+        if memory_budget_mb is None:
+            memory_budget_mb = psutil.virtual_memory().total / (1024 * 1024) / 2
+        configure_default_pool(memory_budget_mb)
+        print(f"💾 모델 메모리 예산: {memory_budget_mb:.0f}MB")
+        
+        # 자동 튜닝 프로필 (python -m faster_whisper.autotune, STT_PROFILE 경로)이 있으면 그 설정 사용
+        profile = None
+        model_name = "large-v3"
+        
         if use_gpu:
             try:
+                profile = load_profile(device="cuda")
+                if profile is not None:
+                    model_name = profile.model
+                    print(f"🎛️ 자동 튜닝 프로필 사용: {profile.name} (RTF {profile.rtf:.2f}, CER {profile.cer:.1%})")
                 print(f"🚀 GPU 가속 사용 ({gpu_name})")
-                print("📥 Large-v3 모델을 GPU로 로딩 중...")
-                model = WhisperModel("large-v3", device="cuda", compute_type="float16")
+                print(f"📥 {model_name} 모델을 GPU로 로딩 중...")
+                # 프로세스당 한 번만 로드 (워밍업 포함, 이후 파일은 상주 모델 재사용)
+                model = get_model(
+                    model_name,
+                    device="cuda",
+                    compute_type=profile.compute_type if profile is not None else "float16"
+                )
                 gpu_success = True
                 print("✅ GPU 모델 로드 성공!")
                 
@@ -563,25 +608,33 @@ def complete_transcription_and_minutes():
         
         # GPU를 사용할 수 없거나 실패한 경우 CPU 모드로 fallback
         if not use_gpu or not gpu_success:
-            print("🖥️ CPU 모드 사용 (Large-v3 모델)")
-            
-            # Large 모델 사용하되 시스템 보호 설정 적용
-            cpu_count = psutil.cpu_count(logical=False)  # 물리 코어 수
-            max_workers = max(1, min(4, cpu_count // 2))  # 물리 코어의 절반만 사용
+            profile = load_profile(device="cpu")
+            model_name = profile.model if profile is not None else "large-v3"
+            if profile is not None:
+                print(f"🎛️ 자동 튜닝 프로필 사용: {profile.name} (RTF {profile.rtf:.2f}, CER {profile.cer:.1%})")
+            print(f"🖥️ CPU 모드 사용 ({model_name} 모델)")
             
-            print(f"🔧 Large-v3 모델 로드 중... (워커: {max_workers}개, CPU 제한)")
-            model = WhisperModel(
-                "large-v3", 
+            # 파일을 하나씩 전사하므로 워커 1개에 CPU 예산(컨테이너 CPU 쿼터/affinity 반영) 전체를 할당
+            # (CTranslate2와 FFT 스레드 수는 모델 생성 시 같은 예산에서 자동 배분, VAD는 1 스레드)
+            print(f"🔧 {model_name} 모델 로드 중...")
+            model = get_model(
+                model_name, 
                 device="cpu", 
-                compute_type="int8",
-                num_workers=max_workers
+                compute_type=profile.compute_type if profile is not None else "int8"
             )
-        show_resource_usage(process, "모델 로드 완료")
+            thread_plan = model.thread_plan
+            print(f"🧵 스레드 계획: CPU 예산 {thread_plan.cpu_budget}개 → "
+                  f"CTranslate2 {thread_plan.intra_threads}x{thread_plan.inter_threads}, "
+                  f"FFT {thread_plan.fft_workers}")
+        show_resource_usage(sampler, "모델 로드 완료")
+        
+        # 스트리밍 전사는 오디오 디코딩과 전사가 겹치므로 하나의 단계로 기록
+        metrics.start_stage("stt")
         
         if gpu_success:
-            print("🎤 GPU 가속 전사 시작... (Large-v3 모델)")
+            print(f"🎤 GPU 가속 전사 시작... ({model_name} 모델)")
         else:
-            print("🎤 CPU 전사 시작... (Large-v3 모델, 시스템 보호 설정)")
+            print(f"🎤 CPU 전사 시작... ({model_name} 모델)")
         
         # 실시간 진행 상태 표시
         print("📊 전사 진행 중... (세그먼트별로 실시간 표시됩니다)")
@@ -590,9 +643,17 @@ def complete_transcription_and_minutes():
         segment_count = 0
         start_time = datetime.now()
         
-        segments, info = model.transcribe(
+        # 긴 회의 녹음도 첫 구간만 디코딩되면 바로 세그먼트가 표시되도록 구간 단위로 전사
+        # (프로필이 배치 모드를 선택한 경우 VAD 구간을 배치로 전사)
+        if profile is not None and profile.batched:
+            pipeline = BatchedInferencePipeline(model)
+            pipeline_options = dict(batch_size=profile.batch_size)
+        else:
+            pipeline = StreamingInferencePipeline(model)
+            pipeline_options = {}
+        segments, info = pipeline.transcribe(
             audio_file,
-            beam_size=3,                    # 정확도와 속도 균형 (5→3)
+            beam_size=profile.beam_size if profile is not None else 3,  # 정확도와 속도 균형 (5→3)
             language="ko",                  # 한국어 설정
             vad_filter=True,               # 음성 활동 감지
             vad_parameters=dict(min_silence_duration_ms=500),  # VAD 세부 설정
@@ -600,18 +661,18 @@ def complete_transcription_and_minutes():
             compression_ratio_threshold=2.4,  # 더 엄격한 압축 임계값
             no_speech_threshold=0.6,       # 더 엄격한 무음 임계값
             condition_on_previous_text=False,  # 이전 텍스트에 의존하지 않음
-            initial_prompt="한국어 회의 내용입니다. 정확한 전사가 필요합니다."
+            initial_prompt="한국어 회의 내용입니다. 정확한 전사가 필요합니다.",
+            progress_callback=show_transcription_progress,  # 진행률 및 예상 남은 시간 표시
+            **pipeline_options
         )
         
         # 실시간 세그먼트 처리 및 진행 표시
         print("📝 전사 결과 처리 중...")
-        segments_list = []
+        # 긴 회의의 세그먼트를 객체 대신 NumPy 배열로 보관 (메모리/GC 부담 감소)
+        segments_builder = CompactSegmentsBuilder()
         
         for i, segment in enumerate(segments):
-            segments_list.append(segment)
-            
-            # 실시간 진행 표시 (GPU 사용률 포함)
-            elapsed = (datetime.now() - start_time).total_seconds()
+            segments_builder.append(segment)
             
             # GPU 메모리 사용량 표시 (10개마다)
             gpu_info = ""
@@ -624,17 +685,15 @@ def complete_transcription_and_minutes():
                     pass
             
             print(f"✅ [{i+1:3d}] [{segment.start:6.1f}s → {segment.end:6.1f}s] {segment.text.strip()[:50]}{'...' if len(segment.text.strip()) > 50 else ''}{gpu_info}")
-            
-            # 5개 세그먼트마다 진행 상황 요약
-            if (i + 1) % 5 == 0:
-                print(f"📊 진행 상황: {i+1}개 세그먼트 완료 | 경과시간: {elapsed:.1f}초")
-                print("-" * 60)
         
+        segments_list = segments_builder.build()
         total_elapsed = (datetime.now() - start_time).total_seconds()
         print("=" * 60)
         print(f"🎉 전사 완료! 총 {len(segments_list)}개 세그먼트 | 소요시간: {total_elapsed:.1f}초")
         
-        show_resource_usage(process, "전사 완료")
+        metrics.end_stage()
+        metrics.set_value("audio_duration_seconds", info.duration)
+        show_resource_usage(sampler, "전사 완료")
         
         # GPU 메모리 정리 (안전하게)
         if gpu_success:
@@ -647,6 +706,7 @@ def complete_transcription_and_minutes():
     
     print("🔧 STT 후처리 중...")
     # STT 후처리 - 용어 교정 및 개선
+    metrics.start_stage("post_processing")
     segments_list = post_process_stt(segments_list)
     
     # STT 파일 저장 (UTF-8)
@@ -658,6 +718,7 @@ def complete_transcription_and_minutes():
         
         # 화자 분리 수행
         print("🎭 화자 분리 시작...")
+        metrics.start_stage("diarization")
         try:
             from speaker_diarization import perform_speaker_diarization, apply_speaker_diarization_to_transcription, simple_time_based_diarization
             
@@ -680,6 +741,7 @@ def complete_transcription_and_minutes():
             print("✅ 시간 기반 화자 구분 적용 완료 (pyannote.audio 미설치)")
         
         # 화자 정보를 포함한 STT 파일 저장
+        metrics.start_stage("document_writing")
         for i, segment in enumerate(segments_list):
             
             start_min = int(segment.start // 60)
@@ -703,16 +765,27 @@ def complete_transcription_and_minutes():
     all_text = " ".join([seg.text for seg in segments_list])
     
     print("🤖 AI를 사용해서 회의록 생성 중...")
-    show_resource_usage(process, "AI 분석 전")
+    show_resource_usage(sampler, "AI 분석 전")
     
     # AI를 사용해서 회의록 생성
+    metrics.start_stage("llm_analysis")
     meeting_analysis = analyze_meeting_with_ai(all_text)
-    show_resource_usage(process, "AI 분석 완료")
+    metrics.end_stage()
+    show_resource_usage(sampler, "AI 분석 완료")
     
     print("📄 회의록 파일 생성 중...")
     
     # 회의록 생성 (TXT 형식)
+    metrics.start_stage("document_writing")
     create_meeting_minutes_txt(minutes_output, len(segments_list), info, meeting_analysis, base_name)
+    metrics.finish()
+    
+    # 단계별 지표 저장 (STT_METRICS_TEXTFILE 설정 시 node exporter textfile도 갱신)
+    metrics_output = os.path.join(output_dir, f"{base_name}_metrics.json")
+    metrics.save_json(metrics_output)
+    metrics_textfile = os.getenv("STT_METRICS_TEXTFILE")
+    if metrics_textfile:
+        metrics.write_prometheus(metrics_textfile)
     
     print(f"\n{'='*60}")
     print(f"🎉 전사 및 회의록 생성 완료!")
@@ -725,8 +798,15 @@ def complete_transcription_and_minutes():
     print(f"📂 저장 위치: {output_dir}")
     print(f"{'='*60}")
     
+    # 단계별 소요 시간
+    print("⏱️  단계별 소요 시간:")
+    for stage_name, duration in metrics.stage_durations().items():
+        print(f"   - {stage_name}: {duration:.1f}초")
+    print(f"📈 지표 파일: {os.path.basename(metrics_output)}")
+    
     # 최종 자원 사용량
-    show_resource_usage(process, "처리 완료")
+    show_resource_usage(sampler, "처리 완료")
+    sampler.stop()
     
     # GPU 사용 시 안전한 종료
     if 'gpu_success' in locals() and gpu_success:
@@ -756,6 +836,14 @@ def post_process_stt(segments_list):
         # 사전 파일들에서 용어 사전 구축
         correction_dict = build_correction_dictionary()
         
+        if isinstance(segments_list, CompactSegments):
+            # 텍스트만 교정하고 나머지 배열은 그대로 공유
+            corrected_texts = [
+                apply_corrections(segment.text, correction_dict) for segment in segments_list
+            ]
+            print(f"✅ STT 후처리 완료 - {len(correction_dict)}개 용어 교정 적용")
+            return segments_list.with_texts(corrected_texts)
+        
         # 각 segment의 텍스트 교정
         processed_segments = []
         for segment in segments_list:
@@ -0,0 +1,103 @@
+import argparse
+import re
+import time
+
+from jiwer import cer
+
+from faster_whisper import CascadeInferencePipeline, WhisperModel, decode_audio
+
+parser = argparse.ArgumentParser(description="Cascade RTF/CER benchmark")
+parser.add_argument("audio", help="Path to the audio file.")
+parser.add_argument("reference", help="Path to the reference transcript (UTF-8 text).")
+parser.add_argument("--fast_model", default="small", help="Fast first-pass model.")
+parser.add_argument("--model", default="large-v3", help="Accurate model.")
+parser.add_argument("--device", default="cpu")
+parser.add_argument("--compute_type", default="int8")
+parser.add_argument("--language", default="ko")
+parser.add_argument(
+    "--log_prob_threshold",
+    type=float,
+    default=-0.7,
+    help="Segments below this average log probability are escalated.",
+)
+parser.add_argument(
+    "--compression_ratio_threshold",
+    type=float,
+    default=2.4,
+    help="Segments above this compression ratio are escalated.",
+)
+args = parser.parse_args()
+
+transcribe_options = dict(
+    language=args.language,
+    beam_size=5,
+    vad_filter=True,
+    vad_parameters=dict(min_silence_duration_ms=500),
+    condition_on_previous_text=False,
+)
+
+
+def normalize(text):
+    # 한국어 CER 계산을 위해 공백과 문장부호 제거
+    return re.sub(r"[\s\.,!?~\"'()\[\]-]", "", text)
+
+
+def report(name, text, elapsed, duration, reference, extra=""):
+    print(
+        "%-14s RTF: %.3f  CER: %.2f%%  time: %.1fs%s"
+        % (
+            name,
+            elapsed / duration,
+            100 * cer(normalize(reference), normalize(text)),
+            elapsed,
+            extra,
+        )
+    )
+
+
+if __name__ == "__main__":
+    with open(args.reference, encoding="utf-8") as f:
+        reference = f.read()
+
+    audio = decode_audio(args.audio)
+    duration = audio.shape[0] / 16000
+
+    fast_model = WhisperModel(
+        args.fast_model, device=args.device, compute_type=args.compute_type
+    )
+    model = WhisperModel(args.model, device=args.device, compute_type=args.compute_type)
+
+    start = time.perf_counter()
+    segments, _ = model.transcribe(audio, **transcribe_options)
+    text = " ".join(segment.text.strip() for segment in segments)
+    report(args.model, text, time.perf_counter() - start, duration, reference)
+
+    start = time.perf_counter()
+    segments, _ = fast_model.transcribe(audio, **transcribe_options)
+    text = " ".join(segment.text.strip() for segment in segments)
+    report(args.fast_model, text, time.perf_counter() - start, duration, reference)
+
+    pipeline = CascadeInferencePipeline(fast_model, model)
+    start = time.perf_counter()
+    segments, info = pipeline.transcribe(
+        audio,
+        cascade_parameters=dict(
+            log_prob_threshold=args.log_prob_threshold,
+            compression_ratio_threshold=args.compression_ratio_threshold,
+        ),
+        **transcribe_options,
+    )
+    text = " ".join(segment.text.strip() for segment in segments)
+    report(
+        "cascade",
+        text,
+        time.perf_counter() - start,
+        duration,
+        reference,
+        "  escalated: %.1f%% (%d/%d segments)"
+        % (
+            100 * info.escalated_fraction,
+            info.num_escalated_segments,
+            len(segments),
+        ),
+    )
@@ -0,0 +1,72 @@
+import argparse
+import time
+
+from faster_whisper import ShardedInferencePipeline, WhisperModel, decode_audio
+
+parser = argparse.ArgumentParser(description="Sharded transcription scaling benchmark")
+parser.add_argument("audio", help="Path to a long audio file.")
+parser.add_argument("--model", default="large-v3")
+parser.add_argument("--device", default="cpu")
+parser.add_argument("--compute_type", default="int8")
+parser.add_argument("--language", default="ko")
+parser.add_argument(
+    "--shards",
+    type=int,
+    nargs="+",
+    default=[1, 2, 4, 8],
+    help="Shard counts to compare. One worker process is used per shard.",
+)
+args = parser.parse_args()
+
+transcribe_options = dict(
+    language=args.language,
+    beam_size=5,
+    vad_filter=True,
+    vad_parameters=dict(min_silence_duration_ms=500),
+    condition_on_previous_text=False,
+)
+
+
+if __name__ == "__main__":
+    audio = decode_audio(args.audio)
+    duration = audio.shape[0] / 16000
+    print("Audio duration: %.1fs" % duration)
+
+    # 기준: 단일 프로세스 전사 (모든 코어 사용)
+    model = WhisperModel(args.model, device=args.device, compute_type=args.compute_type)
+    start = time.perf_counter()
+    segments, _ = model.transcribe(audio, **transcribe_options)
+    num_segments = len(list(segments))
+    baseline = time.perf_counter() - start
+    print(
+        "%-12s RTF: %.3f  time: %.1fs  segments: %d"
+        % ("sequential", baseline / duration, baseline, num_segments)
+    )
+    del model
+
+    for num_shards in args.shards:
+        with ShardedInferencePipeline(
+            args.model,
+            num_workers=num_shards,
+            device=args.device,
+            compute_type=args.compute_type,
+        ) as pipeline:
+            # 워커 프로세스와 모델 로딩 시간은 측정에서 제외
+            pipeline.transcribe(audio[: 16000 * 5], **transcribe_options)
+
+            start = time.perf_counter()
+            segments, _ = pipeline.transcribe(
+                audio, num_shards=num_shards, **transcribe_options
+            )
+            elapsed = time.perf_counter() - start
+
+        print(
+            "%-12s RTF: %.3f  time: %.1fs  segments: %d  speedup: %.2fx"
+            % (
+                "shards=%d" % num_shards,
+                elapsed / duration,
+                elapsed,
+                len(segments),
+                baseline / elapsed,
+            )
+        )
@@ -0,0 +1,65 @@
+import argparse
+import time
+
+import numpy as np
+
+from faster_whisper import WhisperModel, decode_audio
+
+parser = argparse.ArgumentParser(description="Short clip latency benchmark")
+parser.add_argument("audio", help="Path to an audio file of at least 20 seconds.")
+parser.add_argument("--model", default="large-v3")
+parser.add_argument("--device", default="cpu")
+parser.add_argument("--compute_type", default="int8")
+parser.add_argument("--language", default="ko")
+parser.add_argument(
+    "--durations",
+    type=float,
+    nargs="+",
+    default=[5.0, 10.0, 20.0],
+    help="Durations of the clips in seconds.",
+)
+parser.add_argument("--repeat", type=int, default=20)
+args = parser.parse_args()
+
+transcribe_options = dict(
+    language=args.language,
+    beam_size=5,
+    vad_filter=True,
+    vad_parameters=dict(min_silence_duration_ms=500),
+    condition_on_previous_text=False,
+)
+
+
+def transcribe(model, clip):
+    start = time.perf_counter()
+    segments, _ = model.transcribe(clip, **transcribe_options)
+    # 세그먼트 생성 전까지의 준비 시간 (토크나이저, 억제 토큰, 특징 추출, VAD)
+    setup = time.perf_counter() - start
+    list(segments)
+    return setup, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    model = WhisperModel(args.model, device=args.device, compute_type=args.compute_type)
+    audio = decode_audio(args.audio)
+    sampling_rate = model.feature_extractor.sampling_rate
+
+    for duration in args.durations:
+        clip = audio[: int(duration * sampling_rate)]
+
+        # 첫 호출은 모델별 준비 캐시를 채우는 비용을 포함
+        first_setup, first_latency = transcribe(model, clip)
+        setups, latencies = zip(*(transcribe(model, clip) for _ in range(args.repeat)))
+
+        print(
+            "%5.1fs clip  first: %.0fms (setup %.1fms)  "
+            "p50: %.0fms (setup %.1fms)  p95: %.0fms"
+            % (
+                duration,
+                first_latency * 1000,
+                first_setup * 1000,
+                np.percentile(latencies, 50) * 1000,
+                np.percentile(setups, 50) * 1000,
+                np.percentile(latencies, 95) * 1000,
+            )
+        )
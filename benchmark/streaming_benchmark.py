@@ -0,0 +1,59 @@
+import argparse
+import time
+
+from faster_whisper import StreamingInferencePipeline, WhisperModel
+
+parser = argparse.ArgumentParser(description="Time-to-first-segment benchmark")
+parser.add_argument("audio", help="Path to a long audio file.")
+parser.add_argument("--model", default="large-v3")
+parser.add_argument("--device", default="cpu")
+parser.add_argument("--compute_type", default="int8")
+parser.add_argument("--language", default="ko")
+parser.add_argument(
+    "--section_length",
+    type=float,
+    default=60.0,
+    help="Duration of the sections of the streaming pipeline in seconds.",
+)
+args = parser.parse_args()
+
+transcribe_options = dict(
+    language=args.language,
+    beam_size=5,
+    vad_filter=True,
+    vad_parameters=dict(min_silence_duration_ms=500),
+    condition_on_previous_text=False,
+)
+
+
+def run(name, transcribe):
+    # 파일 디코딩부터 측정 (디코딩/VAD/특징 추출 시간 포함)
+    start = time.perf_counter()
+    segments, info = transcribe(args.audio, **transcribe_options)
+
+    first_segment = None
+    num_segments = 0
+    for _ in segments:
+        if first_segment is None:
+            first_segment = time.perf_counter() - start
+        num_segments += 1
+    elapsed = time.perf_counter() - start
+
+    print(
+        "%-10s TTFS: %.2fs  RTF: %.3f  time: %.1fs  segments: %d"
+        % (
+            name,
+            first_segment if first_segment is not None else float("nan"),
+            elapsed / info.duration,
+            elapsed,
+            num_segments,
+        )
+    )
+
+
+if __name__ == "__main__":
+    model = WhisperModel(args.model, device=args.device, compute_type=args.compute_type)
+    pipeline = StreamingInferencePipeline(model, section_length=args.section_length)
+
+    run("sequential", model.transcribe)
+    run("streaming", pipeline.transcribe)
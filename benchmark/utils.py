@@ -4,22 +4,17 @@ import os
 from threading import Thread
 from typing import Optional
 
-from faster_whisper import WhisperModel
+from faster_whisper.model_pool import get_model as get_pooled_model
 
 # 벤치마크 설정
 model_path = os.getenv("BENCHMARK_MODEL", "large-v3")
 device = os.getenv("BENCHMARK_DEVICE", "cuda")
 compute_type = os.getenv("BENCHMARK_COMPUTE_TYPE", "float16")
 
-# 모델 초기화 (지연 로딩)
-model = None
 
 def get_model():
-    global model
-    if model is None:
-        print(f"Loading {model_path} model on {device} with {compute_type}...")
-        model = WhisperModel(model_path, device=device, compute_type=compute_type)
-    return model
+    # 모델 풀에서 지연 로딩 (최초 호출 시 로드 + 워밍업)
+    return get_pooled_model(model_path, device=device, compute_type=compute_type)
 
 
 def inference(audio_file="benchmark.m4a", language="ko"):
@@ -10,20 +10,34 @@ import time
 import requests
 from datetime import datetime
 from pathlib import Path
-from faster_whisper import WhisperModel
+from faster_whisper import BatchedInferencePipeline, decode_audio
+from faster_whisper.autotune import load_profile
+from faster_whisper.metrics import JobMetrics, ResourceSampler
+from faster_whisper.model_pool import configure_default_pool, get_memory_budget_mb, get_model
 
 # 환경 변수
 OLLAMA_BASE_URL = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
 INPUT_DIR = Path("/app/input")
 OUTPUT_DIR = Path("/app/output")
-MODEL_SIZE = os.getenv("WHISPER_MODEL", "large-v3")
+CHECKPOINT_DIR = OUTPUT_DIR / "checkpoints"
+METRICS_DIR = OUTPUT_DIR / "metrics"
+# node exporter textfile collector 경로 (마지막 작업의 단계별 지표)
+METRICS_TEXTFILE = Path(os.getenv("METRICS_TEXTFILE", str(METRICS_DIR / "stt.prom")))
 DEVICE = os.getenv("DEVICE", "cuda")
-COMPUTE_TYPE = os.getenv("COMPUTE_TYPE", "float16")
+# 자동 튜닝 프로필 (python -m faster_whisper.autotune 결과, 환경 변수가 프로필보다 우선)
+PROFILE = load_profile(os.getenv("STT_PROFILE", "/app/output/stt_profile.json"), device=DEVICE)
+MODEL_SIZE = os.getenv("WHISPER_MODEL", PROFILE.model if PROFILE else "large-v3")
+COMPUTE_TYPE = os.getenv("COMPUTE_TYPE", PROFILE.compute_type if PROFILE else "float16")
+BEAM_SIZE = int(os.getenv("BEAM_SIZE", PROFILE.beam_size if PROFILE else 5))
+# 상주 모델 메모리 예산 (MB, 미설정 시 제한 없음)
+MODEL_MEMORY_MB = get_memory_budget_mb()
 
 def setup_directories():
     """디렉토리 설정"""
     INPUT_DIR.mkdir(exist_ok=True)
     OUTPUT_DIR.mkdir(exist_ok=True)
+    CHECKPOINT_DIR.mkdir(exist_ok=True)
+    METRICS_DIR.mkdir(exist_ok=True)
     print(f"📁 Input directory: {INPUT_DIR}")
     print(f"📁 Output directory: {OUTPUT_DIR}")
 
@@ -52,23 +66,58 @@ def wait_for_ollama():
 def initialize_whisper():
     """Whisper 모델 초기화"""
     print(f"🎤 Whisper {MODEL_SIZE} 모델 로딩 중...")
-    print(f"🔧 Device: {DEVICE}, Compute Type: {COMPUTE_TYPE}")
+    print(f"🔧 Device: {DEVICE}, Compute Type: {COMPUTE_TYPE}, Beam Size: {BEAM_SIZE}")
+    if PROFILE:
+        print(f"🎛️ 자동 튜닝 프로필: {PROFILE.name} (RTF {PROFILE.rtf:.2f}, CER {PROFILE.cer:.1%})")
     
     try:
-        model = WhisperModel(MODEL_SIZE, device=DEVICE, compute_type=COMPUTE_TYPE)
+        # 모델 풀: 프로세스당 한 번 로드 + 워밍업, 예산을 넘으면 오래된 모델부터 해제
+        configure_default_pool(MODEL_MEMORY_MB)
+        if MODEL_MEMORY_MB is not None:
+            print(f"💾 모델 메모리 예산: {MODEL_MEMORY_MB:.0f}MB")
+        model = get_model(MODEL_SIZE, device=DEVICE, compute_type=COMPUTE_TYPE)
         print("✅ Whisper 모델 로딩 완료!")
+        # 컨테이너 CPU 쿼터 기준으로 자동 배분된 스레드 수
+        print(f"🧵 스레드 계획: {model.thread_plan}")
         return model
     except Exception as e:
         print(f"❌ Whisper 모델 로딩 실패: {e}")
         sys.exit(1)
 
-def transcribe_audio(model, audio_file):
+def get_checkpoint_path(audio_file):
+    """전사 체크포인트 경로 (컨테이너 재시작 시 이어서 전사)"""
+    return CHECKPOINT_DIR / f"{audio_file.stem}.json"
+
+def log_progress(progress):
+    """전사 진행률 및 예상 남은 시간 로그"""
+    percent = f"{progress.fraction * 100:.1f}%" if progress.fraction is not None else "-"
+    eta = f"{progress.eta:.0f}s" if progress.eta is not None else "-"
+    rtf = f"{progress.real_time_factor:.2f}" if progress.real_time_factor is not None else "-"
+    print(f"📊 진행: {percent} ({progress.processed:.0f}s) | RTF {rtf} | 폴백 {progress.num_fallbacks} | ETA {eta}")
+
+def transcribe_audio(model, audio_file, metrics):
     """오디오 파일 전사"""
-    print(f"🎵 전사 시작: {audio_file.name}")
+    checkpoint_path = get_checkpoint_path(audio_file)
+    if checkpoint_path.exists():
+        print(f"🔁 중단된 전사 재개: {audio_file.name}")
+    else:
+        print(f"🎵 전사 시작: {audio_file.name}")
     
-    segments, info = model.transcribe(
-        str(audio_file),
-        beam_size=5,
+    # 디코딩 시간을 따로 기록 (체크포인트 사용 시 어차피 전체 파형을 디코딩함)
+    metrics.start_stage("decode")
+    audio = decode_audio(str(audio_file))
+    
+    metrics.start_stage("stt")
+    # 프로필이 배치 모드를 선택한 경우 VAD 구간을 배치로 전사
+    if PROFILE and PROFILE.batched:
+        pipeline = BatchedInferencePipeline(model)
+        pipeline_options = dict(batch_size=PROFILE.batch_size)
+    else:
+        pipeline = model
+        pipeline_options = {}
+    segments, info = pipeline.transcribe(
+        audio,
+        beam_size=BEAM_SIZE,
         language="ko",
         vad_filter=True,
         vad_parameters=dict(min_silence_duration_ms=500),
@@ -76,7 +125,10 @@ def transcribe_audio(model, audio_file):
         compression_ratio_threshold=2.4,
         no_speech_threshold=0.6,
         condition_on_previous_text=False,
-        initial_prompt="한국어 회의 내용입니다."
+        initial_prompt="한국어 회의 내용입니다.",
+        checkpoint_path=str(checkpoint_path),
+        progress_callback=log_progress,
+        **pipeline_options
     )
     
     # 전사 결과 수집
@@ -92,6 +144,8 @@ def transcribe_audio(model, audio_file):
         })
         print(f"[{segment.start:.1f}s] {segment.text.strip()}")
     
+    metrics.end_stage()
+    metrics.set_value("audio_duration_seconds", info.duration)
     return transcription.strip(), segment_list, info
 
 def analyze_with_ai(transcription):
@@ -252,27 +306,51 @@ def process_audio_files():
     
     print(f"🎵 {len(audio_files)}개 오디오 파일 발견")
     
+    # 이전 실행에서 중단된 작업을 먼저 처리
+    audio_files.sort(key=lambda f: not get_checkpoint_path(f).exists())
+    
+    # 자원 사용량 샘플링 (백그라운드 스레드, 링 버퍼)
+    sampler = ResourceSampler(interval=1.0).start()
+    
     # Whisper 모델 초기화
     model = initialize_whisper()
     
     for audio_file in audio_files:
+        metrics = JobMetrics(audio_file.name, sampler, labels={"app": "docker_infer"})
         try:
             print(f"\n{'='*60}")
             print(f"처리 중: {audio_file.name}")
             
             # STT 처리
-            transcription, segments, info = transcribe_audio(model, audio_file)
+            transcription, segments, info = transcribe_audio(model, audio_file, metrics)
             
             # AI 분석
+            metrics.start_stage("llm_analysis")
             analysis = analyze_with_ai(transcription)
             
             # 결과 저장
+            metrics.start_stage("document_writing")
             save_results(audio_file, transcription, segments, analysis, info)
             
+            # 결과가 저장되었으므로 체크포인트 삭제
+            get_checkpoint_path(audio_file).unlink(missing_ok=True)
+            
             print(f"✅ {audio_file.name} 처리 완료")
+            metrics.set_value("success", 1)
             
         except Exception as e:
             print(f"❌ {audio_file.name} 처리 실패: {e}")
+            metrics.set_value("success", 0)
+        
+        # 작업별 JSON + Prometheus textfile (실패한 작업도 기록)
+        metrics.finish()
+        metrics.save_json(METRICS_DIR / f"{audio_file.stem}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+        metrics.write_prometheus(str(METRICS_TEXTFILE))
+        print("⏱️ 단계별 소요 시간: " + ", ".join(
+            f"{name} {duration:.1f}s" for name, duration in metrics.stage_durations().items()
+        ))
+    
+    sampler.stop()
 
 def main():
     """메인 함수"""
@@ -1,4 +1,15 @@
+from faster_whisper.async_transcribe import AsyncWhisperModel
 from faster_whisper.audio import decode_audio
+from faster_whisper.cancellation import CancellationToken, TranscriptionCancelled
+from faster_whisper.cascade import CascadeInferencePipeline
+from faster_whisper.compact import CompactSegments
+from faster_whisper.metrics import JobMetrics, ResourceSampler
+from faster_whisper.model_pool import ModelPool
+from faster_whisper.progress import TranscriptionProgress
+from faster_whisper.sharded import ShardedInferencePipeline
+from faster_whisper.streaming import StreamingInferencePipeline
+from faster_whisper.telemetry import DecodeTelemetry
+from faster_whisper.threads import ThreadPlan, plan_threads
 from faster_whisper.transcribe import BatchedInferencePipeline, WhisperModel
 from faster_whisper.utils import available_models, download_model, format_timestamp
 from faster_whisper.version import __version__
@@ -7,8 +18,22 @@ __all__ = [
     "available_models",
     "decode_audio",
     "WhisperModel",
+    "AsyncWhisperModel",
     "BatchedInferencePipeline",
+    "CancellationToken",
+    "CascadeInferencePipeline",
+    "CompactSegments",
+    "DecodeTelemetry",
+    "JobMetrics",
+    "ModelPool",
+    "ResourceSampler",
+    "ShardedInferencePipeline",
+    "StreamingInferencePipeline",
+    "ThreadPlan",
+    "TranscriptionCancelled",
+    "TranscriptionProgress",
     "download_model",
     "format_timestamp",
+    "plan_threads",
     "__version__",
 ]
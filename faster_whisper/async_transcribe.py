@@ -0,0 +1,188 @@
+"""Asyncio interface of the transcription models.
+
+`AsyncWhisperModel` runs the blocking CTranslate2 calls on its own thread pool and
+exposes the segments as an async iterator, so an event loop can drive many
+transcriptions:
+
+    model = AsyncWhisperModel("large-v3", device="cuda")
+    segments, info = await model.transcribe("audio.mp3", language="ko")
+    async for segment in segments:
+        ...
+"""
+
+import asyncio
+import concurrent.futures
+import functools
+import threading
+import weakref
+
+from typing import Any, AsyncIterator, BinaryIO, Optional, Tuple, Union
+
+import numpy as np
+
+from faster_whisper.cancellation import CancellationToken
+from faster_whisper.transcribe import Segment, TranscriptionInfo
+from faster_whisper.utils import get_model_workers
+
+
+class AsyncWhisperModel:
+    """Async facade of a `WhisperModel` or a `BatchedInferencePipeline`."""
+
+    def __init__(
+        self,
+        model: Union[str, Any],
+        max_concurrency: Optional[int] = None,
+        buffer_size: int = 4,
+        **model_kwargs,
+    ):
+        """Initializes the facade.
+
+        Arguments:
+          model: A `WhisperModel`, a `BatchedInferencePipeline`, or a model size or path
+            loaded from the model pool with the `WhisperModel` arguments `model_kwargs`.
+          max_concurrency: Maximum number of transcriptions running at the same time.
+            The other calls to `transcribe` wait for a free slot. Defaults to the
+            `num_workers` of the model.
+          buffer_size: Maximum number of segments produced ahead of the consumer. The
+            transcription is paused when the buffer is full.
+        """
+        if isinstance(model, str):
+            from faster_whisper.model_pool import get_model
+
+            model = get_model(model, **model_kwargs)
+        elif model_kwargs:
+            raise ValueError("Model arguments are only used with a model size or path")
+
+        if max_concurrency is None:
+            max_concurrency = get_model_workers(model)
+        if buffer_size < 1:
+            raise ValueError("buffer_size must be at least 1")
+
+        self.model = model
+        self.max_concurrency = max(1, max_concurrency)
+        self.buffer_size = buffer_size
+        self.executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=self.max_concurrency, thread_name_prefix="async-whisper"
+        )
+        self._semaphores = weakref.WeakKeyDictionary()
+
+    async def transcribe(
+        self, audio: Union[str, BinaryIO, np.ndarray], **options: Any
+    ) -> Tuple[AsyncIterator[Segment], TranscriptionInfo]:
+        """Transcribes an audio file.
+
+        The arguments are the same as the `transcribe` method of the model. The call
+        returns when the audio is decoded and the language is detected, like the
+        blocking method. The segments are generated when the iteration starts, and a
+        concurrency slot is then held until all segments are consumed or the iterator
+        is closed. The transcription is cancelled when this call is cancelled or when
+        the iterator is closed early.
+
+        Returns:
+          A tuple with:
+
+            - an async iterator over the transcribed segments
+            - an instance of TranscriptionInfo
+        """
+        loop = asyncio.get_running_loop()
+        semaphore = self._get_semaphore(loop)
+        cancellation_token = CancellationToken(
+            parent=options.pop("cancellation_token", None)
+        )
+
+        async with semaphore:
+            try:
+                segments, info = await loop.run_in_executor(
+                    self.executor,
+                    functools.partial(
+                        self.model.transcribe,
+                        audio,
+                        cancellation_token=cancellation_token,
+                        **options,
+                    ),
+                )
+            except asyncio.CancelledError:
+                # Stop the VAD or the language detection running in the executor.
+                cancellation_token.cancel()
+                raise
+
+        return self._iterate(loop, segments, semaphore, cancellation_token), info
+
+    def close(self):
+        """Shuts down the thread pool once the running transcriptions are done."""
+        self.executor.shutdown(wait=False)
+
+    async def __aenter__(self) -> "AsyncWhisperModel":
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _get_semaphore(self, loop: asyncio.AbstractEventLoop) -> asyncio.Semaphore:
+        # asyncio primitives belong to one event loop.
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self._semaphores[loop] = asyncio.Semaphore(self.max_concurrency)
+        return semaphore
+
+    async def _iterate(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        segments,
+        semaphore: asyncio.Semaphore,
+        cancellation_token: CancellationToken,
+    ) -> AsyncIterator[Segment]:
+        items = asyncio.Queue()
+        slots = threading.Semaphore(self.buffer_size)
+        stop = threading.Event()
+        end = object()
+
+        def put(item) -> bool:
+            while not stop.is_set():
+                if slots.acquire(timeout=0.1):
+                    return call_soon(items.put_nowait, item)
+            return False
+
+        def call_soon(callback, *args) -> bool:
+            try:
+                loop.call_soon_threadsafe(callback, *args)
+                return True
+            except RuntimeError:
+                # The event loop is closed.
+                return False
+
+        def produce():
+            try:
+                for segment in segments:
+                    if not put((segment, None)):
+                        return
+            except BaseException as e:
+                put((None, e))
+            else:
+                put((end, None))
+            finally:
+                if hasattr(segments, "close"):
+                    segments.close()
+                call_soon(semaphore.release)
+
+        await semaphore.acquire()
+        try:
+            loop.run_in_executor(self.executor, produce)
+        except BaseException:
+            semaphore.release()
+            raise
+
+        try:
+            while True:
+                item, error = await items.get()
+                slots.release()
+                if error is not None:
+                    raise error
+                if item is end:
+                    break
+                yield item
+        finally:
+            # The caller may stop early, release the producer thread and stop the
+            # decoding at its next step.
+            stop.set()
+            cancellation_token.cancel()
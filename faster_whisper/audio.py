@@ -10,7 +10,7 @@ import gc
 import io
 import itertools
 
-from typing import BinaryIO, Union
+from typing import BinaryIO, Iterator, Optional, Union
 
 import av
 import numpy as np
@@ -43,16 +43,9 @@ def decode_audio(
     raw_buffer = io.BytesIO()
     dtype = None
 
-    with av.open(input_file, mode="r", metadata_errors="ignore") as container:
-        frames = container.decode(audio=0)
-        frames = _ignore_invalid_frames(frames)
-        frames = _group_frames(frames, 500000)
-        frames = _resample_frames(frames, resampler)
-
-        for frame in frames:
-            array = frame.to_ndarray()
-            dtype = array.dtype
-            raw_buffer.write(array)
+    for array in _decode_arrays(input_file, resampler):
+        dtype = array.dtype
+        raw_buffer.write(array)
 
     # It appears that some objects related to the resampler are not freed
     # unless the garbage collector is manually run.
@@ -76,6 +69,73 @@ def decode_audio(
     return audio
 
 
+def decode_audio_blocks(
+    input_file: Union[str, BinaryIO],
+    sampling_rate: int = 16000,
+) -> Iterator[np.ndarray]:
+    """Decodes the audio block by block.
+
+    The concatenation of the blocks is equal to the output of `decode_audio`, but the
+    whole waveform is never in memory.
+
+    Args:
+      input_file: Path to the input file or a file-like object.
+      sampling_rate: Resample the audio to this sample rate.
+
+    Returns:
+      An iterator of mono float32 Numpy arrays.
+    """
+    resampler = av.audio.resampler.AudioResampler(
+        format="s16",
+        layout="mono",
+        rate=sampling_rate,
+    )
+
+    for array in _decode_arrays(input_file, resampler):
+        # Convert s16 back to f32.
+        yield array.reshape(-1).astype(np.float32) / 32768.0
+
+    del resampler
+    gc.collect()
+
+
+def get_audio_duration(
+    input_file: Union[str, BinaryIO, np.ndarray], sampling_rate: int = 16000
+) -> Optional[float]:
+    """Returns the duration in seconds from the container metadata, without decoding
+    the audio, or None if the container does not store it.
+
+    The duration can differ slightly from the decoded audio.
+    """
+    if isinstance(input_file, np.ndarray):
+        return input_file.shape[0] / sampling_rate
+
+    try:
+        with av.open(input_file, mode="r", metadata_errors="ignore") as container:
+            stream = container.streams.audio[0]
+            if stream.duration is not None and stream.time_base is not None:
+                return float(stream.duration * stream.time_base)
+            if container.duration is not None:
+                return container.duration / av.time_base
+    except (av.error.FFmpegError, IndexError):
+        pass
+    finally:
+        if not isinstance(input_file, str):
+            input_file.seek(0)
+    return None
+
+
+def _decode_arrays(input_file, resampler):
+    with av.open(input_file, mode="r", metadata_errors="ignore") as container:
+        frames = container.decode(audio=0)
+        frames = _ignore_invalid_frames(frames)
+        frames = _group_frames(frames, 500000)
+        frames = _resample_frames(frames, resampler)
+
+        for frame in frames:
+            yield frame.to_ndarray()
+
+
 def _ignore_invalid_frames(frames):
     iterator = iter(frames)
 
@@ -0,0 +1,416 @@
+"""Hardware-aware tuning of the model, compute type and decoding settings.
+
+The best trade-off between speed, memory and accuracy depends on the host. `autotune`
+transcribes a short reference clip with each combination of model size, compute type,
+beam size and batched or sequential mode, and measures the real-time factor (RTF), the
+peak resident memory and the character error rate (CER) against a reference transcript.
+`save_profile` keeps the Pareto front of these measures and selects its fastest
+configuration that meets a CER target. The applications load the profile at startup:
+
+    python -m faster_whisper.autotune clip.wav clip.txt --device cpu --target_cer 0.1
+
+    profile = load_profile(device="cpu")
+    if profile is not None:
+        model = WhisperModel(profile.model, device="cpu", compute_type=profile.compute_type)
+"""
+
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import re
+import time
+
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import BinaryIO, Iterable, List, Optional, Union
+
+import numpy as np
+
+from faster_whisper.audio import decode_audio
+from faster_whisper.metrics import ResourceSampler
+from faster_whisper.model_pool import warmup_model
+from faster_whisper.threads import get_cpu_budget
+from faster_whisper.transcribe import BatchedInferencePipeline, WhisperModel
+from faster_whisper.utils import get_logger
+
+DEFAULT_PROFILE_PATH = "stt_profile.json"
+
+
+@dataclass
+class TuneResult:
+    """Measures of a configuration on the reference clip.
+
+    Attributes:
+      model: Model size or path.
+      compute_type: Compute type of the model.
+      device: Device of the model.
+      beam_size: Beam size.
+      batched: Whether the clip was transcribed with `BatchedInferencePipeline`.
+      batch_size: Batch size in batched mode.
+      rtf: Transcription time divided by the clip duration, without the model loading.
+      peak_rss: Peak resident memory of the process in bytes, including the model.
+      cer: Character error rate against the reference transcript.
+    """
+
+    model: str
+    compute_type: str
+    device: str
+    beam_size: int
+    batched: bool
+    batch_size: int
+    rtf: float
+    peak_rss: int
+    cer: float
+
+    @property
+    def name(self) -> str:
+        return "%s/%s/beam%d/%s" % (
+            self.model,
+            self.compute_type,
+            self.beam_size,
+            "batched%d" % self.batch_size if self.batched else "sequential",
+        )
+
+
+def character_error_rate(reference: str, hypothesis: str) -> float:
+    """Returns the edit distance between the texts without spaces and punctuation,
+    divided by the length of the reference."""
+    reference = _normalize(reference)
+    hypothesis = _normalize(hypothesis)
+    if not reference:
+        return float(len(hypothesis) > 0)
+
+    previous = list(range(len(hypothesis) + 1))
+    for i, reference_char in enumerate(reference, 1):
+        current = [i]
+        for j, hypothesis_char in enumerate(hypothesis, 1):
+            current.append(
+                min(
+                    previous[j] + 1,
+                    current[j - 1] + 1,
+                    previous[j - 1] + (reference_char != hypothesis_char),
+                )
+            )
+        previous = current
+
+    return previous[-1] / len(reference)
+
+
+def autotune(
+    audio: Union[str, BinaryIO, np.ndarray],
+    reference: str,
+    models: Iterable[str] = ("small", "medium", "large-v3"),
+    compute_types: Iterable[str] = ("int8", "int8_float32", "float32"),
+    beam_sizes: Iterable[int] = (1, 3, 5),
+    batched_modes: Iterable[bool] = (False, True),
+    batch_size: int = 8,
+    device: str = "cpu",
+    language: Optional[str] = "ko",
+    transcribe_options: Optional[dict] = None,
+    isolate: bool = True,
+) -> List[TuneResult]:
+    """Measures every configuration on a reference clip.
+
+    Arguments:
+      audio: Path to the reference clip or a waveform sampled at 16 kHz.
+      reference: Reference transcript of the clip.
+      models: Model sizes or paths.
+      compute_types: Compute types of the models.
+      beam_sizes: Beam sizes.
+      batched_modes: False for the sequential mode, True for the batched mode.
+      batch_size: Batch size in batched mode.
+      device: Device of the models.
+      language: Language of the clip.
+      transcribe_options: Other arguments of `transcribe`, e.g. the `initial_prompt`
+        used by the application.
+      isolate: Load each model in a new process, so its peak memory does not include
+        the models measured before.
+
+    Returns:
+      The measures of the configurations. A model or compute type that cannot be loaded
+      on the device is skipped.
+    """
+    if not isinstance(audio, np.ndarray):
+        audio = decode_audio(audio)
+
+    options = dict(
+        language=language,
+        vad_filter=True,
+        vad_parameters=dict(min_silence_duration_ms=500),
+        temperature=0.0,
+        condition_on_previous_text=False,
+    )
+    options.update(transcribe_options or {})
+
+    logger = get_logger()
+    results = []
+    for model in models:
+        for compute_type in compute_types:
+            logger.info("Measuring %s (%s) on %s", model, compute_type, device)
+            args = (
+                audio,
+                reference,
+                model,
+                compute_type,
+                device,
+                list(beam_sizes),
+                list(batched_modes),
+                batch_size,
+                options,
+            )
+            try:
+                if isolate:
+                    with ProcessPoolExecutor(
+                        max_workers=1, mp_context=multiprocessing.get_context("spawn")
+                    ) as executor:
+                        results.extend(executor.submit(_measure_model, *args).result())
+                else:
+                    results.extend(_measure_model(*args))
+            except Exception as e:
+                logger.warning("Skipping %s (%s): %s", model, compute_type, e)
+
+    return results
+
+
+def pareto_front(results: List[TuneResult]) -> List[TuneResult]:
+    """Returns the results that no other result beats on RTF, peak memory and CER at
+    the same time, sorted by RTF."""
+
+    def dominates(a, b):
+        measures_a = (a.rtf, a.peak_rss, a.cer)
+        measures_b = (b.rtf, b.peak_rss, b.cer)
+        return measures_a != measures_b and all(
+            x <= y for x, y in zip(measures_a, measures_b)
+        )
+
+    front = [
+        result
+        for result in results
+        if not any(dominates(other, result) for other in results)
+    ]
+    return sorted(front, key=lambda result: result.rtf)
+
+
+def select_profile(results: List[TuneResult], target_cer: float) -> TuneResult:
+    """Returns the fastest result of the Pareto front with a CER below `target_cer`, or
+    the most accurate result when none meets the target."""
+    if not results:
+        raise ValueError("No configuration was measured")
+
+    candidates = [
+        result for result in pareto_front(results) if result.cer <= target_cer
+    ]
+    if candidates:
+        return min(candidates, key=lambda result: result.rtf)
+
+    get_logger().warning(
+        "No configuration meets the CER target of %.3f, selecting the most accurate one",
+        target_cer,
+    )
+    return min(results, key=lambda result: (result.cer, result.rtf))
+
+
+def save_profile(
+    path: str,
+    results: List[TuneResult],
+    target_cer: float,
+    audio_duration: Optional[float] = None,
+) -> TuneResult:
+    """Selects the profile and writes it to a JSON file with the Pareto front and all
+    the results. Returns the selected profile."""
+    profile = select_profile(results, target_cer)
+    data = dict(
+        timestamp=time.time(),
+        target_cer=target_cer,
+        cpu_budget=get_cpu_budget(),
+        audio_duration=audio_duration,
+        profile=asdict(profile),
+        pareto=[asdict(result) for result in pareto_front(results)],
+        results=[asdict(result) for result in results],
+    )
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(data, file, indent=2, ensure_ascii=False)
+    return profile
+
+
+def load_profile(
+    path: Optional[str] = None, device: Optional[str] = None
+) -> Optional[TuneResult]:
+    """Loads the profile selected by `save_profile`.
+
+    Arguments:
+      path: Path to the profile. Defaults to the STT_PROFILE environment variable, or
+        "stt_profile.json" in the working directory.
+      device: Device of the application. A profile tuned for another device is ignored.
+
+    Returns:
+      The profile, or None if the file does not exist or is for another device.
+    """
+    if path is None:
+        path = os.environ.get("STT_PROFILE", DEFAULT_PROFILE_PATH)
+    if not os.path.isfile(path):
+        return None
+
+    with open(path, encoding="utf-8") as file:
+        data = json.load(file)
+    profile = TuneResult(**data["profile"])
+
+    logger = get_logger()
+    if device is not None and profile.device != device:
+        logger.warning(
+            "Ignoring the profile %s tuned for %s, the device is %s",
+            path,
+            profile.device,
+            device,
+        )
+        return None
+
+    cpu_budget = get_cpu_budget()
+    if data.get("cpu_budget") not in (None, cpu_budget):
+        logger.warning(
+            "The profile %s was tuned with %d CPUs but %d are available, "
+            "run the autotuning again on this host",
+            path,
+            data["cpu_budget"],
+            cpu_budget,
+        )
+
+    return profile
+
+
+def _measure_model(
+    audio: np.ndarray,
+    reference: str,
+    model_size_or_path: str,
+    compute_type: str,
+    device: str,
+    beam_sizes: List[int],
+    batched_modes: List[bool],
+    batch_size: int,
+    options: dict,
+) -> List[TuneResult]:
+    sampler = ResourceSampler(interval=0.05).start()
+    try:
+        model = WhisperModel(
+            model_size_or_path, device=device, compute_type=compute_type
+        )
+        warmup_model(model)
+        duration = audio.shape[0] / model.feature_extractor.sampling_rate
+
+        # The configurations are measured by increasing memory usage: the buffers of a
+        # run are cached by the allocator and would count in the peak of a smaller one.
+        results = []
+        for batched in sorted(batched_modes):
+            if batched:
+                pipeline = BatchedInferencePipeline(model)
+                run_options = dict(options, batch_size=batch_size)
+            else:
+                pipeline = model
+                run_options = options
+
+            for beam_size in sorted(beam_sizes):
+                start = time.perf_counter()
+                segments, _ = pipeline.transcribe(
+                    audio, beam_size=beam_size, **run_options
+                )
+                text = " ".join(segment.text.strip() for segment in segments)
+                elapsed = time.perf_counter() - start
+
+                sampler.sample()
+                results.append(
+                    TuneResult(
+                        model=model_size_or_path,
+                        compute_type=compute_type,
+                        device=device,
+                        beam_size=beam_size,
+                        batched=batched,
+                        batch_size=batch_size,
+                        rtf=elapsed / duration,
+                        peak_rss=max(sample.rss for sample in sampler.samples()),
+                        cer=character_error_rate(reference, text),
+                    )
+                )
+        return results
+    finally:
+        sampler.stop()
+
+
+def _normalize(text: str) -> str:
+    # The word spacing of Korean transcripts is inconsistent, so only the characters
+    # are compared.
+    return re.sub(r"[\W_]", "", text.lower())
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Select the fastest configuration that meets a CER target"
+    )
+    parser.add_argument("audio", help="Path to the reference clip.")
+    parser.add_argument("reference", help="Path to the reference transcript (UTF-8).")
+    parser.add_argument("--models", nargs="+", default=["small", "medium", "large-v3"])
+    parser.add_argument(
+        "--compute_types", nargs="+", default=["int8", "int8_float32", "float32"]
+    )
+    parser.add_argument("--beam_sizes", nargs="+", type=int, default=[1, 3, 5])
+    parser.add_argument(
+        "--modes",
+        nargs="+",
+        choices=["sequential", "batched"],
+        default=["sequential", "batched"],
+    )
+    parser.add_argument("--batch_size", type=int, default=8)
+    parser.add_argument("--device", default="cpu")
+    parser.add_argument("--language", default="ko")
+    parser.add_argument("--initial_prompt", help="Initial prompt of the application.")
+    parser.add_argument(
+        "--target_cer",
+        type=float,
+        default=0.1,
+        help="Maximum character error rate of the selected profile.",
+    )
+    parser.add_argument("--output", default=DEFAULT_PROFILE_PATH)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+
+    with open(args.reference, encoding="utf-8") as file:
+        reference = file.read()
+    audio = decode_audio(args.audio)
+
+    results = autotune(
+        audio,
+        reference,
+        models=args.models,
+        compute_types=args.compute_types,
+        beam_sizes=args.beam_sizes,
+        batched_modes=[mode == "batched" for mode in args.modes],
+        batch_size=args.batch_size,
+        device=args.device,
+        language=args.language,
+        transcribe_options=dict(initial_prompt=args.initial_prompt),
+    )
+    profile = save_profile(
+        args.output, results, args.target_cer, audio.shape[0] / 16000
+    )
+
+    front = pareto_front(results)
+    print("%-44s %7s %10s %7s" % ("configuration", "RTF", "peak RSS", "CER"))
+    for result in sorted(results, key=lambda result: result.rtf):
+        marker = ">" if result == profile else "*" if result in front else " "
+        print(
+            "%s %-42s %7.3f %8dMB %6.2f%%"
+            % (
+                marker,
+                result.name,
+                result.rtf,
+                result.peak_rss // (1024 * 1024),
+                100 * result.cer,
+            )
+        )
+    print("* Pareto front, > selected profile saved to %s" % args.output)
+
+
+if __name__ == "__main__":
+    main()
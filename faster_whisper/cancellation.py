@@ -0,0 +1,70 @@
+"""Cooperative cancellation of transcriptions.
+
+A `CancellationToken` can be cancelled from any thread or expire after a timeout. The
+transcription checks it between its steps (VAD batches, windows, batches and fallback
+temperatures) and raises `TranscriptionCancelled`, so a running model call is completed
+first but no new one is started.
+"""
+
+import threading
+import time
+
+from typing import Optional
+
+
+class TranscriptionCancelled(Exception):
+    """Raised by a transcription when its token is cancelled or its deadline has passed."""
+
+
+class CancellationToken:
+    def __init__(
+        self,
+        timeout: Optional[float] = None,
+        parent: Optional["CancellationToken"] = None,
+    ):
+        """Initializes the token.
+
+        Arguments:
+          timeout: Number of seconds after which the token is cancelled.
+          parent: The token is also cancelled when this token is cancelled.
+        """
+        self.deadline = time.monotonic() + timeout if timeout is not None else None
+        self.parent = parent
+        self.reason = None
+        self._event = threading.Event()
+
+    def cancel(self, reason: str = "Transcription cancelled"):
+        if not self._event.is_set():
+            self.reason = reason
+            self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        if self._event.is_set():
+            return True
+        if self.deadline is not None and time.monotonic() >= self.deadline:
+            self.cancel("Transcription deadline exceeded")
+            return True
+        if self.parent is not None and self.parent.cancelled:
+            self.cancel(self.parent.reason)
+            return True
+        return False
+
+    def raise_if_cancelled(self):
+        if self.cancelled:
+            raise TranscriptionCancelled(self.reason)
+
+
+def get_cancellation_token(
+    cancellation_token: Optional[CancellationToken], deadline: Optional[float]
+) -> Optional[CancellationToken]:
+    """Returns the token checked by a transcription, combining the `cancellation_token`
+    and `deadline` arguments of `transcribe`."""
+    if deadline is None:
+        return cancellation_token
+    return CancellationToken(timeout=deadline, parent=cancellation_token)
+
+
+def check_cancelled(cancellation_token: Optional[CancellationToken]):
+    if cancellation_token is not None:
+        cancellation_token.raise_if_cancelled()
@@ -0,0 +1,193 @@
+import logging
+
+from dataclasses import dataclass, replace
+from typing import BinaryIO, List, Optional, Tuple, Union
+
+import numpy as np
+
+from faster_whisper.audio import decode_audio
+from faster_whisper.cancellation import get_cancellation_token
+from faster_whisper.transcribe import Segment, TranscriptionInfo, WhisperModel
+from faster_whisper.utils import format_timestamp, get_logger
+
+
+@dataclass
+class CascadeOptions:
+    """Cascade options.
+
+    Attributes:
+      log_prob_threshold: Segments of the fast model with an average log probability
+        lower than this value are decoded again by the accurate model.
+      compression_ratio_threshold: Segments of the fast model with a gzip compression ratio
+        higher than this value are decoded again by the accurate model.
+      max_merge_gap: Escalated segments separated by less than this number of seconds are
+        decoded together so the accurate model keeps the surrounding context.
+    """
+
+    log_prob_threshold: float = -0.7
+    compression_ratio_threshold: float = 2.4
+    max_merge_gap: float = 1.0
+
+
+@dataclass
+class CascadeInfo:
+    transcription_info: TranscriptionInfo
+    escalated_spans: List[Tuple[float, float]]
+    escalated_duration: float
+    num_segments: int
+    num_escalated_segments: int
+
+    @property
+    def escalated_fraction(self) -> float:
+        """Fraction of the audio duration that was decoded by the accurate model."""
+        duration = self.transcription_info.duration
+        return self.escalated_duration / duration if duration > 0 else 0.0
+
+
+class CascadeInferencePipeline:
+    """Two-pass transcription with a fast model and an accurate model.
+
+    The whole audio is first transcribed by the fast model. Only the segments with a low
+    confidence are decoded again by the accurate model, using their time spans as
+    `clip_timestamps`.
+    """
+
+    def __init__(
+        self,
+        fast_model: WhisperModel,
+        model: WhisperModel,
+    ):
+        self.fast_model = fast_model
+        self.model = model
+        self.logger = get_logger()
+
+    def transcribe(
+        self,
+        audio: Union[str, BinaryIO, np.ndarray],
+        cascade_parameters: Optional[Union[dict, CascadeOptions]] = None,
+        **kwargs,
+    ) -> Tuple[List[Segment], CascadeInfo]:
+        """Transcribes an input file with the fast model and escalates the low confidence
+        segments to the accurate model.
+
+        Arguments:
+          audio: Path to the input file (or a file-like object), or the audio waveform.
+          cascade_parameters: Dictionary of cascade parameters or CascadeOptions class
+            (see available parameters and default values in the class `CascadeOptions`).
+          kwargs: Arguments passed to `WhisperModel.transcribe` for both passes.
+            `clip_timestamps` is replaced by the escalated spans in the second pass.
+            The `progress_callback` only reports the first pass.
+
+        Returns:
+          A tuple with:
+
+            - the list of segments, sorted by start time
+            - an instance of CascadeInfo
+        """
+        if cascade_parameters is None:
+            cascade_parameters = CascadeOptions()
+        elif isinstance(cascade_parameters, dict):
+            cascade_parameters = CascadeOptions(**cascade_parameters)
+
+        sampling_rate = self.fast_model.feature_extractor.sampling_rate
+
+        # The deadline applies to both passes.
+        kwargs["cancellation_token"] = get_cancellation_token(
+            kwargs.pop("cancellation_token", None), kwargs.pop("deadline", None)
+        )
+
+        # Decode the audio once so both passes share the same waveform.
+        if not isinstance(audio, np.ndarray):
+            audio = decode_audio(audio, sampling_rate=sampling_rate)
+
+        segments, info = self.fast_model.transcribe(audio, **kwargs)
+        segments = list(segments)
+
+        escalated = [
+            segment
+            for segment in segments
+            if is_low_confidence_segment(segment, cascade_parameters)
+        ]
+        spans = [
+            (start, min(end, info.duration))
+            for start, end in merge_segment_spans(
+                escalated, cascade_parameters.max_merge_gap
+            )
+            if start < info.duration
+        ]
+        escalated_duration = sum(end - start for start, end in spans)
+
+        if spans:
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug(
+                    "Decoding the following spans with the accurate model: %s",
+                    ", ".join(
+                        "[%s -> %s]" % (format_timestamp(start), format_timestamp(end))
+                        for start, end in spans
+                    ),
+                )
+
+            accurate_kwargs = dict(kwargs)
+            accurate_kwargs["clip_timestamps"] = [
+                timestamp for span in spans for timestamp in span
+            ]
+            # Reuse the language from the first pass to skip the language detection.
+            accurate_kwargs["language"] = info.language
+            accurate_kwargs.pop("progress_callback", None)
+            accurate_segments, _ = self.model.transcribe(audio, **accurate_kwargs)
+
+            segments = replace_spans(segments, list(accurate_segments), spans)
+
+        cascade_info = CascadeInfo(
+            transcription_info=info,
+            escalated_spans=spans,
+            escalated_duration=escalated_duration,
+            num_segments=len(segments),
+            num_escalated_segments=len(escalated),
+        )
+
+        self.logger.info(
+            "Escalated %d segments (%.1f%% of the audio) to the accurate model",
+            len(escalated),
+            100 * cascade_info.escalated_fraction,
+        )
+
+        return segments, cascade_info
+
+
+def is_low_confidence_segment(segment: Segment, options: CascadeOptions) -> bool:
+    return (
+        segment.avg_logprob < options.log_prob_threshold
+        or segment.compression_ratio > options.compression_ratio_threshold
+    )
+
+
+def merge_segment_spans(
+    segments: List[Segment], max_merge_gap: float
+) -> List[Tuple[float, float]]:
+    spans = []
+
+    for segment in segments:
+        if spans and segment.start - spans[-1][1] < max_merge_gap:
+            spans[-1] = (spans[-1][0], max(spans[-1][1], segment.end))
+        else:
+            spans.append((segment.start, segment.end))
+
+    return spans
+
+
+def replace_spans(
+    segments: List[Segment],
+    accurate_segments: List[Segment],
+    spans: List[Tuple[float, float]],
+) -> List[Segment]:
+    """Replaces the segments inside the escalated spans by the accurate segments."""
+
+    def in_spans(segment: Segment) -> bool:
+        middle = (segment.start + segment.end) / 2
+        return any(start <= middle <= end for start, end in spans)
+
+    kept = [segment for segment in segments if not in_spans(segment)]
+    merged = sorted(kept + accurate_segments, key=lambda segment: segment.start)
+
+    return [replace(segment, id=i) for i, segment in enumerate(merged, start=1)]
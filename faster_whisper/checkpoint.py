@@ -0,0 +1,152 @@
+import hashlib
+import json
+import os
+import time
+
+from dataclasses import asdict, dataclass, field
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from faster_whisper.utils import get_logger
+
+
+@dataclass
+class TranscriptionState:
+    """State of a transcription saved in a checkpoint.
+
+    Attributes:
+      fingerprint: Hash of the audio and the transcription arguments. A checkpoint is
+        only resumed for the same audio and arguments.
+      language: Language of the transcription.
+      language_probability: Probability of the detected language.
+      all_language_probs: Probabilities of all languages.
+      speech_chunks: Speech chunks found by the VAD, or None without VAD.
+      segments: Segments already generated by `WhisperModel.generate_segments`, before
+        the VAD timestamps are restored.
+      seek: Position of the next window in frames, or None if the decoding has not
+        started.
+      clip_idx: Index of the current clip.
+      all_tokens: Tokens used to build the prompt of the next window.
+      prompt_reset_since: Index in `all_tokens` where the prompt starts.
+      last_speech_timestamp: End of the last word, used by the word timestamps.
+      tokenizer_language: Language code of the tokenizer in multilingual mode.
+      chunk_segments: Segments of each chunk already decoded by
+        `BatchedInferencePipeline`.
+      finished: True if all the segments were generated.
+    """
+
+    fingerprint: str
+    language: str
+    language_probability: float
+    all_language_probs: Optional[List[Tuple[str, float]]]
+    speech_chunks: Optional[List[dict]]
+    segments: List[dict] = field(default_factory=list)
+    seek: Optional[int] = None
+    clip_idx: int = 0
+    all_tokens: List[int] = field(default_factory=list)
+    prompt_reset_since: int = 0
+    last_speech_timestamp: float = 0.0
+    tokenizer_language: Optional[str] = None
+    chunk_segments: Dict[int, List[dict]] = field(default_factory=dict)
+    finished: bool = False
+
+
+class TranscriptionCheckpoint:
+    """Saves the state of a transcription periodically to a JSON file.
+
+    The file is replaced atomically, so a process killed while saving leaves the
+    previous checkpoint intact.
+    """
+
+    def __init__(self, path: str, interval: float = 60.0):
+        """Initializes the checkpoint.
+
+        Arguments:
+          path: Path to the checkpoint file.
+          interval: Minimum number of seconds between two saves.
+        """
+        self.path = path
+        self.interval = interval
+        self.logger = get_logger()
+        self._last_save = time.monotonic()
+
+    def load(self, fingerprint: str) -> Optional[TranscriptionState]:
+        """Returns the saved state if it matches the fingerprint."""
+        if not os.path.isfile(self.path):
+            return None
+
+        with open(self.path, encoding="utf-8") as f:
+            state = json.load(f)
+
+        if state.get("fingerprint") != fingerprint:
+            self.logger.warning(
+                "Ignoring the checkpoint %s which was saved for another audio or other "
+                "transcription options",
+                self.path,
+            )
+            return None
+
+        if state["all_language_probs"] is not None:
+            state["all_language_probs"] = [
+                tuple(language_prob) for language_prob in state["all_language_probs"]
+            ]
+        state["chunk_segments"] = {
+            int(index): segments
+            for index, segments in state.get("chunk_segments", {}).items()
+        }
+        state = TranscriptionState(**state)
+
+        self.logger.info(
+            "Resuming the transcription from the checkpoint %s (%d segments)",
+            self.path,
+            len(state.segments)
+            + sum(len(segments) for segments in state.chunk_segments.values()),
+        )
+        return state
+
+    def save(self, state: TranscriptionState):
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(asdict(state), f, ensure_ascii=False, default=_to_json)
+        os.replace(tmp_path, self.path)
+        self._last_save = time.monotonic()
+
+    def maybe_save(self, state: TranscriptionState):
+        """Saves the state if the last save is older than the interval."""
+        if time.monotonic() - self._last_save >= self.interval:
+            self.save(state)
+
+
+def get_fingerprint(audio, arguments: dict) -> str:
+    """Hashes the audio and the transcription arguments.
+
+    Arguments:
+      audio: The waveform, or the hash of a waveform read block by block (see
+        `hash_blocks`).
+      arguments: The transcription arguments.
+    """
+    fingerprint = hashlib.sha1()
+    if isinstance(audio, np.ndarray):
+        fingerprint.update(np.ascontiguousarray(audio).tobytes())
+    elif audio is not None:
+        fingerprint.update(audio.digest())
+    fingerprint.update(
+        json.dumps(arguments, sort_keys=True, default=repr).encode("utf-8")
+    )
+    return fingerprint.hexdigest()
+
+
+def hash_blocks(blocks: Iterable[np.ndarray], audio_hash) -> Iterator[np.ndarray]:
+    """Yields the audio blocks and adds them to `audio_hash`, so a long audio is hashed
+    while it is read for another purpose."""
+    for block in blocks:
+        audio_hash.update(np.ascontiguousarray(block).tobytes())
+        yield block
+
+
+def _to_json(value):
+    # NumPy scalars are converted to the equivalent Python numbers.
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError("Object of type %s is not JSON serializable" % type(value).__name__)
@@ -0,0 +1,338 @@
+"""Columnar storage of transcription results.
+
+A `Segment` holds a list of tokens and a list of `Word` objects, so a long meeting with
+word timestamps is stored as hundreds of thousands of small Python objects. The
+`CompactSegments` container stores the same values in a few NumPy arrays: one entry per
+segment for the segment fields, flat arrays with offsets for the tokens and the words,
+and a single string with offsets for the texts. `SegmentView` and `WordView` objects are
+only created when a segment or a word is accessed.
+"""
+
+import array
+import io
+
+from typing import Iterable, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+from faster_whisper.transcribe import Segment, Word
+
+_SEGMENT_COLUMNS = {
+    "id": "q",
+    "seek": "q",
+    "start": "d",
+    "end": "d",
+    "avg_logprob": "d",
+    "compression_ratio": "d",
+    "no_speech_prob": "d",
+    "temperature": "d",
+}
+
+_WORD_COLUMNS = {
+    "start": "d",
+    "end": "d",
+    "probability": "d",
+}
+
+
+class CompactSegmentsBuilder:
+    """Appends segments to growing arrays, without keeping the segment objects."""
+
+    def __init__(self):
+        self._segment_columns = {
+            name: array.array(typecode) for name, typecode in _SEGMENT_COLUMNS.items()
+        }
+        self._word_columns = {
+            name: array.array(typecode) for name, typecode in _WORD_COLUMNS.items()
+        }
+        self._tokens = array.array("i")
+        self._token_offsets = array.array("q", [0])
+        self._text = io.StringIO()
+        self._text_offsets = array.array("q", [0])
+        self._word_text = io.StringIO()
+        self._word_text_offsets = array.array("q", [0])
+        self._word_offsets = array.array("q", [0])
+        self._has_words = array.array("b")
+
+    def append(self, segment: Segment):
+        columns = self._segment_columns
+        columns["id"].append(segment.id)
+        columns["seek"].append(segment.seek)
+        columns["start"].append(segment.start)
+        columns["end"].append(segment.end)
+        columns["avg_logprob"].append(segment.avg_logprob)
+        columns["compression_ratio"].append(segment.compression_ratio)
+        columns["no_speech_prob"].append(segment.no_speech_prob)
+        columns["temperature"].append(
+            np.nan if segment.temperature is None else segment.temperature
+        )
+
+        self._tokens.extend(segment.tokens)
+        self._token_offsets.append(len(self._tokens))
+        self._text.write(segment.text)
+        self._text_offsets.append(self._text_offsets[-1] + len(segment.text))
+
+        self._has_words.append(segment.words is not None)
+        for word in segment.words or []:
+            self._word_columns["start"].append(word.start)
+            self._word_columns["end"].append(word.end)
+            self._word_columns["probability"].append(word.probability)
+            self._word_text.write(word.word)
+            self._word_text_offsets.append(self._word_text_offsets[-1] + len(word.word))
+        self._word_offsets.append(len(self._word_columns["start"]))
+
+    def build(self) -> "CompactSegments":
+        """Returns the container. The arrays share the memory of the builder, so no
+        segment can be appended afterwards."""
+        return CompactSegments(
+            segment_columns={
+                name: np.frombuffer(values, dtype=values.typecode)
+                for name, values in self._segment_columns.items()
+            },
+            tokens=np.frombuffer(self._tokens, dtype=np.int32),
+            token_offsets=np.frombuffer(self._token_offsets, dtype=np.int64),
+            text=self._text.getvalue(),
+            text_offsets=np.frombuffer(self._text_offsets, dtype=np.int64),
+            has_words=np.frombuffer(self._has_words, dtype=np.int8).astype(bool),
+            word_columns={
+                name: np.frombuffer(values, dtype=values.typecode)
+                for name, values in self._word_columns.items()
+            },
+            word_offsets=np.frombuffer(self._word_offsets, dtype=np.int64),
+            word_text=self._word_text.getvalue(),
+            word_text_offsets=np.frombuffer(self._word_text_offsets, dtype=np.int64),
+        )
+
+
+class CompactSegments(Sequence):
+    """Transcription segments stored in NumPy arrays.
+
+    The container is a sequence of `SegmentView`. The arrays can also be used directly,
+    e.g. `segments.columns["start"]` or `segments.word_columns["probability"]`.
+
+    Attributes:
+      columns: One array per `Segment` field with a single value: id, seek, start, end,
+        avg_logprob, compression_ratio, no_speech_prob and temperature (NaN for None).
+      tokens: The tokens of all segments. The tokens of the segment `i` are
+        `tokens[token_offsets[i]:token_offsets[i + 1]]`.
+      token_offsets: Offsets of the segments in `tokens`.
+      text: The texts of all segments, delimited by `text_offsets`.
+      text_offsets: Offsets of the segments in `text`.
+      has_words: False for the segments without word timestamps.
+      word_columns: One array per `Word` field with a single value: start, end and
+        probability.
+      word_offsets: Offsets of the segments in the word arrays.
+      word_text: The texts of all words, delimited by `word_text_offsets`.
+      word_text_offsets: Offsets of the words in `word_text`.
+    """
+
+    def __init__(
+        self,
+        segment_columns: dict,
+        tokens: np.ndarray,
+        token_offsets: np.ndarray,
+        text: str,
+        text_offsets: np.ndarray,
+        has_words: np.ndarray,
+        word_columns: dict,
+        word_offsets: np.ndarray,
+        word_text: str,
+        word_text_offsets: np.ndarray,
+    ):
+        self.columns = segment_columns
+        self.tokens = tokens
+        self.token_offsets = token_offsets
+        self.text = text
+        self.text_offsets = text_offsets
+        self.has_words = has_words
+        self.word_columns = word_columns
+        self.word_offsets = word_offsets
+        self.word_text = word_text
+        self.word_text_offsets = word_text_offsets
+
+    @classmethod
+    def from_segments(cls, segments: Iterable[Segment]) -> "CompactSegments":
+        """Consumes the segments, which can be the generator returned by `transcribe`."""
+        builder = CompactSegmentsBuilder()
+        for segment in segments:
+            builder.append(segment)
+        return builder.build()
+
+    def __len__(self) -> int:
+        return self.token_offsets.shape[0] - 1
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("segment index out of range")
+        return SegmentView(self, index)
+
+    def __iter__(self) -> Iterator["SegmentView"]:
+        for index in range(len(self)):
+            yield SegmentView(self, index)
+
+    @property
+    def num_words(self) -> int:
+        return self.word_offsets[-1].item()
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory used by the container."""
+        arrays = [
+            self.tokens,
+            self.token_offsets,
+            self.text_offsets,
+            self.has_words,
+            self.word_offsets,
+            self.word_text_offsets,
+            *self.columns.values(),
+            *self.word_columns.values(),
+        ]
+        return (
+            sum(values.nbytes for values in arrays)
+            + len(self.text.encode("utf-8"))
+            + len(self.word_text.encode("utf-8"))
+        )
+
+    def get_text(self, index: int) -> str:
+        return self.text[self.text_offsets[index] : self.text_offsets[index + 1]]
+
+    def get_tokens(self, index: int) -> np.ndarray:
+        return self.tokens[self.token_offsets[index] : self.token_offsets[index + 1]]
+
+    def with_texts(self, texts: List[str]) -> "CompactSegments":
+        """Returns a container with other segment texts, sharing the other arrays."""
+        if len(texts) != len(self):
+            raise ValueError("Expected %d texts, got %d" % (len(self), len(texts)))
+
+        text_offsets = np.zeros(len(texts) + 1, dtype=np.int64)
+        np.cumsum([len(text) for text in texts], out=text_offsets[1:])
+
+        return CompactSegments(
+            segment_columns=self.columns,
+            tokens=self.tokens,
+            token_offsets=self.token_offsets,
+            text="".join(texts),
+            text_offsets=text_offsets,
+            has_words=self.has_words,
+            word_columns=self.word_columns,
+            word_offsets=self.word_offsets,
+            word_text=self.word_text,
+            word_text_offsets=self.word_text_offsets,
+        )
+
+    def to_segments(self) -> List[Segment]:
+        return [segment.to_segment() for segment in self]
+
+
+def _column(name: str):
+    return property(lambda self: self._segments.columns[name][self._index].item())
+
+
+def _word_column(name: str):
+    return property(lambda self: self._segments.word_columns[name][self._index].item())
+
+
+class SegmentView:
+    """Read-only view of a segment in `CompactSegments`, with the fields of `Segment`."""
+
+    __slots__ = ("_segments", "_index")
+
+    def __init__(self, segments: CompactSegments, index: int):
+        self._segments = segments
+        self._index = index
+
+    id = _column("id")
+    seek = _column("seek")
+    start = _column("start")
+    end = _column("end")
+    avg_logprob = _column("avg_logprob")
+    compression_ratio = _column("compression_ratio")
+    no_speech_prob = _column("no_speech_prob")
+
+    @property
+    def temperature(self) -> Optional[float]:
+        temperature = self._segments.columns["temperature"][self._index].item()
+        return None if np.isnan(temperature) else temperature
+
+    @property
+    def text(self) -> str:
+        return self._segments.get_text(self._index)
+
+    @property
+    def tokens(self) -> List[int]:
+        return self._segments.get_tokens(self._index).tolist()
+
+    @property
+    def words(self) -> Optional[List["WordView"]]:
+        segments = self._segments
+        if not segments.has_words[self._index]:
+            return None
+        return [
+            WordView(segments, index)
+            for index in range(
+                segments.word_offsets[self._index],
+                segments.word_offsets[self._index + 1],
+            )
+        ]
+
+    def to_segment(self) -> Segment:
+        words = self.words
+        return Segment(
+            id=self.id,
+            seek=self.seek,
+            start=self.start,
+            end=self.end,
+            text=self.text,
+            tokens=self.tokens,
+            avg_logprob=self.avg_logprob,
+            compression_ratio=self.compression_ratio,
+            no_speech_prob=self.no_speech_prob,
+            words=None if words is None else [word.to_word() for word in words],
+            temperature=self.temperature,
+        )
+
+    def __repr__(self) -> str:
+        return "SegmentView(id=%d, start=%.3f, end=%.3f, text=%r)" % (
+            self.id,
+            self.start,
+            self.end,
+            self.text,
+        )
+
+
+class WordView:
+    """Read-only view of a word in `CompactSegments`, with the fields of `Word`."""
+
+    __slots__ = ("_segments", "_index")
+
+    def __init__(self, segments: CompactSegments, index: int):
+        self._segments = segments
+        self._index = index
+
+    start = _word_column("start")
+    end = _word_column("end")
+    probability = _word_column("probability")
+
+    @property
+    def word(self) -> str:
+        offsets = self._segments.word_text_offsets
+        return self._segments.word_text[offsets[self._index] : offsets[self._index + 1]]
+
+    def to_word(self) -> Word:
+        return Word(
+            start=self.start,
+            end=self.end,
+            word=self.word,
+            probability=self.probability,
+        )
+
+    def __repr__(self) -> str:
+        return "WordView(start=%.3f, end=%.3f, word=%r)" % (
+            self.start,
+            self.end,
+            self.word,
+        )
@@ -1,3 +1,5 @@
+from concurrent.futures import ThreadPoolExecutor
+
 import numpy as np
 
 
@@ -9,8 +11,10 @@ class FeatureExtractor:
         hop_length=160,
         chunk_length=30,
         n_fft=400,
+        fft_workers=1,
     ):
         self.n_fft = n_fft
+        self.fft_workers = fft_workers
         self.hop_length = hop_length
         self.chunk_length = chunk_length
         self.n_samples = chunk_length * sampling_rate
@@ -20,6 +24,7 @@ class FeatureExtractor:
         self.mel_filters = self.get_mel_filters(
             sampling_rate, n_fft, n_mels=feature_size
         ).astype("float32")
+        self.window = np.hanning(n_fft + 1)[:-1].astype("float32")
 
     @staticmethod
     def get_mel_filters(sr, n_fft, n_mels=128):
@@ -76,6 +81,7 @@ class FeatureExtractor:
         normalized: bool = False,
         onesided: bool = None,
         return_complex: bool = None,
+        workers: int = 1,
     ):
         # Default initialization for hop_length and win_length
         hop_length = hop_length if hop_length is not None else n_fft // 4
@@ -167,9 +173,6 @@ class FeatureExtractor:
             ),
         )
 
-        if window_ is not None:
-            input_array = input_array * window_
-
         # FFT and transpose
         complex_fft = input_is_complex
         onesided = onesided if onesided is not None else not complex_fft
@@ -179,14 +182,29 @@ class FeatureExtractor:
         else:
             norm = None
 
-        if complex_fft:
-            if onesided:
-                raise ValueError(
-                    "Cannot have onesided output if window or input is complex"
+        if complex_fft and onesided:
+            raise ValueError(
+                "Cannot have onesided output if window or input is complex"
+            )
+
+        def transform(frames):
+            if window_ is not None:
+                frames = frames * window_
+            if complex_fft:
+                return np.fft.fft(frames, n=n_fft, axis=-1, norm=norm)
+            return np.fft.rfft(frames, n=n_fft, axis=-1, norm=norm)
+
+        # NumPy computes the FFT on a single thread but releases the GIL, so the frames
+        # are split between the workers (from 10 seconds of audio per worker).
+        workers = min(workers, n_frames // 1000)
+        if workers > 1:
+            with ThreadPoolExecutor(workers) as executor:
+                outputs = executor.map(
+                    transform, np.array_split(input_array, workers, axis=1)
                 )
-            output = np.fft.fft(input_array, n=n_fft, axis=-1, norm=norm)
+                output = np.concatenate(list(outputs), axis=1)
         else:
-            output = np.fft.rfft(input_array, n=n_fft, axis=-1, norm=norm)
+            output = transform(input_array)
 
         output = output.transpose((0, 2, 1))
 
@@ -210,14 +228,13 @@ class FeatureExtractor:
         if padding:
             waveform = np.pad(waveform, (0, padding))
 
-        window = np.hanning(self.n_fft + 1)[:-1].astype("float32")
-
         stft = self.stft(
             waveform,
             self.n_fft,
             self.hop_length,
-            window=window,
+            window=self.window,
             return_complex=True,
+            workers=self.fft_workers,
         ).astype("complex64")
         magnitudes = np.abs(stft[..., :-1]) ** 2
 
@@ -228,3 +245,23 @@ class FeatureExtractor:
         log_spec = (log_spec + 4.0) / 4.0
 
         return log_spec
+
+    def log_mel_frames(self, padded_waveform: np.ndarray) -> np.ndarray:
+        """
+        Compute the log-Mel frames of a waveform that is already padded on both sides,
+        without the normalization applied by `__call__`.
+        """
+        stft = self.stft(
+            padded_waveform.astype(np.float32, copy=False),
+            self.n_fft,
+            self.hop_length,
+            window=self.window,
+            center=False,
+            return_complex=True,
+            workers=self.fft_workers,
+        ).astype("complex64")
+        magnitudes = np.abs(stft) ** 2
+
+        mel_spec = self.mel_filters @ magnitudes
+
+        return np.log10(np.clip(mel_spec, a_min=1e-10, a_max=None))
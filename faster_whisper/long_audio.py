@@ -0,0 +1,259 @@
+"""Bounded-memory features for long audio files.
+
+The waveform and the log-Mel spectrogram of a long recording take several hundred MB.
+In the long audio mode, the audio is instead read again from its source for each pass
+and the features of a window are only computed when the window is decoded. The result
+is identical to the features returned by `FeatureExtractor.__call__`.
+"""
+
+from typing import BinaryIO, Iterator, List, Optional, Union
+
+import numpy as np
+
+from faster_whisper.audio import decode_audio_blocks
+from faster_whisper.feature_extractor import FeatureExtractor
+
+
+class AudioSource:
+    """Audio that can be read several times block by block.
+
+    Files are decoded again on each pass, so the whole waveform is never in memory.
+    File-like objects must be seekable.
+    """
+
+    def __init__(
+        self,
+        audio: Union[str, BinaryIO, np.ndarray],
+        sampling_rate: int = 16000,
+        block_size: int = 480000,
+    ):
+        self.audio = audio
+        self.sampling_rate = sampling_rate
+        self.block_size = block_size
+
+    def blocks(self) -> Iterator[np.ndarray]:
+        """Yields the audio in consecutive float32 blocks."""
+        if isinstance(self.audio, np.ndarray):
+            for start in range(0, self.audio.shape[0], self.block_size):
+                yield self.audio[start : start + self.block_size]
+            return
+
+        if not isinstance(self.audio, str):
+            self.audio.seek(0)
+
+        yield from decode_audio_blocks(self.audio, sampling_rate=self.sampling_rate)
+
+    def get_num_samples(self) -> int:
+        if isinstance(self.audio, np.ndarray):
+            return self.audio.shape[0]
+        return sum(block.shape[0] for block in self.blocks())
+
+
+def iter_speech_blocks(
+    blocks: Iterator[np.ndarray], speech_chunks: Optional[List[dict]] = None
+) -> Iterator[np.ndarray]:
+    """Yields the parts of the blocks inside the speech chunks, as `collect_chunks`
+    would concatenate them."""
+    if speech_chunks is None:
+        yield from blocks
+        return
+
+    offset = 0
+    chunk_index = 0
+
+    for block in blocks:
+        block_end = offset + block.shape[0]
+
+        while chunk_index < len(speech_chunks):
+            chunk = speech_chunks[chunk_index]
+            start = max(chunk["start"], offset)
+            end = min(chunk["end"], block_end)
+            if start < end:
+                yield block[start - offset : end - offset]
+            if chunk["end"] > block_end:
+                break
+            chunk_index += 1
+
+        offset = block_end
+
+
+def get_speech_num_samples(speech_chunks: List[dict], num_samples: int) -> int:
+    return sum(
+        max(0, min(chunk["end"], num_samples) - chunk["start"])
+        for chunk in speech_chunks
+    )
+
+
+class SpeechAudioReader:
+    """Reads sample ranges of the concatenated speech audio.
+
+    The reader only keeps the samples after the start of the last read, so consecutive
+    reads must be mostly increasing. Reading before the kept samples restarts from the
+    beginning of the source.
+    """
+
+    def __init__(
+        self,
+        source: AudioSource,
+        speech_chunks: Optional[List[dict]],
+        num_samples: int,
+    ):
+        self.source = source
+        self.speech_chunks = speech_chunks
+        self.num_samples = num_samples
+        self._blocks = None
+        self._buffer = None
+        self._buffer_start = 0
+
+    def _reset(self):
+        self._blocks = iter_speech_blocks(self.source.blocks(), self.speech_chunks)
+        self._buffer = np.zeros((0,), dtype=np.float32)
+        self._buffer_start = 0
+
+    def read(self, start: int, end: int) -> np.ndarray:
+        """Returns the samples in [start, end), zero padded after the end of the audio."""
+        if self._blocks is None or start < self._buffer_start:
+            self._reset()
+
+        # Discard the samples before the requested range.
+        drop = min(start - self._buffer_start, self._buffer.shape[0])
+        self._buffer = self._buffer[drop:]
+        self._buffer_start += drop
+
+        parts = [self._buffer]
+        buffer_end = self._buffer_start + self._buffer.shape[0]
+        while buffer_end < min(end, self.num_samples):
+            block = next(self._blocks, None)
+            if block is None:
+                break
+            if buffer_end + block.shape[0] <= start:
+                # The block is entirely before the requested range.
+                self._buffer_start += block.shape[0]
+                buffer_end += block.shape[0]
+                continue
+            parts.append(block)
+            buffer_end += block.shape[0]
+
+        if len(parts) > 1:
+            self._buffer = np.concatenate(parts)
+            skip = max(0, start - self._buffer_start)
+            self._buffer = self._buffer[skip:]
+            self._buffer_start += skip
+
+        samples = self._buffer[start - self._buffer_start : end - self._buffer_start]
+        if samples.shape[0] < end - start:
+            samples = np.pad(samples, (0, end - start - samples.shape[0]))
+        return samples
+
+
+class LongAudioFeatures:
+    """Log-Mel features of a long audio, computed window by window.
+
+    The object supports `shape` and slicing on the last axis like the array returned by
+    `FeatureExtractor.__call__`, which is the only access made by
+    `WhisperModel.generate_segments`. The normalization uses the global maximum, which
+    is computed in a first pass over the audio.
+    """
+
+    def __init__(
+        self,
+        feature_extractor: FeatureExtractor,
+        source: AudioSource,
+        speech_chunks: Optional[List[dict]],
+        num_samples: int,
+        chunk_length: Optional[int] = None,
+        frames_per_block: int = 3000,
+    ):
+        """Initializes the features.
+
+        Arguments:
+          feature_extractor: The feature extractor of the model.
+          source: The audio source.
+          speech_chunks: Speech chunks kept by the VAD in the source, or None to use
+            the whole audio.
+          num_samples: Number of samples in the source.
+          chunk_length: Overwrites the chunk length of the feature extractor, like
+            `FeatureExtractor.__call__`.
+          frames_per_block: Minimum number of frames computed at once. Smaller products
+            with the Mel filters can round differently than the full spectrogram.
+        """
+        if chunk_length is not None:
+            feature_extractor.n_samples = chunk_length * feature_extractor.sampling_rate
+            feature_extractor.nb_max_frames = (
+                feature_extractor.n_samples // feature_extractor.hop_length
+            )
+
+        if speech_chunks is not None:
+            num_samples = get_speech_num_samples(speech_chunks, num_samples)
+
+        self.feature_extractor = feature_extractor
+        self.reader = SpeechAudioReader(source, speech_chunks, num_samples)
+        self.num_samples = num_samples
+        self.frames_per_block = frames_per_block
+
+        # Same padding as `FeatureExtractor.__call__`.
+        self.padding = 160
+        self.num_frames = (num_samples + self.padding) // feature_extractor.hop_length
+        self.shape = (feature_extractor.mel_filters.shape[0], self.num_frames)
+
+        if (
+            self.num_frames <= frames_per_block
+            or num_samples <= feature_extractor.n_fft
+        ):
+            # The audio is short enough to compute the features directly.
+            self._features = feature_extractor(self.reader.read(0, num_samples))
+            self._max = None
+        else:
+            self._features = None
+            self._max = max(
+                self._get_log_mel(start, min(start + frames_per_block, self.num_frames))
+                .max()
+                .item()
+                for start in range(0, self.num_frames, frames_per_block)
+            )
+
+    def __getitem__(self, key) -> np.ndarray:
+        if self._features is not None:
+            return self._features[key]
+
+        if not isinstance(key, tuple):
+            key = (key,)
+        if len(key) != 2 or key[0] not in (slice(None), Ellipsis):
+            raise IndexError("Only slices on the frames axis are supported")
+
+        start, stop, step = key[1].indices(self.num_frames)
+        if step != 1:
+            raise IndexError("Only contiguous slices are supported")
+        if start >= stop:
+            return np.zeros((self.shape[0], 0), dtype=np.float32)
+
+        log_spec = self._get_log_mel(start, stop)
+        log_spec = np.maximum(log_spec, self._max - 8.0)
+        log_spec = (log_spec + 4.0) / 4.0
+        return log_spec
+
+    def _get_log_mel(self, start: int, stop: int) -> np.ndarray:
+        """Returns the unnormalized log-Mel frames in [start, stop)."""
+        first = max(0, min(start, stop - self.frames_per_block))
+        last = min(self.num_frames, max(stop, first + self.frames_per_block))
+        hop_length = self.feature_extractor.hop_length
+        n_fft = self.feature_extractor.n_fft
+
+        waveform = self._read_padded(
+            first * hop_length, (last - 1) * hop_length + n_fft
+        )
+        log_spec = self.feature_extractor.log_mel_frames(waveform)
+        return log_spec[:, start - first : stop - first]
+
+    def _read_padded(self, start: int, end: int) -> np.ndarray:
+        """Reads the audio padded with zeros and reflected on both sides, as in the
+        centered STFT of `FeatureExtractor.__call__`."""
+        pad = self.feature_extractor.n_fft // 2
+        length = self.num_samples + self.padding
+
+        indices = np.abs(np.arange(start, end) - pad)
+        indices = np.where(indices >= length, 2 * (length - 1) - indices, indices)
+
+        low = indices.min()
+        samples = self.reader.read(low, indices.max() + 1)
+        return samples[indices - low]
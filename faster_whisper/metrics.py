@@ -0,0 +1,352 @@
+"""Stage metrics of the transcription jobs.
+
+A `ResourceSampler` samples the process memory and CPU usage on a background thread
+into a ring buffer, and `JobMetrics` times the stages of a job (audio decoding,
+transcription, post-processing, diarization, LLM analysis, document writing) with the
+resource usage during each stage:
+
+    sampler = ResourceSampler().start()
+    metrics = JobMetrics("meeting", sampler)
+    metrics.start_stage("stt")
+    ...
+    metrics.start_stage("llm_analysis")  # ends the previous stage
+    ...
+    metrics.finish()
+    metrics.save_json("meeting_metrics.json")
+    metrics.write_prometheus("/var/lib/node_exporter/textfile/stt.prom")
+
+The Prometheus file is meant for the textfile collector of the node exporter.
+"""
+
+import collections
+import json
+import os
+import threading
+import time
+
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from typing import Dict, Iterator, List, Optional
+
+
+@dataclass
+class ResourceSample:
+    """Resource usage of the process.
+
+    Attributes:
+      time: `time.monotonic()` value of the sample.
+      rss: Resident memory in bytes.
+      cpu_percent: CPU usage since the previous sample, 100 for one busy core.
+    """
+
+    time: float
+    rss: int
+    cpu_percent: float
+
+
+class ResourceSampler:
+    """Samples the resource usage of the current process on a background thread."""
+
+    def __init__(self, interval: float = 1.0, capacity: int = 3600):
+        """Initializes the sampler.
+
+        Arguments:
+          interval: Number of seconds between two samples.
+          capacity: Number of samples kept, the oldest samples are dropped.
+        """
+        try:
+            import psutil
+        except ImportError as e:
+            raise RuntimeError("psutil is required to sample the resource usage") from e
+
+        self.interval = interval
+        self._process = psutil.Process()
+        self._samples = collections.deque(maxlen=capacity)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+        # The first call of cpu_percent only starts the measurement.
+        self._process.cpu_percent()
+
+    def start(self) -> "ResourceSampler":
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._run, name="resource-sampler", daemon=True
+            )
+            self._thread.start()
+        return self
+
+    def stop(self):
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self) -> "ResourceSampler":
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def sample(self) -> ResourceSample:
+        """Takes a sample now and adds it to the buffer."""
+        with self._lock:
+            sample = ResourceSample(
+                time=time.monotonic(),
+                rss=self._process.memory_info().rss,
+                cpu_percent=self._process.cpu_percent(),
+            )
+            self._samples.append(sample)
+        return sample
+
+    @property
+    def latest(self) -> Optional[ResourceSample]:
+        with self._lock:
+            return self._samples[-1] if self._samples else None
+
+    def samples(
+        self, start: Optional[float] = None, end: Optional[float] = None
+    ) -> List[ResourceSample]:
+        """Returns the buffered samples taken between the `time.monotonic()` values
+        `start` and `end`."""
+        with self._lock:
+            return [
+                sample
+                for sample in self._samples
+                if (start is None or sample.time >= start)
+                and (end is None or sample.time <= end)
+            ]
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.sample()
+
+
+@dataclass
+class StageMetrics:
+    """Duration and resource usage of a job stage.
+
+    Attributes:
+      name: Name of the stage.
+      start: Start of the stage in seconds since the job start.
+      duration: Duration in seconds.
+      peak_rss: Maximum resident memory in bytes, None without sampler.
+      mean_cpu_percent: Mean CPU usage, None without sampler.
+    """
+
+    name: str
+    start: float
+    duration: float
+    peak_rss: Optional[int] = None
+    mean_cpu_percent: Optional[float] = None
+
+
+@dataclass
+class _RunningStage:
+    name: str
+    start: float
+
+
+class JobMetrics:
+    """Stage metrics of a job."""
+
+    def __init__(
+        self,
+        job_id: str,
+        sampler: Optional[ResourceSampler] = None,
+        labels: Optional[Dict[str, str]] = None,
+    ):
+        """Initializes the job metrics.
+
+        Arguments:
+          job_id: Identifier of the job, e.g. the audio file name.
+          sampler: Sampler of the resource usage, shared by the jobs of the process.
+          labels: Labels added to all Prometheus metrics, e.g. the application name.
+        """
+        self.job_id = job_id
+        self.sampler = sampler
+        self.labels = dict(labels or {})
+        self.stages: List[StageMetrics] = []
+        self.values: Dict[str, float] = {}
+        self.start_time = time.monotonic()
+        self.end_time = None
+        self.timestamp = time.time()
+        self._stage = None
+
+    def start_stage(self, name: str):
+        """Starts a stage, ending the running stage if any."""
+        self.end_stage()
+        self._stage = _RunningStage(name, time.monotonic())
+
+    def end_stage(self):
+        if self._stage is None:
+            return
+
+        end = time.monotonic()
+        stage = StageMetrics(
+            name=self._stage.name,
+            start=self._stage.start - self.start_time,
+            duration=end - self._stage.start,
+        )
+        if self.sampler is not None:
+            # A short stage may have no sample from the background thread.
+            self.sampler.sample()
+            samples = self.sampler.samples(self._stage.start)
+            stage.peak_rss = max(sample.rss for sample in samples)
+            stage.mean_cpu_percent = sum(
+                sample.cpu_percent for sample in samples
+            ) / len(samples)
+
+        self.stages.append(stage)
+        self._stage = None
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        self.start_stage(name)
+        try:
+            yield
+        finally:
+            self.end_stage()
+
+    def set_value(self, name: str, value: float):
+        """Records a job value, e.g. "audio_duration_seconds"."""
+        self.values[name] = value
+
+    def finish(self):
+        """Ends the running stage and the job."""
+        self.end_stage()
+        self.end_time = time.monotonic()
+
+    @property
+    def duration(self) -> float:
+        end_time = self.end_time if self.end_time is not None else time.monotonic()
+        return end_time - self.start_time
+
+    @property
+    def peak_rss(self) -> Optional[int]:
+        values = [stage.peak_rss for stage in self.stages if stage.peak_rss is not None]
+        return max(values) if values else None
+
+    def stage_durations(self) -> Dict[str, float]:
+        """Total duration of each stage name, in order of first occurrence."""
+        durations = {}
+        for stage in self.stages:
+            durations[stage.name] = durations.get(stage.name, 0.0) + stage.duration
+        return durations
+
+    def to_dict(self) -> dict:
+        return dict(
+            job_id=self.job_id,
+            timestamp=self.timestamp,
+            duration=self.duration,
+            peak_rss=self.peak_rss,
+            labels=self.labels,
+            values=self.values,
+            stages=[asdict(stage) for stage in self.stages],
+        )
+
+    def save_json(self, path: str):
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(self.to_dict(), file, indent=2, ensure_ascii=False)
+
+    def to_prometheus(self, prefix: str = "stt") -> str:
+        """Formats the metrics of the job in the Prometheus text format. The stages with
+        the same name are summed (duration) or maximized (memory)."""
+        metrics = _PrometheusText(prefix, self.labels)
+
+        metrics.add(
+            "job_duration_seconds",
+            "Duration of the last job.",
+            [({}, self.duration)],
+        )
+        metrics.add(
+            "job_end_timestamp_seconds",
+            "Unix time when the last job ended.",
+            [({}, self.timestamp + self.duration)],
+        )
+        if self.peak_rss is not None:
+            metrics.add(
+                "job_peak_rss_bytes",
+                "Peak resident memory during the last job.",
+                [({}, self.peak_rss)],
+            )
+        for name, value in self.values.items():
+            metrics.add("job_" + name, "Value of the last job.", [({}, value)])
+
+        metrics.add(
+            "stage_duration_seconds",
+            "Duration of the pipeline stages of the last job.",
+            [
+                (dict(stage=name), duration)
+                for name, duration in self.stage_durations().items()
+            ],
+        )
+
+        peak_rss = {}
+        cpu_percent = collections.defaultdict(list)
+        for stage in self.stages:
+            if stage.peak_rss is not None:
+                peak_rss[stage.name] = max(peak_rss.get(stage.name, 0), stage.peak_rss)
+                cpu_percent[stage.name].append(stage.mean_cpu_percent)
+        if peak_rss:
+            metrics.add(
+                "stage_peak_rss_bytes",
+                "Peak resident memory during the pipeline stages of the last job.",
+                [(dict(stage=name), value) for name, value in peak_rss.items()],
+            )
+            metrics.add(
+                "stage_cpu_percent",
+                "Mean CPU usage during the pipeline stages of the last job.",
+                [
+                    (dict(stage=name), sum(values) / len(values))
+                    for name, values in cpu_percent.items()
+                ],
+            )
+
+        return metrics.text()
+
+    def write_prometheus(self, path: str, prefix: str = "stt"):
+        """Writes the Prometheus textfile. The file is replaced atomically so the
+        collector never reads a partial file."""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = "%s.%d.tmp" % (path, os.getpid())
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            file.write(self.to_prometheus(prefix))
+        os.replace(tmp_path, path)
+
+
+@dataclass
+class _PrometheusText:
+    prefix: str
+    labels: Dict[str, str]
+    lines: List[str] = field(default_factory=list)
+
+    def add(self, name: str, help: str, samples: list):
+        name = "%s_%s" % (self.prefix, name)
+        self.lines.append("# HELP %s %s" % (name, help))
+        self.lines.append("# TYPE %s gauge" % name)
+        for labels, value in samples:
+            labels = dict(self.labels, **labels)
+            if labels:
+                label_text = ",".join(
+                    '%s="%s"' % (key, _escape_label_value(str(value)))
+                    for key, value in labels.items()
+                )
+                self.lines.append("%s{%s} %s" % (name, label_text, _format(value)))
+            else:
+                self.lines.append("%s %s" % (name, _format(value)))
+
+    def text(self) -> str:
+        return "\n".join(self.lines) + "\n"
+
+
+def _escape_label_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format(value: float) -> str:
+    return repr(float(value))
@@ -0,0 +1,287 @@
+"""Process-wide pool of loaded models.
+
+Loading a large model takes tens of seconds, and the first inference is also slow while
+CTranslate2 allocates its buffers. The pool loads each configuration once per process,
+runs a warmup transcription, and keeps the models resident until the memory budget is
+exceeded. The least recently used models are then evicted.
+
+The memory budget of the default pool used by `get_model` is read from the
+STT_MODEL_MEMORY_MB environment variable, or set with `configure_default_pool`.
+"""
+
+import gc
+import os
+import threading
+import time
+
+from collections import OrderedDict
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from faster_whisper.transcribe import WhisperModel
+from faster_whisper.utils import get_logger
+
+
+@dataclass
+class PooledModel:
+    """A model loaded by the pool.
+
+    Attributes:
+      key: The pool key (model, device, compute type, threads and other arguments).
+      model: The loaded model.
+      memory: Increase of the process resident memory while loading and warming up the
+        model in bytes, or None if psutil is not installed. It also includes the
+        models loaded at the same time by other threads.
+      load_time: Time to load and warm up the model in seconds.
+    """
+
+    key: Tuple
+    model: WhisperModel
+    memory: Optional[int]
+    load_time: float
+
+
+class ModelPool:
+    """Loads models once per process and evicts the least recently used ones."""
+
+    def __init__(self, memory_budget_mb: Optional[float] = None, warmup: bool = True):
+        """Initializes the pool.
+
+        Arguments:
+          memory_budget_mb: Maximum resident memory of the pooled models in MB. The least
+            recently used models are evicted when the budget is exceeded, but the last
+            requested model is always kept. Requires the psutil package.
+          warmup: Run a short transcription after loading a model.
+        """
+        try:
+            import psutil
+        except ImportError:
+            self.process = None
+        else:
+            self.process = psutil.Process()
+
+        self.memory_budget = None
+        self.warmup = warmup
+        self.logger = get_logger()
+        self._models = OrderedDict()
+        # Models being loaded, by key. Other threads requesting the same key wait for
+        # the future, the other keys are not blocked by the load.
+        self._loading = {}
+        self._lock = threading.Lock()
+        self.set_memory_budget(memory_budget_mb)
+
+    def set_memory_budget(self, memory_budget_mb: Optional[float]):
+        """Sets the memory budget in MB, or None for no budget. The models beyond the
+        new budget are evicted."""
+        if memory_budget_mb is not None and self.process is None:
+            raise RuntimeError(
+                "The model pool memory budget requires the psutil package"
+            )
+
+        with self._lock:
+            self.memory_budget = (
+                memory_budget_mb * 1024 * 1024 if memory_budget_mb is not None else None
+            )
+            self._enforce_budget()
+
+    def get(
+        self,
+        model_size_or_path: str,
+        device: str = "auto",
+        compute_type: str = "default",
+        cpu_threads: int = 0,
+        num_workers: int = 1,
+        **model_kwargs,
+    ) -> WhisperModel:
+        """Returns the model for these arguments, loading it if needed.
+
+        The arguments are the same as `WhisperModel`. Other keyword arguments must be
+        hashable since they are part of the pool key.
+        """
+        key = (
+            model_size_or_path,
+            device,
+            compute_type,
+            cpu_threads,
+            num_workers,
+            tuple(sorted(model_kwargs.items())),
+        )
+
+        with self._lock:
+            pooled = self._models.get(key)
+            if pooled is not None:
+                self._models.move_to_end(key)
+                return pooled.model
+
+            future = self._loading.get(key)
+            if future is None:
+                future = self._loading[key] = Future()
+                loading = True
+            else:
+                loading = False
+
+        if not loading:
+            # Another thread is loading this model.
+            return future.result()
+
+        try:
+            pooled = self._load(
+                key,
+                model_size_or_path,
+                device=device,
+                compute_type=compute_type,
+                cpu_threads=cpu_threads,
+                num_workers=num_workers,
+                **model_kwargs,
+            )
+        except BaseException as e:
+            with self._lock:
+                del self._loading[key]
+            future.set_exception(e)
+            raise
+
+        with self._lock:
+            del self._loading[key]
+            self._models[key] = pooled
+            self._enforce_budget()
+        future.set_result(pooled.model)
+        return pooled.model
+
+    @property
+    def models(self) -> List[PooledModel]:
+        """The pooled models, from the least to the most recently used."""
+        with self._lock:
+            return list(self._models.values())
+
+    @property
+    def memory_usage(self) -> int:
+        """Resident memory of the pooled models in bytes."""
+        with self._lock:
+            return sum(pooled.memory or 0 for pooled in self._models.values())
+
+    def evict(self, key: Tuple) -> bool:
+        """Removes a model from the pool. The memory is only released when the model is
+        no longer referenced outside the pool."""
+        with self._lock:
+            return self._evict(key)
+
+    def clear(self):
+        with self._lock:
+            for key in list(self._models):
+                self._evict(key)
+
+    def _load(self, key: Tuple, model_size_or_path: str, **kwargs) -> PooledModel:
+        start_rss = self._get_rss()
+        start_time = time.perf_counter()
+        model = WhisperModel(model_size_or_path, **kwargs)
+        if self.warmup:
+            warmup_model(model)
+        end_rss = self._get_rss()
+
+        pooled = PooledModel(
+            key=key,
+            model=model,
+            memory=(
+                max(0, end_rss - start_rss)
+                if start_rss is not None and end_rss is not None
+                else None
+            ),
+            load_time=time.perf_counter() - start_time,
+        )
+        self.logger.info(
+            "Loaded model %s on %s (%s) in %.1fs",
+            model_size_or_path,
+            kwargs["device"],
+            kwargs["compute_type"],
+            pooled.load_time,
+        )
+        return pooled
+
+    def _evict(self, key: Tuple) -> bool:
+        pooled = self._models.pop(key, None)
+        if pooled is None:
+            return False
+        self.logger.info("Evicting model %s on %s (%s)", *key[:3])
+        del pooled
+        gc.collect()
+        return True
+
+    def _enforce_budget(self):
+        if self.memory_budget is None:
+            return
+        while (
+            len(self._models) > 1
+            and sum(pooled.memory or 0 for pooled in self._models.values())
+            > self.memory_budget
+        ):
+            self._evict(next(iter(self._models)))
+
+    def _get_rss(self) -> Optional[int]:
+        if self.process is None:
+            return None
+        return self.process.memory_info().rss
+
+
+def warmup_model(model: WhisperModel):
+    """Transcribes one second of silence, so that the encoder and the beam search
+    allocate their buffers before the first request."""
+    audio = np.zeros(model.feature_extractor.sampling_rate, dtype=np.float32)
+    segments, _ = model.transcribe(
+        audio, language="en", temperature=0, max_new_tokens=4
+    )
+    for _ in segments:
+        pass
+
+
+# Environment variable with the memory budget of the default pool in MB.
+MEMORY_BUDGET_ENV = "STT_MODEL_MEMORY_MB"
+
+_default_pool = None
+_default_pool_lock = threading.Lock()
+
+
+def get_memory_budget_mb() -> Optional[float]:
+    """Returns the memory budget set in the STT_MODEL_MEMORY_MB environment variable, or
+    None when it is not set."""
+    value = os.environ.get(MEMORY_BUDGET_ENV, "").strip()
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        raise ValueError(
+            "Invalid %s value: %r (expected a number of MB)"
+            % (MEMORY_BUDGET_ENV, value)
+        )
+
+
+def configure_default_pool(
+    memory_budget_mb: Optional[float] = None, warmup: bool = True
+) -> ModelPool:
+    """Configures the default pool of the process, e.g. in an entry point. See
+    `ModelPool` for the arguments. The models already loaded are kept within the new
+    budget."""
+    pool = get_default_pool()
+    pool.warmup = warmup
+    pool.set_memory_budget(memory_budget_mb)
+    return pool
+
+
+def get_default_pool() -> ModelPool:
+    """Returns the default pool of the process. Unless `configure_default_pool` was
+    called, it is created on first use with the memory budget of the
+    STT_MODEL_MEMORY_MB environment variable."""
+    global _default_pool
+    with _default_pool_lock:
+        if _default_pool is None:
+            _default_pool = ModelPool(memory_budget_mb=get_memory_budget_mb())
+        return _default_pool
+
+
+def get_model(model_size_or_path: str, **kwargs) -> WhisperModel:
+    """Returns a model from the default pool of the process. The arguments are the same
+    as `WhisperModel`."""
+    return get_default_pool().get(model_size_or_path, **kwargs)
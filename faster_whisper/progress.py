@@ -0,0 +1,125 @@
+"""Progress events of a transcription.
+
+The `progress_callback` of `transcribe` receives a `TranscriptionProgress` after each
+decoded window (or chunk in batched mode), so an application can report the progress
+and estimate the remaining time without parsing the logs.
+"""
+
+import time
+
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+
+@dataclass
+class TranscriptionProgress:
+    """Progress of a transcription.
+
+    Attributes:
+      processed: Number of seconds of audio decoded so far. Like `duration_after_vad`,
+        the audio removed by the VAD filter is not counted.
+      duration: Duration of the audio in seconds, or None if it is not known.
+      duration_after_vad: Number of seconds of audio to decode, or None if it is not
+        known yet (then `processed` counts the whole audio, see
+        `StreamingInferencePipeline`).
+      elapsed: Number of seconds since `transcribe` was called.
+      real_time_factor: Elapsed time divided by the audio time decoded in this call.
+        Values below 1 are faster than real time.
+      num_fallbacks: Number of decodings at a fallback temperature so far.
+      eta: Estimated number of seconds until the end of the transcription, or None if
+        the duration is not known.
+    """
+
+    processed: float
+    duration: Optional[float]
+    duration_after_vad: Optional[float]
+    elapsed: float
+    real_time_factor: Optional[float]
+    num_fallbacks: int
+    eta: Optional[float]
+
+    @property
+    def fraction(self) -> Optional[float]:
+        """Processed fraction of the audio, between 0 and 1."""
+        total = self.total
+        if not total:
+            return None
+        return min(1.0, self.processed / total)
+
+    @property
+    def total(self) -> Optional[float]:
+        return (
+            self.duration_after_vad
+            if self.duration_after_vad is not None
+            else self.duration
+        )
+
+
+class ProgressTracker:
+    """Computes the progress events and passes them to the callback."""
+
+    def __init__(
+        self,
+        callback: Callable[[TranscriptionProgress], None],
+        duration: Optional[float],
+        duration_after_vad: Optional[float],
+        stats=None,
+        start_time: Optional[float] = None,
+    ):
+        """Initializes the tracker.
+
+        Arguments:
+          callback: Function called with each event.
+          duration: Duration of the audio in seconds.
+          duration_after_vad: Number of seconds of audio to decode.
+          stats: `DecodingStats` of the transcription, for the fallback count.
+          start_time: `time.perf_counter()` value when the transcription started.
+        """
+        self.callback = callback
+        self.duration = duration
+        self.duration_after_vad = duration_after_vad
+        self.stats = stats
+        self.start_time = time.perf_counter() if start_time is None else start_time
+        self.processed = 0.0
+        self.skipped = 0.0
+
+    def skip(self, seconds: float):
+        """Counts audio that is not decoded in this call, e.g. restored from a
+        checkpoint. It is excluded from the real-time factor."""
+        self.processed += seconds
+        self.skipped += seconds
+
+    def update(self, seconds: float, num_fallbacks: Optional[int] = None):
+        """Counts decoded audio and calls the callback."""
+        self.processed += seconds
+        self.callback(self.get_progress(num_fallbacks))
+
+    def get_progress(
+        self, num_fallbacks: Optional[int] = None
+    ) -> TranscriptionProgress:
+        elapsed = time.perf_counter() - self.start_time
+        decoded = self.processed - self.skipped
+        real_time_factor = elapsed / decoded if decoded > 0 else None
+
+        total = (
+            self.duration_after_vad
+            if self.duration_after_vad is not None
+            else self.duration
+        )
+        if total is not None and real_time_factor is not None:
+            eta = max(0.0, total - self.processed) * real_time_factor
+        else:
+            eta = None
+
+        if num_fallbacks is None:
+            num_fallbacks = self.stats.num_fallbacks if self.stats is not None else 0
+
+        return TranscriptionProgress(
+            processed=self.processed,
+            duration=self.duration,
+            duration_after_vad=self.duration_after_vad,
+            elapsed=elapsed,
+            real_time_factor=real_time_factor,
+            num_fallbacks=num_fallbacks,
+            eta=eta,
+        )
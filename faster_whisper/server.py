@@ -0,0 +1,556 @@
+"""Resident transcription service.
+
+The model is loaded once and transcription jobs are queued to a bounded pool of worker
+threads, so a job does not pay the model loading time. The service can be used directly
+from Python or over a local HTTP server listening on a TCP port or a Unix socket:
+
+    POST /jobs                    JSON {"audio": "<path>", "options": {...}}, or the audio
+                                  file as the request body with the options in the query
+    GET  /jobs/<id>               status, progress, info and segments of a job
+    GET  /jobs/<id>/segments      segments as JSON lines, streamed as they are produced
+    DELETE /jobs/<id>             cancel a job
+    GET  /status                  queue depth and number of running jobs
+
+A job is also cancelled when the client streaming its segments disconnects, and when the
+`deadline` option (in seconds) has passed.
+
+The HTTP requests only accept the decoding options listed in `HTTP_OPTIONS`: the other
+`transcribe` arguments (e.g. `checkpoint_path`) would let a client write files on the
+server. An audio path is only accepted when the server has an `audio_dir`, and must be
+inside it; otherwise the audio has to be uploaded as the request body.
+
+Run `python -m faster_whisper.server --help` for the server options.
+"""
+
+import argparse
+import io
+import itertools
+import json
+import logging
+import os
+import queue
+import socketserver
+import threading
+
+from collections import OrderedDict
+from dataclasses import asdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, BinaryIO, Iterator, Optional, Union
+from urllib.parse import parse_qsl, urlsplit
+
+import numpy as np
+
+from faster_whisper.cancellation import CancellationToken, TranscriptionCancelled
+from faster_whisper.progress import TranscriptionProgress
+from faster_whisper.transcribe import Segment
+from faster_whisper.utils import get_logger, get_model_workers
+
+# The transcribe options accepted in the HTTP requests.
+HTTP_OPTIONS = frozenset(
+    [
+        "language",
+        "task",
+        "beam_size",
+        "best_of",
+        "patience",
+        "length_penalty",
+        "repetition_penalty",
+        "no_repeat_ngram_size",
+        "temperature",
+        "compression_ratio_threshold",
+        "log_prob_threshold",
+        "no_speech_threshold",
+        "condition_on_previous_text",
+        "prompt_reset_on_temperature",
+        "initial_prompt",
+        "prefix",
+        "suppress_blank",
+        "suppress_tokens",
+        "without_timestamps",
+        "max_initial_timestamp",
+        "word_timestamps",
+        "prepend_punctuations",
+        "append_punctuations",
+        "multilingual",
+        "vad_filter",
+        "vad_parameters",
+        "max_new_tokens",
+        "chunk_length",
+        "clip_timestamps",
+        "hallucination_silence_threshold",
+        "hotwords",
+        "language_detection_threshold",
+        "language_detection_segments",
+        "deadline",
+        "telemetry",
+    ]
+)
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+
+class TranscriptionJob:
+    """A queued transcription. The segments and the progress are updated while the job
+    is running."""
+
+    def __init__(self, id: str, audio: Union[str, BinaryIO, np.ndarray], options: dict):
+        self.id = id
+        self.audio = audio
+        self.cancellation_token = CancellationToken(
+            parent=options.pop("cancellation_token", None)
+        )
+        self._progress_callback = options.pop("progress_callback", None)
+        self.options = dict(
+            options,
+            cancellation_token=self.cancellation_token,
+            progress_callback=self._set_progress,
+        )
+        self.status = QUEUED
+        self.segments = []
+        self.info = None
+        self.error = None
+        self.progress = None
+        self._condition = threading.Condition()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (DONE, FAILED, CANCELLED)
+
+    def cancel(self, reason: str = "Transcription cancelled"):
+        """Cancels the job. A running job stops at its next decoding step."""
+        self.cancellation_token.cancel(reason)
+
+    def iter_segments(self, timeout: Optional[float] = None) -> Iterator[Segment]:
+        """Yields the segments as they are produced, until the job is finished.
+
+        Raises:
+          TimeoutError: If no segment is produced within `timeout` seconds.
+        """
+        index = 0
+        while True:
+            with self._condition:
+                if index == len(self.segments) and not self.finished:
+                    if not self._condition.wait(timeout):
+                        raise TimeoutError("No segment produced for job %s" % self.id)
+                segments = self.segments[index:]
+                finished = self.finished
+            yield from segments
+            index += len(segments)
+            if finished and index == len(self.segments):
+                return
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        with self._condition:
+            return self._condition.wait_for(lambda: self.finished, timeout)
+
+    def to_dict(self, with_segments: bool = True) -> dict:
+        with self._condition:
+            result = dict(
+                id=self.id,
+                status=self.status,
+                num_segments=len(self.segments),
+                info=_info_to_dict(self.info),
+                error=self.error,
+                progress=asdict(self.progress) if self.progress is not None else None,
+            )
+            if with_segments:
+                result["segments"] = [asdict(segment) for segment in self.segments]
+        return result
+
+    def _set_status(self, status: str, error: Optional[str] = None):
+        with self._condition:
+            self.status = status
+            self.error = error
+            self._condition.notify_all()
+
+    def _set_progress(self, progress: TranscriptionProgress):
+        with self._condition:
+            self.progress = progress
+        if self._progress_callback is not None:
+            self._progress_callback(progress)
+
+    def _add_segment(self, segment: Segment):
+        with self._condition:
+            self.segments.append(segment)
+            self._condition.notify_all()
+
+
+class TranscriptionService:
+    """Runs transcription jobs on a resident model."""
+
+    def __init__(
+        self,
+        model,
+        num_workers: Optional[int] = None,
+        max_queue_size: int = 0,
+        max_finished_jobs: int = 100,
+    ):
+        """Starts the worker threads.
+
+        Arguments:
+          model: A `WhisperModel`, a `BatchedInferencePipeline` or any object with the same
+            `transcribe` method.
+          num_workers: Number of jobs transcribed concurrently. Defaults to the
+            `num_workers` of the model, since more concurrent jobs would only wait for a
+            free model replica.
+          max_queue_size: Maximum number of queued jobs, 0 for no limit. `submit` raises
+            `queue.Full` when the queue is full.
+          max_finished_jobs: Number of finished jobs kept for the status requests.
+        """
+        if num_workers is None:
+            num_workers = get_model_workers(model)
+
+        self.model = model
+        self.num_workers = max(1, num_workers)
+        self.max_finished_jobs = max_finished_jobs
+        self.logger = get_logger()
+
+        self._queue = queue.Queue(max_queue_size)
+        self._jobs = OrderedDict()
+        self._job_ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._running = 0
+        self._workers = [
+            threading.Thread(target=self._work, name="transcription-worker-%d" % i)
+            for i in range(self.num_workers)
+        ]
+        for worker in self._workers:
+            worker.daemon = True
+            worker.start()
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of jobs waiting for a worker."""
+        return self._queue.qsize()
+
+    @property
+    def running(self) -> int:
+        """Number of jobs being transcribed."""
+        with self._lock:
+            return self._running
+
+    def submit(
+        self, audio: Union[str, BinaryIO, np.ndarray], **options: Any
+    ) -> TranscriptionJob:
+        """Queues a job. The options are passed to the `transcribe` method."""
+        with self._lock:
+            job = TranscriptionJob(str(next(self._job_ids)), audio, options)
+            self._jobs[job.id] = job
+        try:
+            self._queue.put_nowait(job)
+        except queue.Full:
+            with self._lock:
+                del self._jobs[job.id]
+            raise
+        return job
+
+    def get_job(self, job_id: str) -> Optional[TranscriptionJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def status(self) -> dict:
+        return dict(
+            queue_depth=self.queue_depth,
+            running=self.running,
+            num_workers=self.num_workers,
+        )
+
+    def close(self, wait: bool = True):
+        """Stops the workers after the queued jobs."""
+        for _ in self._workers:
+            self._queue.put(None)
+        if wait:
+            for worker in self._workers:
+                worker.join()
+
+    def _work(self):
+        while True:
+            job = self._queue.get()
+            if job is None:
+                return
+
+            if job.cancellation_token.cancelled:
+                job.audio = None
+                job._set_status(CANCELLED, job.cancellation_token.reason)
+                continue
+
+            with self._lock:
+                self._running += 1
+            job._set_status(RUNNING)
+
+            try:
+                segments, job.info = self.model.transcribe(job.audio, **job.options)
+                for segment in segments:
+                    job._add_segment(segment)
+            except TranscriptionCancelled as e:
+                job._set_status(CANCELLED, str(e))
+            except Exception as e:
+                self.logger.exception("Transcription job %s failed", job.id)
+                job._set_status(FAILED, "%s: %s" % (type(e).__name__, e))
+            else:
+                job._set_status(DONE)
+            finally:
+                job.audio = None
+                with self._lock:
+                    self._running -= 1
+                    self._forget_finished_jobs()
+
+    def _forget_finished_jobs(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished]
+        for job_id in finished[: max(0, len(finished) - self.max_finished_jobs)]:
+            del self._jobs[job_id]
+
+
+class TranscriptionRequestHandler(BaseHTTPRequestHandler):
+    """HTTP interface of the `TranscriptionService` set on the server."""
+
+    protocol_version = "HTTP/1.1"
+
+    @property
+    def service(self) -> TranscriptionService:
+        return self.server.service
+
+    def _get_audio_path(self, path) -> str:
+        audio_dir = self.server.audio_dir
+        if audio_dir is None:
+            raise ValueError("audio paths are not accepted, upload the audio instead")
+        if not isinstance(path, str):
+            raise ValueError("the audio path must be a string")
+
+        audio_dir = os.path.realpath(audio_dir)
+        path = os.path.realpath(os.path.join(audio_dir, path))
+        if os.path.commonpath([audio_dir, path]) != audio_dir:
+            raise ValueError("the audio path is outside the audio directory")
+        return path
+
+    def do_GET(self):
+        parts = urlsplit(self.path).path.strip("/").split("/")
+
+        if parts == ["status"]:
+            self._send_json(200, self.service.status())
+        elif len(parts) in (2, 3) and parts[0] == "jobs":
+            job = self.service.get_job(parts[1])
+            if job is None:
+                self._send_json(404, dict(error="Unknown job %s" % parts[1]))
+            elif len(parts) == 2:
+                self._send_json(200, job.to_dict())
+            elif parts[2] == "segments":
+                self._stream_segments(job)
+            else:
+                self._send_json(404, dict(error="Not found"))
+        else:
+            self._send_json(404, dict(error="Not found"))
+
+    def do_DELETE(self):
+        parts = urlsplit(self.path).path.strip("/").split("/")
+        job = (
+            self.service.get_job(parts[1])
+            if len(parts) == 2 and parts[0] == "jobs"
+            else None
+        )
+        if job is None:
+            self._send_json(404, dict(error="Not found"))
+        else:
+            job.cancel()
+            self._send_json(202, job.to_dict(with_segments=False))
+
+    def do_POST(self):
+        url = urlsplit(self.path)
+        if url.path.strip("/") != "jobs":
+            self._send_json(404, dict(error="Not found"))
+            return
+
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+        try:
+            if self.headers.get_content_type() == "application/json":
+                request = json.loads(body)
+                audio = self._get_audio_path(request["audio"])
+                options = request.get("options", {})
+            else:
+                audio = io.BytesIO(body)
+                options = {
+                    name: _parse_query_value(value)
+                    for name, value in parse_qsl(url.query)
+                }
+            unsupported = set(options) - HTTP_OPTIONS
+            if unsupported:
+                raise ValueError(
+                    "unsupported options: %s" % ", ".join(sorted(unsupported))
+                )
+            job = self.service.submit(audio, **options)
+        except queue.Full:
+            self._send_json(503, dict(error="The job queue is full"))
+        except (ValueError, KeyError, TypeError) as e:
+            self._send_json(400, dict(error="Invalid request: %s" % e))
+        else:
+            self._send_json(202, dict(id=job.id, queue_depth=self.service.queue_depth))
+
+    def _stream_segments(self, job: TranscriptionJob):
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        try:
+            for segment in job.iter_segments():
+                self._send_chunk(dict(segment=asdict(segment)))
+            self._send_chunk(job.to_dict(with_segments=False))
+            self.wfile.write(b"0\r\n\r\n")
+        except ConnectionError:
+            # Nobody is waiting for the segments anymore.
+            job.cancel("Client disconnected")
+            self.close_connection = True
+
+    def _send_chunk(self, value: dict):
+        data = json.dumps(value, ensure_ascii=False).encode("utf-8") + b"\n"
+        self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+        self.wfile.flush()
+
+    def _send_json(self, code: int, value: dict):
+        data = json.dumps(value, ensure_ascii=False).encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        get_logger().debug(format, *args)
+
+
+class TranscriptionServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(
+        self,
+        service: TranscriptionService,
+        host: str,
+        port: int,
+        audio_dir: Optional[str] = None,
+    ):
+        """Binds the server.
+
+        Arguments:
+          service: The service running the jobs.
+          host: Host to listen on.
+          port: Port to listen on, 0 for any free port.
+          audio_dir: Directory of the audio files that the requests can name by path.
+            When None, the audio must be uploaded.
+        """
+        super().__init__((host, port), TranscriptionRequestHandler)
+        self.service = service
+        self.audio_dir = audio_dir
+
+
+class UnixTranscriptionServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+    def __init__(
+        self,
+        service: TranscriptionService,
+        path: str,
+        audio_dir: Optional[str] = None,
+    ):
+        """Binds the server on the Unix socket `path`, see `TranscriptionServer`."""
+        if os.path.exists(path):
+            os.unlink(path)
+        super().__init__(path, TranscriptionRequestHandler)
+        self.service = service
+        self.audio_dir = audio_dir
+
+    def get_request(self):
+        request, _ = super().get_request()
+        # BaseHTTPRequestHandler expects a (host, port) client address.
+        return request, ("unix", 0)
+
+
+def _info_to_dict(info) -> Optional[dict]:
+    if info is None:
+        return None
+    return dict(
+        language=info.language,
+        language_probability=info.language_probability,
+        duration=info.duration,
+        duration_after_vad=info.duration_after_vad,
+        telemetry=info.telemetry.summary if info.telemetry is not None else None,
+    )
+
+
+def _parse_query_value(value: str):
+    try:
+        return json.loads(value)
+    except ValueError:
+        return value
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Resident transcription server")
+    parser.add_argument("--model", default="large-v3")
+    parser.add_argument("--device", default="auto")
+    parser.add_argument("--compute_type", default="default")
+    parser.add_argument("--cpu_threads", type=int, default=0)
+    parser.add_argument(
+        "--num_workers",
+        type=int,
+        default=1,
+        help="Number of model replicas and of concurrent jobs.",
+    )
+    parser.add_argument("--max_queue_size", type=int, default=0)
+    parser.add_argument(
+        "--model_memory_mb",
+        type=float,
+        default=None,
+        help="Memory budget of the resident models in MB, the least recently used "
+        "models are evicted beyond it. Defaults to the STT_MODEL_MEMORY_MB "
+        "environment variable.",
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix_socket", help="Listen on this Unix socket instead.")
+    parser.add_argument(
+        "--audio_dir",
+        help="Directory of the audio files that the requests can name by path. "
+        "Without it, the audio must be uploaded as the request body.",
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+
+    from faster_whisper.model_pool import configure_default_pool, get_memory_budget_mb
+
+    memory_budget_mb = args.model_memory_mb
+    if memory_budget_mb is None:
+        memory_budget_mb = get_memory_budget_mb()
+    model = configure_default_pool(memory_budget_mb).get(
+        args.model,
+        device=args.device,
+        compute_type=args.compute_type,
+        cpu_threads=args.cpu_threads,
+        num_workers=args.num_workers,
+    )
+    service = TranscriptionService(model, max_queue_size=args.max_queue_size)
+
+    if args.unix_socket:
+        server = UnixTranscriptionServer(service, args.unix_socket, args.audio_dir)
+        address = args.unix_socket
+    else:
+        server = TranscriptionServer(service, args.host, args.port, args.audio_dir)
+        address = "http://%s:%d" % (args.host, args.port)
+
+    get_logger().info("Transcription server listening on %s", address)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close(wait=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,408 @@
+import multiprocessing
+import time
+
+from concurrent.futures import Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass, replace
+from typing import BinaryIO, List, Optional, Tuple, Union
+
+import numpy as np
+
+from faster_whisper.audio import decode_audio
+from faster_whisper.cancellation import CancellationToken, get_cancellation_token
+from faster_whisper.progress import ProgressTracker
+from faster_whisper.telemetry import DecodeTelemetry
+from faster_whisper.threads import plan_threads
+from faster_whisper.transcribe import (
+    DecodingStats,
+    Segment,
+    TranscriptionInfo,
+    WhisperModel,
+)
+from faster_whisper.utils import get_logger
+from faster_whisper.vad import VadOptions, get_speech_timestamps
+
+
+@dataclass
+class Shard:
+    """A part of the audio transcribed by a single worker.
+
+    Attributes:
+      start: Start of the owned time range in seconds.
+      end: End of the owned time range in seconds.
+      audio_start: Start of the decoded audio in seconds, `overlap` before `start`.
+      audio_end: End of the decoded audio in seconds, `overlap` after `end`.
+    """
+
+    start: float
+    end: float
+    audio_start: float
+    audio_end: float
+
+
+class ShardedInferencePipeline:
+    """Transcribes a long audio file by splitting it in shards decoded in parallel.
+
+    The shards are cut at VAD silence boundaries and each worker process loads its own
+    `WhisperModel`. The segments are merged back with global timestamps and ids.
+    """
+
+    def __init__(
+        self,
+        model_size_or_path: str,
+        num_workers: int = 2,
+        device: str = "cpu",
+        compute_type: str = "default",
+        cpu_threads: int = 0,
+        **model_kwargs,
+    ):
+        """Initializes the pipeline.
+
+        Arguments:
+          model_size_or_path: Model size or path passed to `WhisperModel` in each worker.
+          num_workers: Number of worker processes.
+          device: Device passed to `WhisperModel`.
+          compute_type: Compute type passed to `WhisperModel`.
+          cpu_threads: Number of threads per worker. When 0, the CPUs available to the
+            process are divided between the workers (see `faster_whisper.threads`).
+          model_kwargs: Other arguments passed to `WhisperModel`.
+        """
+        # The workers share the CPU budget of the process.
+        self.thread_plan = plan_threads(num_workers, cpu_threads)
+
+        self.num_workers = num_workers
+        self.model_kwargs = dict(
+            model_size_or_path=model_size_or_path,
+            device=device,
+            compute_type=compute_type,
+            cpu_threads=self.thread_plan.intra_threads,
+            **model_kwargs,
+        )
+        self.logger = get_logger()
+        self._executor = None
+        self._cancel_event = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """Stops the worker processes."""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        # The workers are started on first use and kept alive between calls so the
+        # models are only loaded once.
+        if self._executor is None:
+            context = multiprocessing.get_context("spawn")
+            # Set to cancel the running shards, which check it between their windows.
+            self._cancel_event = context.Event()
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.num_workers,
+                mp_context=context,
+                initializer=_init_worker,
+                initargs=(
+                    self.model_kwargs,
+                    self._cancel_event,
+                    self.thread_plan.fft_workers,
+                ),
+            )
+        return self._executor
+
+    def transcribe(
+        self,
+        audio: Union[str, BinaryIO, np.ndarray],
+        num_shards: Optional[int] = None,
+        overlap: float = 1.0,
+        vad_parameters: Optional[Union[dict, VadOptions]] = None,
+        **kwargs,
+    ) -> Tuple[List[Segment], TranscriptionInfo]:
+        """Transcribes an input file with the worker processes.
+
+        Arguments:
+          audio: Path to the input file (or a file-like object), or the audio waveform.
+          num_shards: Number of shards. Defaults to the number of workers.
+          overlap: Audio in seconds added on each side of a shard so a word cut by a shard
+            boundary is fully decoded by one of the shards.
+          vad_parameters: Dictionary of Silero VAD parameters or VadOptions class used to
+            find the silences where the audio is split. They are also passed to
+            `WhisperModel.transcribe` if `vad_filter` is enabled.
+          kwargs: Arguments passed to `WhisperModel.transcribe` in each worker. When the
+            `cancellation_token` is cancelled or the `deadline` has passed, the shards
+            not started yet are dropped and the running shards stop at their next
+            window. A pipeline runs one transcription at a time for the cancellation.
+            The `progress_callback` is called in this process after each shard.
+
+        Returns:
+          A tuple with:
+
+            - the list of segments with global timestamps
+            - an instance of TranscriptionInfo for the whole audio
+        """
+        start_time = time.perf_counter()
+        sampling_rate = 16000
+        cancellation_token = get_cancellation_token(
+            kwargs.pop("cancellation_token", None), kwargs.pop("deadline", None)
+        )
+        # The callback cannot be sent to the worker processes.
+        progress_callback = kwargs.pop("progress_callback", None)
+
+        if not isinstance(audio, np.ndarray):
+            audio = decode_audio(audio, sampling_rate=sampling_rate)
+
+        if vad_parameters is None:
+            vad_parameters = VadOptions()
+        elif isinstance(vad_parameters, dict):
+            vad_parameters = VadOptions(**vad_parameters)
+
+        speech_chunks = get_speech_timestamps(
+            audio, vad_parameters, cancellation_token=cancellation_token
+        )
+        shards = split_shards(
+            audio.shape[0],
+            speech_chunks,
+            num_shards or self.num_workers,
+            overlap,
+            sampling_rate,
+        )
+
+        def get_shard_audio(shard: Shard) -> np.ndarray:
+            return audio[
+                int(shard.audio_start * sampling_rate) : int(
+                    shard.audio_end * sampling_rate
+                )
+            ]
+
+        # The language is detected once so that all shards are decoded with the same
+        # language (also the source language when translating).
+        if kwargs.get("language") is None:
+            future = self.executor.submit(_detect_language, get_shard_audio(shards[0]))
+            kwargs["language"] = self._get_result(future, [future], cancellation_token)
+
+        # The words are needed to split the segments decoded in the overlap at the
+        # shard boundaries. They are removed afterwards if they were not requested.
+        word_timestamps = kwargs.get("word_timestamps", False)
+        shard_kwargs = dict(kwargs, vad_parameters=vad_parameters, word_timestamps=True)
+        futures = [
+            self.executor.submit(
+                _transcribe_shard, get_shard_audio(shard), shard_kwargs
+            )
+            for shard in shards
+        ]
+
+        progress = None
+        if progress_callback is not None:
+            progress = ProgressTracker(
+                progress_callback,
+                audio.shape[0] / sampling_rate,
+                None,
+                start_time=start_time,
+            )
+
+        segments = []
+        infos = []
+        for shard, future in zip(shards, futures):
+            shard_segments, info = self._get_result(future, futures, cancellation_token)
+            segments.extend(stitch_shard_segments(shard_segments, shard))
+            infos.append(info)
+            if progress is not None:
+                progress.update(
+                    shard.end - shard.start,
+                    sum(info.decoding_stats.num_fallbacks for info in infos),
+                )
+
+        segments = [
+            replace(segment, id=i, words=segment.words if word_timestamps else None)
+            for i, segment in enumerate(segments, 1)
+        ]
+
+        decoding_stats = DecodingStats()
+        for shard, shard_info in zip(shards, infos):
+            decoding_stats.add(shard_info.decoding_stats, shard.audio_start)
+        info = replace(
+            infos[0],
+            duration=audio.shape[0] / sampling_rate,
+            duration_after_vad=sum(info.duration_after_vad for info in infos),
+            decoding_stats=decoding_stats,
+        )
+        if info.telemetry is not None:
+            info.telemetry = DecodeTelemetry(
+                [
+                    replace(window, start=window.start + shard.audio_start)
+                    for shard, shard_info in zip(shards, infos)
+                    for window in shard_info.telemetry.windows
+                ]
+            )
+
+        self.logger.info(
+            "Transcribed %d shards with %d workers", len(shards), self.num_workers
+        )
+
+        return segments, info
+
+    def _get_result(
+        self,
+        future: Future,
+        futures: List[Future],
+        cancellation_token: Optional[CancellationToken],
+    ):
+        """Waits for the result of a worker, checking the cancellation token."""
+        if cancellation_token is not None:
+            while not wait([future], timeout=0.1).done:
+                if cancellation_token.cancelled:
+                    for pending_future in futures:
+                        pending_future.cancel()
+                    self._cancel_event.set()
+                    # The event is reset for the next transcription once the running
+                    # shards have stopped.
+                    wait(futures)
+                    self._cancel_event.clear()
+                    cancellation_token.raise_if_cancelled()
+        return future.result()
+
+
+def split_shards(
+    num_samples: int,
+    speech_chunks: List[dict],
+    num_shards: int,
+    overlap: float = 1.0,
+    sampling_rate: int = 16000,
+) -> List[Shard]:
+    """Splits the audio in shards of roughly equal duration.
+
+    The boundaries are placed in the middle of the silence between two speech chunks
+    that is the closest to the ideal boundary. When there is no silence left, the audio
+    is split at the ideal boundary.
+    """
+    duration = num_samples / sampling_rate
+    silences = [
+        (previous["end"] + chunk["start"]) / 2 / sampling_rate
+        for previous, chunk in zip(speech_chunks, speech_chunks[1:])
+    ]
+
+    boundaries = [0.0]
+    for i in range(1, num_shards):
+        target = duration * i / num_shards
+        candidates = [silence for silence in silences if silence > boundaries[-1]]
+        if candidates:
+            boundary = min(candidates, key=lambda silence: abs(silence - target))
+        else:
+            boundary = target
+        if boundary <= boundaries[-1] or boundary >= duration:
+            continue
+        boundaries.append(boundary)
+    boundaries.append(duration)
+
+    return [
+        Shard(
+            start=start,
+            end=end,
+            audio_start=max(0.0, start - overlap),
+            audio_end=min(duration, end + overlap),
+        )
+        for start, end in zip(boundaries, boundaries[1:])
+    ]
+
+
+def stitch_shard_segments(segments: List[Segment], shard: Shard) -> List[Segment]:
+    """Moves the shard segments to the global timeline and keeps the parts owned by the
+    shard.
+
+    Words decoded in the overlap belong to the shard containing their middle, so a word
+    at a shard boundary is neither duplicated nor cut. Segments without words are kept
+    whole by the shard containing their middle, which can duplicate or cut the words
+    near a boundary inside speech: `ShardedInferencePipeline` always decodes the words.
+    """
+    offset = shard.audio_start
+    seek_offset = round(offset * 100)
+    stitched = []
+
+    def is_owned(start: float, end: float) -> bool:
+        # The first and last shards also own the timestamps beyond the audio edges.
+        middle = (start + end) / 2
+        return (shard.start <= middle or shard.start == shard.audio_start) and (
+            middle < shard.end or shard.end == shard.audio_end
+        )
+
+    for segment in segments:
+        start = round(segment.start + offset, 3)
+        end = round(segment.end + offset, 3)
+        seek = segment.seek + seek_offset
+
+        if segment.words:
+            words = [
+                replace(
+                    word,
+                    start=round(word.start + offset, 3),
+                    end=round(word.end + offset, 3),
+                )
+                for word in segment.words
+            ]
+            owned_words = [word for word in words if is_owned(word.start, word.end)]
+            if not owned_words:
+                continue
+
+            text = segment.text
+            if len(owned_words) != len(words):
+                text = "".join(word.word for word in owned_words)
+
+            stitched.append(
+                replace(
+                    segment,
+                    seek=seek,
+                    start=owned_words[0].start,
+                    end=owned_words[-1].end,
+                    text=text,
+                    words=owned_words,
+                )
+            )
+
+        elif is_owned(start, end):
+            stitched.append(replace(segment, seek=seek, start=start, end=end))
+
+    return stitched
+
+
+_worker_model = None
+_worker_cancel_event = None
+
+
+class _WorkerCancellationToken(CancellationToken):
+    """Token of a shard, cancelled by the main process through a shared event."""
+
+    def __init__(self, event):
+        super().__init__()
+        self._shared_event = event
+
+    @property
+    def cancelled(self) -> bool:
+        if self._shared_event.is_set():
+            self.cancel()
+        return super().cancelled
+
+
+def _init_worker(model_kwargs: dict, cancel_event, fft_workers: int):
+    global _worker_model, _worker_cancel_event
+    _worker_model = WhisperModel(**model_kwargs)
+    # The model plans its threads from the whole budget, the worker only has a share.
+    _worker_model.feature_extractor.fft_workers = fft_workers
+    _worker_cancel_event = cancel_event
+
+
+def _detect_language(audio: np.ndarray) -> str:
+    language, _, _ = _worker_model.detect_language(audio)
+    return language
+
+
+def _transcribe_shard(
+    audio: np.ndarray, kwargs: dict
+) -> Tuple[List[Segment], TranscriptionInfo]:
+    cancellation_token = _WorkerCancellationToken(_worker_cancel_event)
+    segments, info = _worker_model.transcribe(
+        audio, cancellation_token=cancellation_token, **kwargs
+    )
+    return list(segments), info
@@ -0,0 +1,370 @@
+import logging
+import time
+
+from dataclasses import dataclass, replace
+from typing import BinaryIO, Iterable, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+
+from faster_whisper.audio import get_audio_duration
+from faster_whisper.cancellation import CancellationToken, get_cancellation_token
+from faster_whisper.long_audio import AudioSource
+from faster_whisper.progress import ProgressTracker, TranscriptionProgress
+from faster_whisper.transcribe import (
+    Segment,
+    TranscriptionInfo,
+    WhisperModel,
+    restore_speech_timestamps,
+)
+from faster_whisper.utils import format_timestamp, get_logger, prefetch
+from faster_whisper.vad import VadOptions, collect_chunks, get_speech_timestamps
+
+
+@dataclass
+class Section:
+    """A part of the audio transcribed as a whole.
+
+    Attributes:
+      offset: Position of the section in the audio, in samples.
+      audio: The section waveform.
+      speech_chunks: Speech chunks found by the VAD, relative to the section start.
+    """
+
+    offset: int
+    audio: np.ndarray
+    speech_chunks: List[dict]
+
+
+class StreamingInferencePipeline:
+    """Transcribes a long audio file while it is being decoded.
+
+    The audio decoding and the VAD run in a background thread that cuts the audio in
+    sections of about `section_length` seconds at VAD silences. Each section is then
+    transcribed by `WhisperModel.transcribe`, so the first segments are available after
+    the first section instead of after the whole file has been decoded and filtered.
+    """
+
+    def __init__(
+        self,
+        model: WhisperModel,
+        section_length: float = 60.0,
+        prefetch_sections: int = 2,
+    ):
+        """Initializes the pipeline.
+
+        Arguments:
+          model: The model used to transcribe each section.
+          section_length: Target duration of a section in seconds. The first segments are
+            available after the first section is decoded and filtered.
+          prefetch_sections: Number of sections decoded in advance while the model is
+            transcribing.
+        """
+        self.model = model
+        self.section_length = section_length
+        self.prefetch_sections = prefetch_sections
+        self.logger = get_logger()
+
+    def transcribe(
+        self,
+        audio: Union[str, BinaryIO, np.ndarray],
+        language: Optional[str] = None,
+        initial_prompt: Optional[Union[str, Iterable[int]]] = None,
+        condition_on_previous_text: bool = True,
+        vad_filter: bool = False,
+        vad_parameters: Optional[Union[dict, VadOptions]] = None,
+        **kwargs,
+    ) -> Tuple[Iterable[Segment], TranscriptionInfo]:
+        """Transcribes an input file section by section.
+
+        Arguments:
+          audio: Path to the input file (or a file-like object), or the audio waveform.
+          language: The language spoken in the audio. If not set, the language is
+            detected in the first section and used for the next sections.
+          initial_prompt: Optional text string or iterable of token ids to provide as a
+            prompt for the first window.
+          condition_on_previous_text: If True, the tokens of the previous section are
+            provided as a prompt for the next section.
+          vad_filter: Remove the parts of the sections without speech. The VAD is always
+            used to find where to cut the sections.
+          vad_parameters: Dictionary of Silero VAD parameters or VadOptions class.
+          kwargs: Other arguments passed to `WhisperModel.transcribe` for each section.
+            `clip_timestamps` is not supported. The `progress_callback` receives the
+            progress in seconds of audio, including the parts removed by the VAD, and
+            the total is the duration stored in the audio container.
+
+        Returns:
+          A tuple with:
+
+            - a generator over transcribed segments
+            - an instance of TranscriptionInfo. The language is detected before
+              returning, but `duration` and `duration_after_vad` are only final after
+              the generator is exhausted.
+        """
+        if "clip_timestamps" in kwargs:
+            raise ValueError("clip_timestamps is not supported in streaming mode")
+
+        start_time = time.perf_counter()
+
+        if vad_parameters is None:
+            vad_parameters = VadOptions()
+        elif isinstance(vad_parameters, dict):
+            vad_parameters = VadOptions(**vad_parameters)
+
+        sampling_rate = self.model.feature_extractor.sampling_rate
+
+        progress = None
+        progress_callback = kwargs.pop("progress_callback", None)
+        if progress_callback is not None:
+            # The duration after VAD is only known at the end, so the progress is
+            # reported against the duration of the audio.
+            progress = ProgressTracker(
+                progress_callback,
+                get_audio_duration(audio, sampling_rate),
+                None,
+                start_time=start_time,
+            )
+
+        # The deadline applies to the whole audio, not to each section.
+        cancellation_token = get_cancellation_token(
+            kwargs.pop("cancellation_token", None), kwargs.pop("deadline", None)
+        )
+        sections = prefetch(
+            iter_sections(
+                AudioSource(audio, sampling_rate).blocks(),
+                round(self.section_length * sampling_rate),
+                vad_parameters,
+                sampling_rate,
+                cancellation_token,
+            ),
+            depth=self.prefetch_sections,
+        )
+
+        kwargs.update(
+            condition_on_previous_text=condition_on_previous_text,
+            cancellation_token=cancellation_token,
+        )
+
+        # The first section is transcribed eagerly to detect the language.
+        section = next(sections)
+        speech = self._get_speech(section, vad_filter)
+        section_progress = self._get_section_progress(
+            progress, section, speech, sampling_rate
+        )
+        segments, info = self.model.transcribe(
+            speech,
+            language=language,
+            initial_prompt=initial_prompt,
+            progress_callback=section_progress,
+            **kwargs,
+        )
+        if progress is not None:
+            progress.stats = info.decoding_stats
+        info = replace(
+            info,
+            duration=section.audio.shape[0] / sampling_rate,
+            duration_after_vad=speech.shape[0] / sampling_rate,
+            vad_options=vad_parameters if vad_filter else None,
+        )
+
+        def segments_generator(section, speech, segments, section_progress):
+            segment_id = 1
+            section_info = None
+            speech_offset = 0.0
+            num_speech_samples = speech.shape[0]
+            while True:
+                if self.logger.isEnabledFor(logging.DEBUG):
+                    self.logger.debug(
+                        "Transcribing section at %s",
+                        format_timestamp(section.offset / sampling_rate),
+                    )
+
+                if vad_filter:
+                    segments = restore_speech_timestamps(
+                        segments, section.speech_chunks, sampling_rate
+                    )
+
+                tokens = []
+                for segment in segments:
+                    tokens.extend(segment.tokens)
+                    yield shift_segment(
+                        segment, segment_id, section.offset / sampling_rate
+                    )
+                    segment_id += 1
+
+                if section_info is not None:
+                    info.decoding_stats.add(section_info.decoding_stats, speech_offset)
+                    if section_info.telemetry is not None:
+                        # The window starts are relative to the decoded speech.
+                        info.telemetry.windows.extend(
+                            replace(window, start=window.start + speech_offset)
+                            for window in section_info.telemetry.windows
+                        )
+
+                if section_progress is not None:
+                    section_progress.finish()
+
+                section = next(sections, None)
+                if section is None:
+                    return
+
+                speech = self._get_speech(section, vad_filter)
+                section_progress = self._get_section_progress(
+                    progress, section, speech, sampling_rate, info.decoding_stats
+                )
+                speech_offset = num_speech_samples / sampling_rate
+                num_speech_samples += speech.shape[0]
+                info.duration = (
+                    section.offset + section.audio.shape[0]
+                ) / sampling_rate
+                info.duration_after_vad = num_speech_samples / sampling_rate
+
+                segments, section_info = self.model.transcribe(
+                    speech,
+                    language=info.language,
+                    initial_prompt=tokens if condition_on_previous_text else None,
+                    progress_callback=section_progress,
+                    **kwargs,
+                )
+
+        return segments_generator(section, speech, segments, section_progress), info
+
+    def _get_section_progress(
+        self, progress, section, speech, sampling_rate, previous_stats=None
+    ) -> Optional["SectionProgress"]:
+        if progress is None:
+            return None
+        return SectionProgress(
+            progress,
+            section.audio.shape[0] / sampling_rate,
+            speech.shape[0] / sampling_rate,
+            previous_stats.num_fallbacks if previous_stats is not None else 0,
+        )
+
+    def _get_speech(self, section: Section, vad_filter: bool) -> np.ndarray:
+        if not vad_filter:
+            return section.audio
+        audio_chunks, _ = collect_chunks(section.audio, section.speech_chunks)
+        return np.concatenate(audio_chunks, axis=0)
+
+
+class SectionProgress:
+    """Reports the progress of a section transcription as progress of the whole audio."""
+
+    def __init__(
+        self,
+        progress: ProgressTracker,
+        section_duration: float,
+        speech_duration: float,
+        previous_fallbacks: int,
+    ):
+        self.progress = progress
+        self.section_duration = section_duration
+        # The speech is a part of the section when the VAD filter is enabled.
+        self.scale = section_duration / speech_duration if speech_duration > 0 else 0
+        self.previous_fallbacks = previous_fallbacks
+        self.reported = 0.0
+
+    def __call__(self, section_progress: TranscriptionProgress):
+        processed = min(self.section_duration, section_progress.processed * self.scale)
+        self.progress.update(
+            processed - self.reported,
+            self.previous_fallbacks + section_progress.num_fallbacks,
+        )
+        self.reported = processed
+
+    def finish(self):
+        """Reports the rest of the section, e.g. the silence after the last speech."""
+        if self.reported < self.section_duration:
+            self.progress.update(self.section_duration - self.reported)
+            self.reported = self.section_duration
+
+
+def iter_sections(
+    blocks: Iterator[np.ndarray],
+    section_samples: int,
+    vad_options: VadOptions,
+    sampling_rate: int = 16000,
+    cancellation_token: Optional[CancellationToken] = None,
+) -> Iterator[Section]:
+    """Groups the audio blocks in sections of about `section_samples` samples, cut in the
+    middle of a silence when possible. The VAD of a section stops when the
+    `cancellation_token` is cancelled."""
+    buffer = np.zeros((0,), dtype=np.float32)
+    offset = 0
+
+    for block in blocks:
+        buffer = np.concatenate([buffer, block])
+
+        while buffer.shape[0] >= section_samples:
+            speech_chunks = get_speech_timestamps(
+                buffer, vad_options, sampling_rate, cancellation_token
+            )
+            cut = find_section_cut(speech_chunks, section_samples)
+            yield Section(
+                offset=offset,
+                audio=buffer[:cut],
+                speech_chunks=clip_speech_chunks(speech_chunks, cut),
+            )
+            buffer = buffer[cut:]
+            offset += cut
+
+    if buffer.shape[0] > 0 or offset == 0:
+        yield Section(
+            offset=offset,
+            audio=buffer,
+            speech_chunks=get_speech_timestamps(
+                buffer, vad_options, sampling_rate, cancellation_token
+            ),
+        )
+
+
+def find_section_cut(speech_chunks: List[dict], section_samples: int) -> int:
+    """Returns the middle of the last silence in the second half of the section, or the
+    section length when there is no such silence."""
+    if not speech_chunks:
+        return section_samples
+
+    silences = [
+        (previous["end"] + chunk["start"]) // 2
+        for previous, chunk in zip(speech_chunks, speech_chunks[1:])
+    ]
+    if speech_chunks[-1]["end"] < section_samples:
+        silences.append((speech_chunks[-1]["end"] + section_samples) // 2)
+
+    candidates = [
+        silence
+        for silence in silences
+        if section_samples // 2 <= silence <= section_samples
+    ]
+    return max(candidates) if candidates else section_samples
+
+
+def clip_speech_chunks(speech_chunks: List[dict], end: int) -> List[dict]:
+    return [
+        dict(chunk, end=min(chunk["end"], end))
+        for chunk in speech_chunks
+        if chunk["start"] < end
+    ]
+
+
+def shift_segment(segment: Segment, segment_id: int, offset: float) -> Segment:
+    """Moves a section segment to the audio timeline."""
+    words = segment.words
+    if words:
+        words = [
+            replace(
+                word,
+                start=round(word.start + offset, 3),
+                end=round(word.end + offset, 3),
+            )
+            for word in words
+        ]
+
+    return replace(
+        segment,
+        id=segment_id,
+        seek=segment.seek + round(offset * 100),
+        start=round(segment.start + offset, 3),
+        end=round(segment.end + offset, 3),
+        words=words,
+    )
@@ -0,0 +1,172 @@
+"""Per-window decoding telemetry.
+
+With `telemetry=True`, `transcribe` records the time spent in each step of each window
+(encoding, every generation attempt, word alignment and post-processing) with the token
+counts and the reason of each fallback. The records are attached to
+`TranscriptionInfo.telemetry` and filled while the segments are generated:
+
+    segments, info = model.transcribe("audio.mp3", telemetry=True)
+    segments = list(segments)
+    print(info.telemetry.summary)
+    info.telemetry.save("telemetry.json")
+"""
+
+import json
+import time
+
+from collections import Counter
+from dataclasses import asdict, dataclass, field
+from typing import List, Optional
+
+
+@dataclass
+class DecodeAttempt:
+    """A generation of a window at one temperature.
+
+    Attributes:
+      temperature: Sampling temperature, 0 for greedy or beam search decoding.
+      beam_size: Beam size, 1 for greedy decoding or sampling.
+      time: Generation time in seconds.
+      num_tokens: Number of generated tokens.
+      avg_logprob: Average log probability of the tokens.
+      compression_ratio: Gzip compression ratio of the text.
+      fallback_reason: Why the result was rejected: "compression_ratio", "log_prob",
+        both joined by "+", or "low_confidence" when a greedy result is decoded again
+        with beam search. None for the accepted result.
+    """
+
+    temperature: float
+    beam_size: int
+    time: float
+    num_tokens: int
+    avg_logprob: float
+    compression_ratio: float
+    fallback_reason: Optional[str] = None
+
+
+@dataclass
+class WindowTelemetry:
+    """Timings of a window, in seconds.
+
+    In batched mode, the encoding, generation and alignment times of a batch are split
+    evenly between its windows.
+
+    Attributes:
+      start: Start of the window in the decoded audio (after VAD).
+      duration: Duration of the window content.
+      encode_time: Encoder time, 0 when the encoder output was computed for the language
+        detection.
+      attempts: Generation attempts, in order.
+      alignment_time: Word timestamps alignment time.
+      postprocess_time: Time to split the tokens in segments and filter hallucinations.
+      batch_size: Number of windows decoded together, 1 in sequential mode.
+    """
+
+    start: float
+    duration: float
+    encode_time: float = 0.0
+    attempts: List[DecodeAttempt] = field(default_factory=list)
+    alignment_time: float = 0.0
+    postprocess_time: float = 0.0
+    batch_size: int = 1
+
+    def add_attempt(
+        self,
+        start_time: float,
+        temperature: float,
+        beam_size: int,
+        num_tokens: int,
+        avg_logprob: float,
+        compression_ratio: float,
+        fallback_reason: Optional[str] = None,
+    ) -> float:
+        """Records an attempt started at `start_time` (a `time.perf_counter()` value)
+        and returns the current time, which is the start of the next attempt."""
+        end_time = time.perf_counter()
+        self.attempts.append(
+            DecodeAttempt(
+                temperature=temperature,
+                beam_size=beam_size,
+                time=end_time - start_time,
+                num_tokens=num_tokens,
+                avg_logprob=avg_logprob,
+                compression_ratio=compression_ratio,
+                fallback_reason=fallback_reason,
+            )
+        )
+        return end_time
+
+    @property
+    def generate_time(self) -> float:
+        return sum(attempt.time for attempt in self.attempts)
+
+    @property
+    def num_tokens(self) -> int:
+        """Number of tokens of the last attempt. When all attempts failed, the result
+        with the highest average log probability is used instead."""
+        return self.attempts[-1].num_tokens if self.attempts else 0
+
+    @property
+    def total_time(self) -> float:
+        return (
+            self.encode_time
+            + self.generate_time
+            + self.alignment_time
+            + self.postprocess_time
+        )
+
+
+@dataclass
+class DecodeTelemetry:
+    """Telemetry of a transcription."""
+
+    windows: List[WindowTelemetry] = field(default_factory=list)
+
+    @property
+    def summary(self) -> dict:
+        """Totals over the windows recorded so far."""
+        attempts = [attempt for window in self.windows for attempt in window.attempts]
+        generated_tokens = sum(attempt.num_tokens for attempt in attempts)
+        generate_time = sum(window.generate_time for window in self.windows)
+        slowest = max(self.windows, key=lambda window: window.total_time, default=None)
+
+        return dict(
+            num_windows=len(self.windows),
+            num_attempts=len(attempts),
+            fallback_reasons=dict(
+                Counter(
+                    attempt.fallback_reason
+                    for attempt in attempts
+                    if attempt.fallback_reason is not None
+                )
+            ),
+            encode_time=sum(window.encode_time for window in self.windows),
+            generate_time=generate_time,
+            alignment_time=sum(window.alignment_time for window in self.windows),
+            postprocess_time=sum(window.postprocess_time for window in self.windows),
+            num_tokens=sum(window.num_tokens for window in self.windows),
+            num_generated_tokens=generated_tokens,
+            generated_tokens_per_second=(
+                generated_tokens / generate_time if generate_time > 0 else None
+            ),
+            slowest_window_start=slowest.start if slowest is not None else None,
+            slowest_window_time=slowest.total_time if slowest is not None else None,
+        )
+
+    def to_dict(self) -> dict:
+        return dict(
+            summary=self.summary,
+            windows=[
+                dict(
+                    asdict(window),
+                    generate_time=window.generate_time,
+                    num_tokens=window.num_tokens,
+                )
+                for window in self.windows
+            ],
+        )
+
+    def save(self, path: str):
+        """Writes the summary and the windows to a JSON file."""
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(self.to_dict(), file, indent=2)
@@ -0,0 +1,154 @@
+"""CPU thread budget of the process.
+
+`os.cpu_count()` returns the number of CPUs of the host, even in a container limited to a
+few CPUs by a cgroup quota. When every thread pool (CTranslate2, ONNX Runtime, the FFT of
+the feature extractor) sizes itself from the host count, the process runs many more
+threads than it can schedule and the throughput drops.
+
+`plan_threads` reads the CPU quota of the cgroup and the CPU affinity of the process and
+splits this budget between the thread pools that run at the same time: the CTranslate2
+threads of each model replica, and the FFT workers of the feature extraction which runs
+in a prefetch thread while the replica decodes. The VAD sessions use a single thread:
+the Silero decoder runs are too small to be split. `WhisperModel` applies the plan of
+its replicas when it is constructed:
+
+    model = WhisperModel("large-v3", device="cpu", num_workers=2)
+    print(model.thread_plan)
+"""
+
+import math
+import os
+
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass
+class ThreadPlan:
+    """Number of threads of each thread pool.
+
+    Attributes:
+      cpu_budget: Number of CPUs available to the process.
+      intra_threads: CTranslate2 threads per model replica (`cpu_threads`).
+      inter_threads: CTranslate2 model replicas running in parallel (`num_workers`).
+      fft_workers: Threads computing the FFT of the feature extractor, for each
+        replica.
+    """
+
+    cpu_budget: int
+    intra_threads: int
+    inter_threads: int
+    fft_workers: int
+
+
+def get_cpu_quota(cgroup_root: str = "/sys/fs/cgroup") -> Optional[float]:
+    """Returns the CPU quota of the cgroup in number of CPUs, or None without quota.
+
+    Both cgroup v2 (`cpu.max`) and cgroup v1 (`cpu.cfs_quota_us`) are supported. The
+    cgroup of the process is expected at the root of the hierarchy, which is the case
+    in a container with its own cgroup namespace (the Docker default).
+    """
+    cpu_max = _read_file(os.path.join(cgroup_root, "cpu.max"))
+    if cpu_max is not None:
+        fields = cpu_max.split()
+        if len(fields) != 2 or fields[0] == "max":
+            return None
+        return _get_quota(fields[0], fields[1])
+
+    for controller in ("cpu", "cpu,cpuacct"):
+        directory = os.path.join(cgroup_root, controller)
+        quota = _read_file(os.path.join(directory, "cpu.cfs_quota_us"))
+        period = _read_file(os.path.join(directory, "cpu.cfs_period_us"))
+        if quota is not None and period is not None:
+            return _get_quota(quota, period)
+
+    return None
+
+
+def get_cpu_budget(cgroup_root: str = "/sys/fs/cgroup") -> int:
+    """Returns the number of CPUs the process can use: the CPUs of its affinity mask,
+    limited by the cgroup quota."""
+    if hasattr(os, "sched_getaffinity"):
+        num_cpus = len(os.sched_getaffinity(0))
+    else:
+        num_cpus = os.cpu_count() or 1
+
+    quota = get_cpu_quota(cgroup_root)
+    if quota is not None:
+        # Threads beyond the quota are throttled, a fractional CPU is not worth a thread.
+        num_cpus = min(num_cpus, max(1, math.floor(quota)))
+
+    return max(1, num_cpus)
+
+
+def plan_threads(
+    num_workers: int = 1,
+    cpu_threads: int = 0,
+    cpu_budget: Optional[int] = None,
+) -> ThreadPlan:
+    """Splits the CPU budget between the thread pools.
+
+    Each model replica gets an equal share of the budget. The features of the next
+    windows are computed while the replica decodes, so about a quarter of the share
+    (at most 4 threads) goes to the FFT workers and the rest to CTranslate2. With an
+    explicit `cpu_threads`, the FFT workers only use the CPUs of the share left by
+    CTranslate2, and a single worker (the prefetch thread itself) when none is left.
+
+    Arguments:
+      num_workers: Number of model replicas running in parallel.
+      cpu_threads: Threads per replica. When 0, the OMP_NUM_THREADS environment
+        variable is used if set, else the budget is divided between the replicas.
+      cpu_budget: Number of CPUs available, see `get_cpu_budget` when None.
+
+    Returns:
+      The thread plan.
+    """
+    if cpu_budget is None:
+        cpu_budget = get_cpu_budget()
+    num_workers = max(1, num_workers)
+
+    if cpu_threads == 0:
+        omp_num_threads = os.environ.get("OMP_NUM_THREADS", "")
+        if omp_num_threads.isdigit() and int(omp_num_threads) > 0:
+            cpu_threads = int(omp_num_threads)
+
+    share = max(1, cpu_budget // num_workers)
+    if cpu_threads == 0:
+        fft_workers = _clamp(share // 4, 1, _MAX_FFT_WORKERS)
+        cpu_threads = max(1, share - fft_workers)
+    else:
+        fft_workers = _clamp(share - cpu_threads, 1, _MAX_FFT_WORKERS)
+
+    return ThreadPlan(
+        cpu_budget=cpu_budget,
+        intra_threads=cpu_threads,
+        inter_threads=num_workers,
+        fft_workers=fft_workers,
+    )
+
+
+# More FFT workers are not useful: the FFT is a small part of the feature extraction.
+_MAX_FFT_WORKERS = 4
+
+
+def _clamp(value: int, minimum: int, maximum: int) -> int:
+    return max(minimum, min(maximum, value))
+
+
+def _read_file(path: str) -> Optional[str]:
+    try:
+        with open(path, encoding="utf-8") as file:
+            return file.read().strip()
+    except OSError:
+        return None
+
+
+def _get_quota(quota: str, period: str) -> Optional[float]:
+    try:
+        quota, period = int(quota), int(period)
+    except ValueError:
+        return None
+    # cgroup v1 uses -1 for no quota.
+    if quota <= 0 or period <= 0:
+        return None
+    return quota / period
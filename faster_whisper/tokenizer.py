@@ -1,7 +1,9 @@
+import codecs
 import string
+import weakref
 
-from functools import cached_property
-from typing import List, Optional, Tuple
+from functools import cached_property, lru_cache
+from typing import Dict, List, Optional, Tuple
 
 import tokenizers
 
@@ -105,6 +107,28 @@ class Tokenizer:
             [s if isinstance(s, str) else self.tokenizer.decode(s) for s in outputs]
         )
 
+    @cached_property
+    def token_bytes(self) -> Optional[List[bytes]]:
+        """UTF-8 bytes of each text token, or None if the tokenizer is not byte-level.
+
+        Special tokens are skipped when decoding, so they are not in the table. The
+        table is shared by all the wrappers of the same tokenizers.Tokenizer.
+        """
+        if not isinstance(self.tokenizer.decoder, tokenizers.decoders.ByteLevel):
+            return None
+
+        table = _TOKEN_BYTES.get(self.tokenizer)
+        if table is None:
+            byte_decoder = _get_byte_decoder()
+            table = [b""] * self.eot
+            for token, token_id in self.tokenizer.get_vocab(
+                with_added_tokens=False
+            ).items():
+                if token_id < self.eot:
+                    table[token_id] = token.translate(byte_decoder).encode("latin-1")
+            _TOKEN_BYTES[self.tokenizer] = table
+        return table
+
     @cached_property
     def non_speech_tokens(self) -> Tuple[int]:
         """
@@ -154,6 +178,92 @@ class Tokenizer:
 
     def split_tokens_on_unicode(
         self, tokens: List[int]
+    ) -> Tuple[List[str], List[List[int]]]:
+        """Splits the tokens where they are decoded as valid unicode points.
+
+        A group of tokens ends when its decoding has no replacement character, or when
+        the replacement character is also in the decoding of all the tokens. The tokens
+        are decoded incrementally from the `token_bytes` table, which gives the same
+        result as decoding every prefix of the group.
+        """
+        token_bytes = self.token_bytes
+        if token_bytes is None:
+            return self._split_tokens_on_unicode_by_prefix(tokens)
+
+        decoded_full = self.decode_with_timestamps(tokens)
+        replacement_char = "\ufffd"
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+
+        words = []
+        word_tokens = []
+        current_tokens = []
+        current_texts = []
+        current_length = 0
+        replacement_char_index = None
+        unicode_offset = 0
+
+        for token in tokens:
+            if not current_tokens and token < self.eot:
+                # Fast path for a token decoded alone as valid unicode points.
+                try:
+                    text = token_bytes[token].decode("utf-8")
+                except UnicodeDecodeError:
+                    text = None
+                if text is not None and replacement_char not in text:
+                    words.append(text)
+                    word_tokens.append([token])
+                    unicode_offset += len(text)
+                    continue
+
+            current_tokens.append(token)
+
+            if token >= self.timestamp_begin:
+                # The text before a timestamp is decoded separately.
+                texts = [
+                    decoder.decode(b"", final=True),
+                    f"<|{(token - self.timestamp_begin) * 0.02:.2f}|>",
+                ]
+                decoder.reset()
+            else:
+                texts = [
+                    decoder.decode(token_bytes[token] if token < self.eot else b"")
+                ]
+
+            for text in texts:
+                if replacement_char_index is None and replacement_char in text:
+                    replacement_char_index = current_length + text.index(
+                        replacement_char
+                    )
+                current_texts.append(text)
+                current_length += len(text)
+
+            # The bytes of an incomplete character are decoded as a replacement character.
+            incomplete = bool(decoder.getstate()[0])
+            index = replacement_char_index
+            if index is None and incomplete:
+                index = current_length
+            if index is not None:
+                index += unicode_offset
+
+            if index is None or (
+                index < len(decoded_full) and decoded_full[index] == replacement_char
+            ):
+                if incomplete:
+                    current_texts.append(replacement_char)
+                decoded = "".join(current_texts)
+                words.append(decoded)
+                word_tokens.append(current_tokens)
+                current_tokens = []
+                current_texts = []
+                current_length = 0
+                replacement_char_index = None
+                decoder.reset()
+                unicode_offset += len(decoded)
+
+        return words, word_tokens
+
+    def _split_tokens_on_unicode_by_prefix(
+        self, tokens: List[int]
     ) -> Tuple[List[str], List[List[int]]]:
         decoded_full = self.decode_with_timestamps(tokens)
         replacement_char = "\ufffd"
@@ -205,6 +315,27 @@ class Tokenizer:
         return words, word_tokens
 
 
+_TOKEN_BYTES = weakref.WeakKeyDictionary()
+
+
+@lru_cache()
+def _get_byte_decoder() -> Dict[int, int]:
+    """Returns the translation table from the characters used by the byte-level BPE to
+    the bytes they represent."""
+    printable = (
+        list(range(ord("!"), ord("~") + 1))
+        + list(range(ord("¡"), ord("¬") + 1))
+        + list(range(ord("®"), ord("ÿ") + 1))
+    )
+    byte_decoder = {byte: byte for byte in printable}
+    offset = 0
+    for byte in range(256):
+        if byte not in printable:
+            byte_decoder[256 + offset] = byte
+            offset += 1
+    return byte_decoder
+
+
 _TASKS = (
     "transcribe",
     "translate",
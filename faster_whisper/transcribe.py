@@ -1,13 +1,25 @@
+import copy
+import hashlib
 import itertools
 import json
 import logging
 import os
+import time
 import zlib
 
-from dataclasses import asdict, dataclass
+from dataclasses import asdict, dataclass, field
 from inspect import signature
 from math import ceil
-from typing import BinaryIO, Iterable, List, Optional, Tuple, Union
+from typing import (
+    BinaryIO,
+    Callable,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
 from warnings import warn
 
 import ctranslate2
@@ -17,14 +29,41 @@ import tokenizers
 from tqdm import tqdm
 
 from faster_whisper.audio import decode_audio, pad_or_trim
+from faster_whisper.cancellation import (
+    CancellationToken,
+    TranscriptionCancelled,
+    check_cancelled,
+    get_cancellation_token,
+)
+from faster_whisper.checkpoint import (
+    TranscriptionCheckpoint,
+    TranscriptionState,
+    get_fingerprint,
+    hash_blocks,
+)
 from faster_whisper.feature_extractor import FeatureExtractor
+from faster_whisper.long_audio import (
+    AudioSource,
+    LongAudioFeatures,
+    get_speech_num_samples,
+)
+from faster_whisper.progress import ProgressTracker, TranscriptionProgress
+from faster_whisper.telemetry import DecodeAttempt, DecodeTelemetry, WindowTelemetry
+from faster_whisper.threads import plan_threads
 from faster_whisper.tokenizer import _LANGUAGE_CODES, Tokenizer
-from faster_whisper.utils import download_model, format_timestamp, get_end, get_logger
+from faster_whisper.utils import (
+    download_model,
+    format_timestamp,
+    get_end,
+    get_logger,
+    prefetch,
+)
 from faster_whisper.vad import (
     SpeechTimestampsMap,
     VadOptions,
     collect_chunks,
     get_speech_timestamps,
+    get_speech_timestamps_streaming,
 )
 
 
@@ -67,6 +106,178 @@ class Segment:
         return asdict(self)
 
 
+@dataclass
+class AdaptiveBeamOptions:
+    """Adaptive beam size options.
+
+    Each window is first decoded greedily. The window is decoded again with the
+    configured beam size only when the greedy result falls outside the bands below.
+
+    Attributes:
+      log_prob_threshold: Escalate to beam search if the average log probability of the
+        greedy result is below this value.
+      compression_ratio_threshold: Escalate to beam search if the gzip compression ratio of
+        the greedy result is above this value.
+      no_speech_threshold: Escalate to beam search if the no_speech probability of the
+        greedy result is above this value, i.e. when the window is not clearly speech.
+    """
+
+    log_prob_threshold: float = -0.5
+    compression_ratio_threshold: float = 2.0
+    no_speech_threshold: float = 0.3
+
+
+@dataclass
+class AdaptiveBatchOptions:
+    """Adaptive batch size options, used when `batch_size` is "auto".
+
+    The batch size starts at `initial_batch_size` and is doubled while the measured
+    throughput improves. It is halved when the process memory exceeds the limit.
+
+    Attributes:
+      min_batch_size: Minimum batch size.
+      max_batch_size: Maximum batch size.
+      initial_batch_size: Batch size of the first batch.
+      memory_limit_mb: Maximum resident memory of the process in MB. If not set, the
+        limit is the current resident memory plus 80% of the available system memory.
+      growth_threshold: Minimum relative throughput gain required to keep the larger
+        batch size.
+    """
+
+    min_batch_size: int = 1
+    max_batch_size: int = 64
+    initial_batch_size: int = 4
+    memory_limit_mb: Optional[float] = None
+    growth_threshold: float = 0.05
+
+
+class AdaptiveBatchSizer:
+    """Chooses the batch size from the latency of each batch and the process memory."""
+
+    def __init__(self, options: AdaptiveBatchOptions):
+        try:
+            import psutil
+        except ImportError as e:
+            raise RuntimeError(
+                "The adaptive batch size requires the psutil package"
+            ) from e
+
+        self.options = options
+        self.process = psutil.Process()
+        self.base_rss = self.process.memory_info().rss
+
+        if options.memory_limit_mb is not None:
+            self.memory_limit = options.memory_limit_mb * 1024 * 1024
+        else:
+            self.memory_limit = self.base_rss + 0.8 * psutil.virtual_memory().available
+
+        self.batch_size = min(
+            max(options.initial_batch_size, options.min_batch_size),
+            options.max_batch_size,
+        )
+        self.max_batch_size = options.max_batch_size
+        self.growing = True
+        self.previous_batch_size = None
+        self.previous_throughput = None
+
+    def update(self, num_items: int, elapsed: float, batch_size: Optional[int] = None):
+        """Updates the batch size after a batch of `num_items` was decoded in `elapsed`
+        seconds.
+
+        `batch_size` is the size the batch was built with, which is an older size when
+        the batches are built ahead of the decoding. Defaults to the current size.
+        """
+        if batch_size is None:
+            batch_size = self.batch_size
+        rss = self.process.memory_info().rss
+
+        if rss > self.memory_limit:
+            # A batch built before the last reduction must not reduce the size again.
+            self.batch_size = max(
+                self.options.min_batch_size, min(self.batch_size, batch_size // 2)
+            )
+            self.max_batch_size = self.batch_size
+            self.growing = False
+            return
+
+        # A partial batch (e.g. the last one) does not measure the batch size, nor a
+        # batch built with another size.
+        if (
+            not self.growing
+            or batch_size != self.batch_size
+            or num_items < batch_size
+            or elapsed <= 0
+        ):
+            return
+
+        throughput = num_items / elapsed
+
+        if (
+            self.previous_throughput is not None
+            and throughput
+            < self.previous_throughput * (1 + self.options.growth_threshold)
+        ):
+            # The larger batch does not pay off, keep the best size.
+            if throughput < self.previous_throughput:
+                self.batch_size = self.previous_batch_size
+            self.growing = False
+            return
+
+        next_batch_size = min(self.batch_size * 2, self.max_batch_size)
+
+        # Do not grow beyond the size that is expected to reach the memory limit.
+        memory_per_item = max(rss - self.base_rss, 0) / num_items
+        if memory_per_item > 0:
+            next_batch_size = min(
+                next_batch_size,
+                max(
+                    self.batch_size,
+                    int((self.memory_limit - self.base_rss) / memory_per_item),
+                ),
+            )
+
+        if next_batch_size <= self.batch_size:
+            self.growing = False
+            return
+
+        self.previous_batch_size = self.batch_size
+        self.previous_throughput = throughput
+        self.batch_size = next_batch_size
+
+
+@dataclass
+class DecodingStats:
+    """Counters updated while the segments generator is consumed.
+
+    Attributes:
+      num_windows: Number of windows passed to `generate_with_fallback`.
+      num_beam_escalations: Number of windows decoded again with beam search because the
+        greedy result fell outside the adaptive beam bands.
+      beam_escalation_starts: Start of each of these windows in seconds of the decoded
+        audio (after VAD), like the window starts of the telemetry.
+      batch_sizes: Size of each batch decoded by `BatchedInferencePipeline`.
+      num_fallbacks: Number of decodings at a fallback temperature, after the result of
+        the previous temperature failed the compression ratio or log probability checks.
+    """
+
+    num_windows: int = 0
+    num_beam_escalations: int = 0
+    beam_escalation_starts: List[float] = field(default_factory=list)
+    batch_sizes: List[int] = field(default_factory=list)
+    num_fallbacks: int = 0
+
+    def add(self, other: "DecodingStats", offset: float = 0.0):
+        """Adds the counters of another transcription, e.g. of another part of the
+        same audio starting at `offset` seconds."""
+        self.num_windows += other.num_windows
+        self.num_beam_escalations += other.num_beam_escalations
+        self.beam_escalation_starts.extend(
+            start + offset for start in other.beam_escalation_starts
+        )
+        self.batch_sizes.extend(other.batch_sizes)
+        self.num_fallbacks += other.num_fallbacks
+
+
 @dataclass
 class TranscriptionOptions:
     beam_size: int
@@ -95,6 +306,8 @@ class TranscriptionOptions:
     clip_timestamps: Union[str, List[float]]
     hallucination_silence_threshold: Optional[float]
     hotwords: Optional[str]
+    speculative_fallback: bool = False
+    adaptive_beam: Optional[AdaptiveBeamOptions] = None
 
 
 @dataclass
@@ -106,6 +319,8 @@ class TranscriptionInfo:
     all_language_probs: Optional[List[Tuple[str, float]]]
     transcription_options: TranscriptionOptions
     vad_options: VadOptions
+    decoding_stats: DecodingStats = field(default_factory=DecodingStats)
+    telemetry: Optional[DecodeTelemetry] = None
 
 
 class BatchedInferencePipeline:
@@ -116,11 +331,21 @@ class BatchedInferencePipeline:
         self.model: WhisperModel = model
         self.last_speech_timestamp = 0.0
 
-    def forward(self, features, tokenizer, chunks_metadata, options):
+    def forward(
+        self,
+        features,
+        tokenizer,
+        chunks_metadata,
+        options,
+        cancellation_token=None,
+        stats=None,
+        windows=None,
+    ):
         encoder_output, outputs = self.generate_segment_batched(
-            features, tokenizer, options
+            features, tokenizer, options, cancellation_token, stats, windows
         )
 
+        postprocess_start = time.perf_counter()
         segmented_outputs = []
         segment_sizes = []
         for chunk_metadata, output in zip(chunks_metadata, outputs):
@@ -154,11 +379,18 @@ class BatchedInferencePipeline:
                         seek=int(
                             chunk_metadata["offset"] * self.model.frames_per_second
                         ),
+                        temperature=output["temperature"],
                     )
                     for subsegment in subsegments
                 ]
             )
+        if windows is not None:
+            postprocess_time = time.perf_counter() - postprocess_start
+            for window in windows:
+                window.postprocess_time = postprocess_time / len(windows)
+
         if options.word_timestamps:
+            alignment_start = time.perf_counter()
             self.last_speech_timestamp = self.model.add_word_timestamps(
                 segmented_outputs,
                 tokenizer,
@@ -168,6 +400,10 @@ class BatchedInferencePipeline:
                 options.append_punctuations,
                 self.last_speech_timestamp,
             )
+            if windows is not None:
+                alignment_time = time.perf_counter() - alignment_start
+                for window in windows:
+                    window.alignment_time = alignment_time / len(windows)
 
         return segmented_outputs
 
@@ -176,7 +412,15 @@ class BatchedInferencePipeline:
         features: np.ndarray,
         tokenizer: Tokenizer,
         options: TranscriptionOptions,
+        cancellation_token: Optional[CancellationToken] = None,
+        stats: Optional[Union[DecodingStats, List[DecodingStats]]] = None,
+        windows: Optional[List[WindowTelemetry]] = None,
     ):
+        """Decodes a batch of features.
+
+        `stats` are the decoding stats of the batch, or a list with the decoding stats
+        of each item.
+        """
         batch_size = features.shape[0]
 
         prompt = self.model.get_prompt(
@@ -206,7 +450,13 @@ class BatchedInferencePipeline:
                 f"so that their combined length is less that {self.model.max_length}."
             )
 
+        encode_start = time.perf_counter()
         encoder_output = self.model.encode(features)
+        if windows is not None:
+            encode_time = time.perf_counter() - encode_start
+            for window in windows:
+                window.encode_time = encode_time / batch_size
+                window.batch_size = batch_size
         prompts = [prompt.copy() for _ in range(batch_size)]
 
         if options.multilingual:
@@ -219,38 +469,125 @@ class BatchedInferencePipeline:
             for i, language_token in enumerate(language_tokens):
                 prompts[i][language_token_index] = language_token
 
-        results = self.model.model.generate(
-            encoder_output,
-            prompts,
-            beam_size=options.beam_size,
-            patience=options.patience,
-            length_penalty=options.length_penalty,
-            max_length=max_length,
-            suppress_blank=options.suppress_blank,
-            suppress_tokens=options.suppress_tokens,
-            return_scores=True,
-            return_no_speech_prob=True,
-            sampling_temperature=options.temperatures[0],
-            repetition_penalty=options.repetition_penalty,
-            no_repeat_ngram_size=options.no_repeat_ngram_size,
-        )
+        output = [None] * batch_size
+        all_outputs = [[] for _ in range(batch_size)]
+        pending_indices = list(range(batch_size))
 
-        output = []
-        for result in results:
-            # return scores
-            seq_len = len(result.sequences_ids[0])
-            cum_logprob = result.scores[0] * (seq_len**options.length_penalty)
+        # The items failing the compression ratio or log probability checks are decoded
+        # again together at the next temperature.
+        for temperature in options.temperatures:
+            check_cancelled(cancellation_token)
+            if temperature > 0:
+                kwargs = {
+                    "beam_size": 1,
+                    "num_hypotheses": options.best_of,
+                    "sampling_topk": 0,
+                    "sampling_temperature": temperature,
+                }
+            else:
+                kwargs = {
+                    "beam_size": options.beam_size,
+                    "patience": options.patience,
+                }
 
-            output.append(
-                dict(
+            generate_start = time.perf_counter()
+            results = self.model.model.generate(
+                self._select_encoder_output(encoder_output, features, pending_indices),
+                [prompts[i] for i in pending_indices],
+                length_penalty=options.length_penalty,
+                max_length=max_length,
+                suppress_blank=options.suppress_blank,
+                suppress_tokens=options.suppress_tokens,
+                return_scores=True,
+                return_no_speech_prob=True,
+                repetition_penalty=options.repetition_penalty,
+                no_repeat_ngram_size=options.no_repeat_ngram_size,
+                **kwargs,
+            )
+            generate_time = time.perf_counter() - generate_start
+
+            failed_indices = []
+            for index, result in zip(pending_indices, results):
+                # return scores
+                seq_len = len(result.sequences_ids[0])
+                cum_logprob = result.scores[0] * (seq_len**options.length_penalty)
+
+                item_output = dict(
                     avg_logprob=cum_logprob / (seq_len + 1),
                     no_speech_prob=result.no_speech_prob,
                     tokens=result.sequences_ids[0],
+                    temperature=temperature,
+                    compression_ratio=get_compression_ratio(
+                        tokenizer.decode(result.sequences_ids[0]).strip()
+                    ),
+                )
+                all_outputs[index].append(item_output)
+                fallback_reason = get_fallback_reason(item_output, options)
+
+                if windows is not None:
+                    windows[index].attempts.append(
+                        DecodeAttempt(
+                            temperature=temperature,
+                            beam_size=kwargs["beam_size"],
+                            time=generate_time / len(pending_indices),
+                            num_tokens=len(item_output["tokens"]),
+                            avg_logprob=item_output["avg_logprob"],
+                            compression_ratio=item_output["compression_ratio"],
+                            fallback_reason=fallback_reason,
+                        )
+                    )
+
+                if fallback_reason is not None:
+                    failed_indices.append(index)
+                else:
+                    output[index] = item_output
+
+            pending_indices = failed_indices
+            if not pending_indices:
+                break
+
+            if temperature != options.temperatures[-1]:
+                self.model.logger.debug(
+                    "Decoding %d of %d items again after temperature %.1f",
+                    len(pending_indices),
+                    batch_size,
+                    temperature,
                 )
+
+        for index in pending_indices:
+            # all failed, select the result with the highest average log probability
+            below_cr_threshold_outputs = [
+                item_output
+                for item_output in all_outputs[index]
+                if options.compression_ratio_threshold is None
+                or item_output["compression_ratio"]
+                <= options.compression_ratio_threshold
+            ]
+            output[index] = max(
+                below_cr_threshold_outputs or all_outputs[index],
+                key=lambda item_output: item_output["avg_logprob"],
+            )
+
+        if isinstance(stats, DecodingStats):
+            stats.num_fallbacks += sum(
+                len(item_outputs) - 1 for item_outputs in all_outputs
             )
+        elif stats is not None:
+            for item_stats, item_outputs in zip(stats, all_outputs):
+                item_stats.num_fallbacks += len(item_outputs) - 1
 
         return encoder_output, output
 
+    def _select_encoder_output(self, encoder_output, features, indices):
+        if len(indices) == features.shape[0]:
+            return encoder_output
+
+        if encoder_output.device == "cpu":
+            return get_ctranslate2_storage(np.asarray(encoder_output)[indices])
+
+        # The encoder output cannot be sliced on the device, encode the items again.
+        return self.model.encode(features[indices])
+
     def transcribe(
         self,
         audio: Union[str, BinaryIO, np.ndarray],
@@ -292,10 +629,22 @@ class BatchedInferencePipeline:
         chunk_length: Optional[int] = None,
         clip_timestamps: Optional[List[dict]] = None,
         hallucination_silence_threshold: Optional[float] = None,
-        batch_size: int = 8,
+        batch_size: Union[int, str] = 8,
+        duration_bucketing: bool = False,
+        adaptive_batch_parameters: Optional[Union[dict, AdaptiveBatchOptions]] = None,
         hotwords: Optional[str] = None,
         language_detection_threshold: Optional[float] = 0.5,
         language_detection_segments: int = 1,
+        speculative_fallback: bool = False,
+        adaptive_beam: bool = False,
+        adaptive_beam_parameters: Optional[Union[dict, AdaptiveBeamOptions]] = None,
+        long_audio: bool = False,
+        checkpoint_path: Optional[str] = None,
+        checkpoint_interval: float = 60.0,
+        cancellation_token: Optional[CancellationToken] = None,
+        deadline: Optional[float] = None,
+        progress_callback: Optional[Callable[[TranscriptionProgress], None]] = None,
+        telemetry: bool = False,
     ) -> Tuple[Iterable[Segment], TranscriptionInfo]:
         """transcribe audio in chunks in batched fashion and return with language info.
 
@@ -313,8 +662,17 @@ class BatchedInferencePipeline:
             repetition_penalty: Penalty applied to the score of previously generated tokens
                 (set > 1 to penalize).
             no_repeat_ngram_size: Prevent repetitions of ngrams with this size (set 0 to disable).
-            temperature: Temperature for sampling. If a list or tuple is passed,
-                only the first value is used.
+            temperature: Temperature for sampling. It can be a tuple of temperatures,
+                which will be successively used upon failures according to either
+                `compression_ratio_threshold` or `log_prob_threshold`. The failing items of a
+                batch are decoded again together at the next temperature.
+            compression_ratio_threshold: If the gzip compression ratio is above this value,
+                treat as failed.
+            log_prob_threshold: If the average log probability over sampled tokens is
+                below this value, treat as failed.
+            no_speech_threshold: If the no_speech probability is higher than this value AND
+                the average log probability over sampled tokens is below `log_prob_threshold`,
+                consider the segment as silent.
             initial_prompt: Optional text string or iterable of token ids to provide as a
                 prompt for the each window.
             suppress_blank: Suppress blank outputs at the beginning of the sampling.
@@ -342,20 +700,37 @@ class BatchedInferencePipeline:
                 "end" keys that specify the start and end of the voiced region within
                 `chunk_length` boundary. vad_filter will be ignored if clip_timestamps is used.
             batch_size: the maximum number of parallel requests to model for decoding.
+                If "auto", the batch size is adapted to the measured throughput and memory
+                usage, and the chosen sizes are reported in `TranscriptionInfo.decoding_stats`.
+            adaptive_batch_parameters: Dictionary of adaptive batch parameters or
+                AdaptiveBatchOptions class (see available parameters and default values in the
+                class `AdaptiveBatchOptions`). Only used when `batch_size` is "auto".
+            duration_bucketing: Decode the chunks sorted by speech duration so that each batch
+                contains chunks with similar token counts. The segments are still returned in
+                timeline order, but the first segments may come later.
             hotwords:
                 Hotwords/hint phrases to the model. Has no effect if prefix is not None.
             language_detection_threshold: If the maximum probability of the language tokens is
                 higher than this value, the language is detected.
             language_detection_segments: Number of segments to consider for the language detection.
+            checkpoint_path: Save the decoded chunks periodically to this JSON file. If the
+                file exists and was saved for the same audio and arguments, the chunks already
+                decoded are not decoded again. With `batch_size="auto"`, the remaining batches
+                can differ from the interrupted run.
+            checkpoint_interval: Minimum number of seconds between two checkpoint saves.
+            cancellation_token: Stop the transcription when this token is cancelled. The
+                VAD and the decoding raise `TranscriptionCancelled` at their next step, and
+                the checkpoint is saved.
+            deadline: Maximum number of seconds for the transcription, from this call to the
+                last segment. The transcription is then cancelled like with
+                `cancellation_token`.
+            progress_callback: Function called with a `TranscriptionProgress` after each
+                decoded batch, with the processed audio duration, the real-time factor, the
+                number of fallbacks and the estimated remaining time.
+            telemetry: Record the encoding, generation, alignment and post-processing times
+                of each chunk in `TranscriptionInfo.telemetry` (see `DecodeTelemetry`).
 
         Unused Arguments
-            compression_ratio_threshold: If the gzip compression ratio is above this value,
-                treat as failed.
-            log_prob_threshold: If the average log probability over sampled tokens is
-                below this value, treat as failed.
-            no_speech_threshold: If the no_speech probability is higher than this value AND
-                the average log probability over sampled tokens is below `log_prob_threshold`,
-                consider the segment as silent.
             condition_on_previous_text: If True, the previous output of the model is provided
                 as a prompt for the next window; disabling may make the text inconsistent across
                 windows, but the model becomes less prone to getting stuck in a failure loop,
@@ -367,15 +742,507 @@ class BatchedInferencePipeline:
             hallucination_silence_threshold: Optional[float]
                 When word_timestamps is True, skip silent periods longer than this threshold
                 (in seconds) when a possible hallucination is detected. set as None.
+            speculative_fallback: Not supported in batched mode, where the windows
+                failing at a temperature are already decoded together at the next
+                temperature. A warning is logged when set.
+            long_audio: Compute the features window by window. Set as False.
+            adaptive_beam: Not supported in batched mode, where all the windows of a
+                batch are decoded with the same beam size. A warning is logged when set.
+            adaptive_beam_parameters: Not supported in batched mode.
         Returns:
           A tuple with:
 
             - a generator over transcribed segments
             - an instance of TranscriptionInfo
         """
+        # The checkpoint is only resumed with the same arguments.
+        arguments = dict(locals())
+        for name in (
+            "self",
+            "audio",
+            "log_progress",
+            "checkpoint_path",
+            "checkpoint_interval",
+            "cancellation_token",
+            "deadline",
+            "progress_callback",
+            "telemetry",
+        ):
+            arguments.pop(name)
+
+        start_time = time.perf_counter()
+        cancellation_token = get_cancellation_token(cancellation_token, deadline)
 
         sampling_rate = self.model.feature_extractor.sampling_rate
 
+        checkpoint = None
+        state = None
+        if checkpoint_path is not None:
+            if not isinstance(audio, np.ndarray):
+                audio = decode_audio(audio, sampling_rate=sampling_rate)
+            checkpoint = TranscriptionCheckpoint(checkpoint_path, checkpoint_interval)
+            fingerprint = get_fingerprint(audio, arguments)
+            state = checkpoint.load(fingerprint)
+            if state is not None:
+                language = state.language
+
+        (
+            audio_chunks,
+            chunks_metadata,
+            clip_timestamps,
+            tokenizer,
+            options,
+            info,
+        ) = self._prepare_transcription(
+            audio,
+            language=language,
+            task=task,
+            beam_size=beam_size,
+            best_of=best_of,
+            patience=patience,
+            length_penalty=length_penalty,
+            repetition_penalty=repetition_penalty,
+            no_repeat_ngram_size=no_repeat_ngram_size,
+            temperature=temperature,
+            compression_ratio_threshold=compression_ratio_threshold,
+            log_prob_threshold=log_prob_threshold,
+            no_speech_threshold=no_speech_threshold,
+            condition_on_previous_text=condition_on_previous_text,
+            prompt_reset_on_temperature=prompt_reset_on_temperature,
+            initial_prompt=initial_prompt,
+            prefix=prefix,
+            suppress_blank=suppress_blank,
+            suppress_tokens=suppress_tokens,
+            without_timestamps=without_timestamps,
+            max_initial_timestamp=max_initial_timestamp,
+            word_timestamps=word_timestamps,
+            prepend_punctuations=prepend_punctuations,
+            append_punctuations=append_punctuations,
+            multilingual=multilingual,
+            vad_filter=vad_filter,
+            vad_parameters=vad_parameters,
+            max_new_tokens=max_new_tokens,
+            chunk_length=chunk_length,
+            clip_timestamps=clip_timestamps,
+            hallucination_silence_threshold=hallucination_silence_threshold,
+            hotwords=hotwords,
+            language_detection_threshold=language_detection_threshold,
+            language_detection_segments=language_detection_segments,
+            speculative_fallback=speculative_fallback,
+            adaptive_beam=adaptive_beam,
+            adaptive_beam_parameters=adaptive_beam_parameters,
+            speech_chunks=state.speech_chunks if state is not None else None,
+            cancellation_token=cancellation_token,
+        )
+
+        if state is not None:
+            info.language_probability = state.language_probability
+            info.all_language_probs = state.all_language_probs
+        elif checkpoint is not None:
+            state = TranscriptionState(
+                fingerprint=fingerprint,
+                language=info.language,
+                language_probability=info.language_probability,
+                all_language_probs=info.all_language_probs,
+                speech_chunks=clip_timestamps,
+            )
+
+        if batch_size == "auto":
+            batch_size = get_adaptive_batch_sizer(adaptive_batch_parameters)
+
+        if telemetry:
+            info.telemetry = DecodeTelemetry()
+
+        progress = None
+        if progress_callback is not None:
+            progress = ProgressTracker(
+                progress_callback,
+                info.duration,
+                info.duration_after_vad,
+                info.decoding_stats,
+                start_time,
+            )
+
+        segments = self._batched_segments_generator(
+            audio_chunks,
+            tokenizer,
+            chunks_metadata,
+            batch_size,
+            options,
+            log_progress,
+            duration_bucketing,
+            info.decoding_stats,
+            checkpoint,
+            state,
+            cancellation_token,
+            progress,
+            info.telemetry,
+        )
+        if checkpoint is not None:
+            segments = save_checkpoint_on_cancel(segments, checkpoint, state)
+        segments = restore_speech_timestamps(segments, clip_timestamps, sampling_rate)
+
+        return segments, info
+
+    def transcribe_many(
+        self,
+        audios: Iterable[Union[str, BinaryIO, np.ndarray]],
+        batch_size: Union[int, str] = 8,
+        log_progress: bool = False,
+        duration_bucketing: bool = False,
+        adaptive_batch_parameters: Optional[Union[dict, AdaptiveBatchOptions]] = None,
+        **kwargs,
+    ) -> Iterator[Tuple[Iterable[Segment], TranscriptionInfo]]:
+        """transcribe multiple audio inputs and pack their chunks in shared batches.
+
+        Short inputs produce fewer chunks than `batch_size`, so the chunks of several
+        inputs are decoded together to keep the batches full. The segments are then
+        routed back to a generator for each input.
+
+        The inputs are read and prepared (audio decoding, VAD and language detection)
+        while the previous batches are decoded, only a few batches ahead, and the audio
+        of a chunk is released once the chunk is in a batch. So `audios` can be a
+        generator over a large directory.
+
+        Arguments:
+            audios: Paths to the input files (or file-like objects), or audio waveforms.
+            batch_size: the maximum number of parallel requests to model for decoding,
+                or "auto" to adapt it to the measured throughput and memory usage.
+            log_progress: whether to show progress bar or not.
+            duration_bucketing: Decode the chunks of the prepared inputs sorted by speech
+                duration (see `transcribe`).
+            adaptive_batch_parameters: Dictionary of adaptive batch parameters or
+                AdaptiveBatchOptions class. Only used when `batch_size` is "auto".
+            kwargs: Other arguments of `transcribe`, applied to all inputs, except
+                `long_audio`, `checkpoint_path` and `checkpoint_interval` which are
+                only supported for a single input (a ValueError is raised). The
+                `progress_callback` receives the progress of all inputs together, the
+                durations growing as the inputs are prepared. With `telemetry`, the
+                windows of a batch are recorded in the telemetry of their input.
+
+        Returns:
+          An iterator yielding a tuple for each input, in order, once it is prepared:
+
+            - a generator over the transcribed segments of the input
+            - an instance of TranscriptionInfo
+
+          The generators can be consumed in any order. The segments of other inputs that
+          are decoded in the meantime are buffered. The `decoding_stats` of each input
+          record the batches that contained its chunks.
+        """
+        unsupported = [
+            name for name in kwargs if name not in _TRANSCRIBE_MANY_ARGUMENTS
+        ]
+        if unsupported:
+            raise ValueError(
+                "transcribe_many does not support the arguments: %s"
+                % ", ".join(sorted(unsupported))
+            )
+
+        start_time = time.perf_counter()
+        sampling_rate = self.model.feature_extractor.sampling_rate
+        cancellation_token = get_cancellation_token(
+            kwargs.pop("cancellation_token", None), kwargs.pop("deadline", None)
+        )
+        progress_callback = kwargs.pop("progress_callback", None)
+        telemetry = kwargs.pop("telemetry", False)
+
+        if batch_size == "auto":
+            batch_size = get_adaptive_batch_sizer(adaptive_batch_parameters)
+
+        progress = None
+        if progress_callback is not None:
+            # The progress covers all inputs. The durations are added as the inputs
+            # are prepared.
+            progress = ProgressTracker(
+                progress_callback, 0.0, 0.0, DecodingStats(), start_time
+            )
+
+        packed_results = self._packed_chunks_generator(
+            audios,
+            kwargs,
+            batch_size,
+            log_progress,
+            duration_bucketing,
+            cancellation_token,
+            progress,
+            telemetry,
+        )
+        # prepared inputs and reorder buffers of their decoded chunks, keyed by chunk
+        # index, until the segments of the input are consumed
+        prepared = {}
+        pending_results = {}
+
+        def read_result() -> bool:
+            result = next(packed_results, None)
+            if result is None:
+                return False
+            file_index, chunk_index, value = result
+            if chunk_index is None:
+                prepared[file_index] = value
+                pending_results[file_index] = {}
+            else:
+                pending_results[file_index][chunk_index] = value
+            return True
+
+        def file_segments_generator(file_index):
+            audio_chunks, _, _, _, options, _ = prepared[file_index]
+            seg_idx = 0
+
+            for chunk_index in range(len(audio_chunks)):
+                while chunk_index not in pending_results[file_index]:
+                    read_result()
+
+                for segment in pending_results[file_index].pop(chunk_index):
+                    seg_idx += 1
+                    yield self._make_segment(segment, seg_idx, options)
+
+            del prepared[file_index], pending_results[file_index]
+
+        def results_generator():
+            for file_index in itertools.count():
+                while file_index not in prepared:
+                    if not read_result():
+                        return
+
+                _, _, clip_timestamps, _, _, info = prepared[file_index]
+                segments = restore_speech_timestamps(
+                    file_segments_generator(file_index), clip_timestamps, sampling_rate
+                )
+                yield segments, info
+
+        return results_generator()
+
+    def _packed_chunks_generator(
+        self,
+        audios,
+        prepare_kwargs,
+        batch_size,
+        log_progress,
+        duration_bucketing=False,
+        cancellation_token=None,
+        progress=None,
+        telemetry=False,
+    ):
+        """Prepares the inputs and decodes their chunks in shared batches.
+
+        Yields `(file_index, None, prepared)` when an input is prepared, before its
+        chunks, and `(file_index, chunk_index, segments)` when a chunk is decoded.
+        """
+
+        def batches():
+            inputs = enumerate(audios)
+            prepared = {}
+            # chunks of the prepared inputs not yet in a batch, in input order
+            pending = []
+            exhausted = False
+
+            while True:
+                size = get_batch_size(batch_size)
+
+                # Only the inputs needed for the next batches are read and prepared.
+                while not exhausted and len(pending) < 2 * size:
+                    file_index, audio = next(inputs, (None, None))
+                    if file_index is None:
+                        exhausted = True
+                        break
+
+                    prepared_input = self._prepare_transcription(
+                        audio, cancellation_token=cancellation_token, **prepare_kwargs
+                    )
+                    yield "input", (file_index, prepared_input)
+                    if prepared_input[0]:
+                        prepared[file_index] = prepared_input
+                        pending.extend(
+                            (file_index, chunk_index)
+                            for chunk_index in range(len(prepared_input[0]))
+                        )
+
+                if not pending:
+                    return
+
+                # Chunks can only share a batch when they are decoded with the same
+                # prompt, the oldest pending chunk decides.
+                _, _, _, tokenizer, options, _ = prepared[pending[0][0]]
+                key = (tokenizer.language_code, tokenizer.task)
+                items = [
+                    item
+                    for item in pending
+                    if (
+                        prepared[item[0]][3].language_code,
+                        prepared[item[0]][3].task,
+                    )
+                    == key
+                ]
+                if duration_bucketing:
+                    items.sort(
+                        key=lambda item: prepared[item[0]][1][item[1]]["duration"]
+                    )
+                batch_items = items[:size]
+                dispatched = set(batch_items)
+                pending = [item for item in pending if item not in dispatched]
+
+                features = self._get_features(
+                    [
+                        prepared[file_index][0][chunk_index]
+                        for file_index, chunk_index in batch_items
+                    ]
+                )
+                # The audio of the dispatched chunks is no longer needed.
+                for file_index, chunk_index in batch_items:
+                    prepared[file_index][0][chunk_index] = None
+                pending_files = {file_index for file_index, _ in pending}
+                for file_index in {file_index for file_index, _ in batch_items}:
+                    if file_index not in pending_files:
+                        del prepared[file_index]
+
+                yield "batch", (tokenizer, options, batch_items, size, features)
+
+        prepared = {}
+        # number of chunks of each prepared input that are not decoded yet
+        remaining = {}
+        pbar = tqdm(disable=not log_progress, position=0)
+        for kind, value in prefetch(batches()):
+            if kind == "input":
+                file_index, prepared_input = value
+                info = prepared_input[5]
+                if telemetry:
+                    info.telemetry = DecodeTelemetry()
+                if progress is not None:
+                    progress.duration += info.duration
+                    progress.duration_after_vad += info.duration_after_vad
+                if prepared_input[0]:
+                    prepared[file_index] = prepared_input
+                    remaining[file_index] = len(prepared_input[0])
+                yield file_index, None, prepared_input
+                continue
+
+            tokenizer, options, batch_items, size, features = value
+            check_cancelled(cancellation_token)
+            # The batch can contain chunks of several inputs, so the word timestamps
+            # are not constrained by the previous batch.
+            self.last_speech_timestamp = 0.0
+            start_time = time.perf_counter()
+            chunks_metadata = [
+                prepared[file_index][1][chunk_index]
+                for file_index, chunk_index in batch_items
+            ]
+            windows = None
+            if telemetry:
+                windows = [
+                    WindowTelemetry(
+                        start=metadata["offset"], duration=metadata["duration"]
+                    )
+                    for metadata in chunks_metadata
+                ]
+                for (file_index, _), window in zip(batch_items, windows):
+                    prepared[file_index][5].telemetry.windows.append(window)
+
+            # The counters of each chunk go to the decoding stats of its input.
+            chunks_stats = [DecodingStats() for _ in batch_items]
+            results = self.forward(
+                features,
+                tokenizer,
+                chunks_metadata,
+                options,
+                cancellation_token,
+                chunks_stats,
+                windows,
+            )
+            if isinstance(batch_size, AdaptiveBatchSizer):
+                batch_size.update(
+                    len(batch_items), time.perf_counter() - start_time, size
+                )
+            for file_index in dict.fromkeys(
+                file_index for file_index, _ in batch_items
+            ):
+                prepared[file_index][5].decoding_stats.batch_sizes.append(
+                    len(batch_items)
+                )
+            for (file_index, _), chunk_stats in zip(batch_items, chunks_stats):
+                prepared[file_index][5].decoding_stats.add(chunk_stats)
+                if progress is not None:
+                    progress.stats.add(chunk_stats)
+            if progress is not None:
+                progress.stats.batch_sizes.append(len(batch_items))
+                progress.update(
+                    sum(metadata["duration"] for metadata in chunks_metadata)
+                )
+
+            for (file_index, chunk_index), result in zip(batch_items, results):
+                remaining[file_index] -= 1
+                if not remaining[file_index]:
+                    del prepared[file_index], remaining[file_index]
+                yield file_index, chunk_index, result
+                pbar.update(1)
+
+        pbar.close()
+        self.last_speech_timestamp = 0.0
+
+    def _prepare_transcription(
+        self,
+        audio: Union[str, BinaryIO, np.ndarray],
+        language: Optional[str] = None,
+        task: str = "transcribe",
+        beam_size: int = 5,
+        best_of: int = 5,
+        patience: float = 1,
+        length_penalty: float = 1,
+        repetition_penalty: float = 1,
+        no_repeat_ngram_size: int = 0,
+        temperature: Union[float, List[float], Tuple[float, ...]] = [
+            0.0,
+            0.2,
+            0.4,
+            0.6,
+            0.8,
+            1.0,
+        ],
+        compression_ratio_threshold: Optional[float] = 2.4,
+        log_prob_threshold: Optional[float] = -1.0,
+        no_speech_threshold: Optional[float] = 0.6,
+        condition_on_previous_text: bool = True,
+        prompt_reset_on_temperature: float = 0.5,
+        initial_prompt: Optional[Union[str, Iterable[int]]] = None,
+        prefix: Optional[str] = None,
+        suppress_blank: bool = True,
+        suppress_tokens: Optional[List[int]] = [-1],
+        without_timestamps: bool = True,
+        max_initial_timestamp: float = 1.0,
+        word_timestamps: bool = False,
+        prepend_punctuations: str = "\"'“¿([{-",
+        append_punctuations: str = "\"'.。,，!！?？:：”)]}、",
+        multilingual: bool = False,
+        vad_filter: bool = True,
+        vad_parameters: Optional[Union[dict, VadOptions]] = None,
+        max_new_tokens: Optional[int] = None,
+        chunk_length: Optional[int] = None,
+        clip_timestamps: Optional[List[dict]] = None,
+        hallucination_silence_threshold: Optional[float] = None,
+        hotwords: Optional[str] = None,
+        language_detection_threshold: Optional[float] = 0.5,
+        language_detection_segments: int = 1,
+        speculative_fallback: bool = False,
+        adaptive_beam: bool = False,
+        adaptive_beam_parameters: Optional[Union[dict, AdaptiveBeamOptions]] = None,
+        speech_chunks: Optional[List[dict]] = None,
+        cancellation_token: Optional[CancellationToken] = None,
+    ) -> Tuple[
+        Union[List[np.ndarray], np.ndarray],
+        List[dict],
+        List[dict],
+        Tokenizer,
+        TranscriptionOptions,
+        TranscriptionInfo,
+    ]:
+        """Decodes the audio, splits it in chunks and detects the language.
+
+        The arguments are the same as `transcribe`, except `cancellation_token` which is
+        the token combined with the deadline. When `speech_chunks` is set, it is used
+        instead of running the VAD again.
+        """
+        sampling_rate = self.model.feature_extractor.sampling_rate
+
         if multilingual and not self.model.model.is_multilingual:
             self.model.logger.warning(
                 "The current model is English-only but the multilingual parameter is set to"
@@ -383,6 +1250,18 @@ class BatchedInferencePipeline:
             )
             multilingual = False
 
+        if speculative_fallback:
+            self.model.logger.warning(
+                "The speculative_fallback parameter has no effect in batched mode: the "
+                "windows failing at a temperature are already decoded together at the "
+                "next temperature."
+            )
+        if adaptive_beam:
+            self.model.logger.warning(
+                "The adaptive_beam parameter has no effect in batched mode: the windows "
+                "of a batch are decoded with the same beam size."
+            )
+
         if not isinstance(audio, np.ndarray):
             audio = decode_audio(audio, sampling_rate=sampling_rate)
         duration = audio.shape[0] / sampling_rate
@@ -407,8 +1286,13 @@ class BatchedInferencePipeline:
                     vad_parameters = VadOptions(
                         **vad_parameters, max_speech_duration_s=chunk_length
                     )
-
-                clip_timestamps = get_speech_timestamps(audio, vad_parameters)
+
+                if speech_chunks is not None:
+                    clip_timestamps = speech_chunks
+                else:
+                    clip_timestamps = get_speech_timestamps(
+                        audio, vad_parameters, cancellation_token=cancellation_token
+                    )
             # run the audio if it is less than 30 sec even without clip_timestamps
             elif duration < chunk_length:
                 clip_timestamps = [{"start": 0, "end": audio.shape[0]}]
@@ -449,11 +1333,9 @@ class BatchedInferencePipeline:
             format_timestamp(duration - duration_after_vad),
         )
 
-        features = (
-            [self.model.feature_extractor(chunk)[..., :-1] for chunk in audio_chunks]
-            if duration_after_vad
-            else []
-        )
+        # The features are computed per batch while decoding, see `_get_features`.
+        if not duration_after_vad:
+            audio_chunks = []
 
         all_language_probs = None
         # detecting the language if not provided
@@ -462,20 +1344,40 @@ class BatchedInferencePipeline:
                 language = "en"
                 language_probability = 1
             else:
+                # Only compute the features of the chunks used by the language detection,
+                # and only keep the frames of the detection windows.
+                detection_frames = (
+                    language_detection_segments
+                    * self.model.feature_extractor.nb_max_frames
+                )
+                detection_features = []
+                num_frames = 0
+                for chunk in audio_chunks:
+                    if num_frames >= detection_frames:
+                        break
+                    chunk_features = self.model.feature_extractor(chunk)[..., :-1]
+                    chunk_features = chunk_features[
+                        ..., : detection_frames - num_frames
+                    ]
+                    detection_features.append(chunk_features)
+                    num_frames += chunk_features.shape[-1]
+
                 (
                     language,
                     language_probability,
                     all_language_probs,
-                ) = self.model.detect_language(
-                    features=np.concatenate(
-                        features
-                        + [
-                            np.full((self.model.model.n_mels, 1), -1.5, dtype="float32")
-                        ],
-                        axis=1,
-                    ),  # add a dummy feature to account for empty audio
-                    language_detection_segments=language_detection_segments,
-                    language_detection_threshold=language_detection_threshold,
+                    _,
+                ) = self.model._detect_language(
+                    (
+                        np.concatenate(detection_features, axis=1)
+                        if detection_features
+                        # a dummy feature to account for empty audio
+                        else np.full(
+                            (self.model.model.n_mels, 1), -1.5, dtype="float32"
+                        )
+                    ),
+                    language_detection_segments,
+                    language_detection_threshold,
                 )
 
                 self.model.logger.info(
@@ -493,16 +1395,7 @@ class BatchedInferencePipeline:
 
             language_probability = 1
 
-        tokenizer = Tokenizer(
-            self.model.hf_tokenizer,
-            self.model.model.is_multilingual,
-            task=task,
-            language=language,
-        )
-
-        features = (
-            np.stack([pad_or_trim(feature) for feature in features]) if features else []
-        )
+        tokenizer = self.model._get_tokenizer(task, language)
 
         options = TranscriptionOptions(
             beam_size=beam_size,
@@ -515,17 +1408,13 @@ class BatchedInferencePipeline:
             no_speech_threshold=no_speech_threshold,
             compression_ratio_threshold=compression_ratio_threshold,
             temperatures=(
-                temperature[:1]
-                if isinstance(temperature, (list, tuple))
-                else [temperature]
+                temperature if isinstance(temperature, (list, tuple)) else [temperature]
             ),
             initial_prompt=initial_prompt,
             prefix=prefix,
             suppress_blank=suppress_blank,
-            suppress_tokens=(
-                get_suppressed_tokens(tokenizer, suppress_tokens)
-                if suppress_tokens
-                else suppress_tokens
+            suppress_tokens=self.model._get_suppressed_tokens(
+                tokenizer, suppress_tokens
             ),
             prepend_punctuations=prepend_punctuations,
             append_punctuations=append_punctuations,
@@ -551,57 +1440,156 @@ class BatchedInferencePipeline:
             all_language_probs=all_language_probs,
         )
 
-        segments = self._batched_segments_generator(
-            features,
-            tokenizer,
-            chunks_metadata,
-            batch_size,
-            options,
-            log_progress,
-        )
-        segments = restore_speech_timestamps(segments, clip_timestamps, sampling_rate)
+        return audio_chunks, chunks_metadata, clip_timestamps, tokenizer, options, info
 
-        return segments, info
+    def _get_features(self, audio_chunks: List[np.ndarray]) -> np.ndarray:
+        return np.stack(
+            [
+                pad_or_trim(self.model.feature_extractor(chunk)[..., :-1])
+                for chunk in audio_chunks
+            ]
+        )
 
     def _batched_segments_generator(
-        self, features, tokenizer, chunks_metadata, batch_size, options, log_progress
+        self,
+        audio_chunks,
+        tokenizer,
+        chunks_metadata,
+        batch_size,
+        options,
+        log_progress,
+        duration_bucketing=False,
+        stats=None,
+        checkpoint=None,
+        state=None,
+        cancellation_token=None,
+        progress=None,
+        telemetry=None,
     ):
-        pbar = tqdm(total=len(features), disable=not log_progress, position=0)
+        pbar = tqdm(total=len(audio_chunks), disable=not log_progress, position=0)
         seg_idx = 0
-        for i in range(0, len(features), batch_size):
+
+        # decoded chunks waiting for the previous chunks in the timeline
+        reorder_buffer = {}
+        next_chunk_index = 0
+
+        if state is not None and state.chunk_segments:
+            # Resume from the checkpoint. The state is saved after complete batches, so
+            # the remaining chunks are batched as in the interrupted run.
+            reorder_buffer.update(state.chunk_segments)
+            self.last_speech_timestamp = state.last_speech_timestamp
+            if progress is not None:
+                progress.skip(
+                    sum(chunks_metadata[index]["duration"] for index in reorder_buffer)
+                )
+
+            while next_chunk_index in reorder_buffer:
+                for segment in reorder_buffer.pop(next_chunk_index):
+                    seg_idx += 1
+                    yield self._make_segment(segment, seg_idx, options)
+
+                next_chunk_index += 1
+                pbar.update(1)
+
+        chunk_order = [
+            index
+            for index in range(next_chunk_index, len(audio_chunks))
+            if index not in reorder_buffer
+        ]
+        if duration_bucketing:
+            # Chunks with a similar speech duration have similar token counts, so a batch
+            # is not dominated by a single long decoding.
+            chunk_order.sort(key=lambda index: chunks_metadata[index]["duration"])
+
+        # The features of the next batches are computed in a background thread while the
+        # current batch is decoded, so only a few batches of features are in memory.
+        batches = prefetch(
+            (
+                batch_indices,
+                size,
+                self._get_features([audio_chunks[index] for index in batch_indices]),
+            )
+            for batch_indices, size in iter_batches(chunk_order, batch_size)
+        )
+
+        for batch_indices, size, features in batches:
+            check_cancelled(cancellation_token)
+            if duration_bucketing:
+                # The previous batch is not the previous part of the timeline.
+                self.last_speech_timestamp = 0.0
+
+            windows = None
+            if telemetry is not None:
+                windows = [
+                    WindowTelemetry(
+                        start=chunks_metadata[index]["offset"],
+                        duration=chunks_metadata[index]["duration"],
+                    )
+                    for index in batch_indices
+                ]
+                telemetry.windows.extend(windows)
+
+            start_time = time.perf_counter()
             results = self.forward(
-                features[i : i + batch_size],
+                features,
                 tokenizer,
-                chunks_metadata[i : i + batch_size],
+                [chunks_metadata[index] for index in batch_indices],
                 options,
+                cancellation_token,
+                stats,
+                windows,
             )
+            if isinstance(batch_size, AdaptiveBatchSizer):
+                batch_size.update(
+                    len(batch_indices), time.perf_counter() - start_time, size
+                )
+            if stats is not None:
+                stats.batch_sizes.append(len(batch_indices))
+            if progress is not None:
+                progress.update(
+                    sum(chunks_metadata[index]["duration"] for index in batch_indices)
+                )
+            reorder_buffer.update(zip(batch_indices, results))
+
+            if checkpoint is not None:
+                state.chunk_segments.update(zip(batch_indices, results))
+                state.last_speech_timestamp = self.last_speech_timestamp
+                checkpoint.maybe_save(state)
 
-            for result in results:
-                for segment in result:
+            while next_chunk_index in reorder_buffer:
+                for segment in reorder_buffer.pop(next_chunk_index):
                     seg_idx += 1
-                    yield Segment(
-                        seek=segment["seek"],
-                        id=seg_idx,
-                        text=segment["text"],
-                        start=round(segment["start"], 3),
-                        end=round(segment["end"], 3),
-                        words=(
-                            None
-                            if not options.word_timestamps
-                            else [Word(**word) for word in segment["words"]]
-                        ),
-                        tokens=segment["tokens"],
-                        avg_logprob=segment["avg_logprob"],
-                        no_speech_prob=segment["no_speech_prob"],
-                        compression_ratio=segment["compression_ratio"],
-                        temperature=options.temperatures[0],
-                    )
+                    yield self._make_segment(segment, seg_idx, options)
 
+                next_chunk_index += 1
                 pbar.update(1)
 
         pbar.close()
         self.last_speech_timestamp = 0.0
 
+        if checkpoint is not None:
+            state.finished = True
+            checkpoint.save(state)
+
+    def _make_segment(self, segment, seg_idx, options):
+        return Segment(
+            seek=segment["seek"],
+            id=seg_idx,
+            text=segment["text"],
+            start=round(segment["start"], 3),
+            end=round(segment["end"], 3),
+            words=(
+                None
+                if not options.word_timestamps
+                else [Word(**word) for word in segment["words"]]
+            ),
+            tokens=segment["tokens"],
+            avg_logprob=segment["avg_logprob"],
+            no_speech_prob=segment["no_speech_prob"],
+            compression_ratio=segment["compression_ratio"],
+            temperature=segment["temperature"],
+        )
+
 
 class WhisperModel:
     def __init__(
@@ -635,12 +1623,16 @@ class WhisperModel:
             when transcribe() is called from multiple Python threads (see also num_workers).
           compute_type: Type to use for computation.
             See https://opennmt.net/CTranslate2/quantization.html.
-          cpu_threads: Number of threads to use when running on CPU (4 by default).
-            A non zero value overrides the OMP_NUM_THREADS environment variable.
+          cpu_threads: Number of threads to use when running on CPU. When 0, the
+            OMP_NUM_THREADS environment variable is used if set, else the CPUs available
+            to the process (see `faster_whisper.threads.get_cpu_budget`) are divided
+            between the workers. A non zero value overrides OMP_NUM_THREADS.
           num_workers: When transcribe() is called from multiple Python threads,
             having multiple workers enables true parallelism when running the model
             (concurrent calls to self.model.generate() will run in parallel).
             This can improve the global throughput at the cost of increased memory usage.
+            The FFT threads of the feature extraction are planned from the same budget
+            (see `self.thread_plan`).
           download_root: Directory where the models should be saved. If not set, the models
             are saved in the standard Hugging Face cache directory.
           local_files_only:  If True, avoid downloading the file and return the path to the
@@ -656,6 +1648,11 @@ class WhisperModel:
         """
         self.logger = get_logger()
 
+        # One CPU budget for the thread pools of the model, which is the cgroup quota in
+        # a container.
+        self.thread_plan = plan_threads(num_workers, cpu_threads)
+        self.logger.debug("Thread plan: %s", self.thread_plan)
+
         tokenizer_bytes, preprocessor_bytes = None, None
         if files:
             model_path = model_size_or_path
@@ -677,8 +1674,8 @@ class WhisperModel:
             device=device,
             device_index=device_index,
             compute_type=compute_type,
-            intra_threads=cpu_threads,
-            inter_threads=num_workers,
+            intra_threads=self.thread_plan.intra_threads,
+            inter_threads=self.thread_plan.inter_threads,
             files=files,
             **model_kwargs,
         )
@@ -693,7 +1690,9 @@ class WhisperModel:
                 "openai/whisper-tiny" + ("" if self.model.is_multilingual else ".en")
             )
         self.feat_kwargs = self._get_feature_kwargs(model_path, preprocessor_bytes)
-        self.feature_extractor = FeatureExtractor(**self.feat_kwargs)
+        self.feature_extractor = FeatureExtractor(
+            **self.feat_kwargs, fft_workers=self.thread_plan.fft_workers
+        )
         self.input_stride = 2
         self.num_samples_per_token = (
             self.feature_extractor.hop_length * self.input_stride
@@ -707,11 +1706,52 @@ class WhisperModel:
         self.time_precision = 0.02
         self.max_length = 448
 
+        # Setup shared by the transcribe calls, which is costly compared to the decoding
+        # of a short clip.
+        self._tokenizers = {}
+        self._suppressed_tokens = {}
+
     @property
     def supported_languages(self) -> List[str]:
         """The languages supported by the model."""
         return list(_LANGUAGE_CODES) if self.model.is_multilingual else ["en"]
 
+    def _get_tokenizer(self, task: str, language: str) -> Tokenizer:
+        """Returns a tokenizer for the task and language.
+
+        The tokenizers are cached with their cached properties, such as the non-speech
+        tokens. A copy is returned because `generate_segments` changes the language of
+        the tokenizer in multilingual mode.
+        """
+        key = (task, language)
+        tokenizer = self._tokenizers.get(key)
+        if tokenizer is None:
+            tokenizer = Tokenizer(
+                self.hf_tokenizer,
+                self.model.is_multilingual,
+                task=task,
+                language=language,
+            )
+            # Computed before copying so that the copies share it.
+            tokenizer.non_speech_tokens
+            self._tokenizers[key] = tokenizer
+        return copy.copy(tokenizer)
+
+    def _get_suppressed_tokens(
+        self, tokenizer: Tokenizer, suppress_tokens: Optional[List[int]]
+    ) -> Optional[Tuple[int]]:
+        """Returns the cached `get_suppressed_tokens` result. The suppressed tokens do not
+        depend on the task and language of the tokenizer."""
+        if not suppress_tokens:
+            return suppress_tokens
+
+        key = tuple(suppress_tokens)
+        suppressed_tokens = self._suppressed_tokens.get(key)
+        if suppressed_tokens is None:
+            suppressed_tokens = get_suppressed_tokens(tokenizer, list(suppress_tokens))
+            self._suppressed_tokens[key] = suppressed_tokens
+        return suppressed_tokens
+
     def _get_feature_kwargs(self, model_path, preprocessor_bytes=None) -> dict:
         config = {}
         try:
@@ -774,6 +1814,16 @@ class WhisperModel:
         hotwords: Optional[str] = None,
         language_detection_threshold: Optional[float] = 0.5,
         language_detection_segments: int = 1,
+        speculative_fallback: bool = False,
+        adaptive_beam: bool = False,
+        adaptive_beam_parameters: Optional[Union[dict, AdaptiveBeamOptions]] = None,
+        long_audio: bool = False,
+        checkpoint_path: Optional[str] = None,
+        checkpoint_interval: float = 60.0,
+        cancellation_token: Optional[CancellationToken] = None,
+        deadline: Optional[float] = None,
+        progress_callback: Optional[Callable[[TranscriptionProgress], None]] = None,
+        telemetry: bool = False,
     ) -> Tuple[Iterable[Segment], TranscriptionInfo]:
         """Transcribes an input file.
 
@@ -843,12 +1893,63 @@ class WhisperModel:
           language_detection_threshold: If the maximum probability of the language tokens is higher
            than this value, the language is detected.
           language_detection_segments: Number of segments to consider for the language detection.
+          speculative_fallback: When the first temperature fails the compression ratio or
+            log probability checks, submit the remaining temperatures concurrently (up to
+            `num_workers` at a time) instead of one after the other. The result is selected
+            with the same rules as the sequential fallback, so this only trades extra compute
+            for lower latency on hard windows. It has no effect when `num_workers` is 1.
+          adaptive_beam: Decode each window greedily first and only run beam search with
+            `beam_size` when the greedy result is not confident enough. The number of
+            escalated windows is reported in `TranscriptionInfo.decoding_stats`.
+          adaptive_beam_parameters: Dictionary of adaptive beam parameters or
+            AdaptiveBeamOptions class (see available parameters and default values in the
+            class `AdaptiveBeamOptions`).
+          long_audio: Never load the whole waveform or spectrogram in memory. The audio is
+            read again from its source for each pass (VAD, spectrogram maximum, decoding),
+            and the features of a window are only computed when it is decoded. The result
+            is identical to the default mode. File-like objects must be seekable.
+          checkpoint_path: Save the transcription state periodically to this JSON file.
+            If the file exists and was saved for the same audio and arguments, the
+            transcription resumes from it: the saved segments are generated again and
+            the decoding continues from the saved window. In long audio mode, the audio
+            is hashed while it is read for the first pass.
+          checkpoint_interval: Minimum number of seconds between two checkpoint saves.
+          cancellation_token: Stop the transcription when this token is cancelled. The VAD
+            and the decoding raise `TranscriptionCancelled` at their next step (window or
+            fallback temperature), and the checkpoint is saved.
+          deadline: Maximum number of seconds for the transcription, from this call to the
+            last segment. The transcription is then cancelled like with
+            `cancellation_token`.
+          progress_callback: Function called with a `TranscriptionProgress` after each
+            decoded window, with the processed audio duration, the real-time factor, the
+            number of fallbacks and the estimated remaining time.
+          telemetry: Record the encoding, generation (for each temperature), alignment and
+            post-processing times of each window with the token counts and the fallback
+            reasons in `TranscriptionInfo.telemetry` (see `DecodeTelemetry`).
         Returns:
           A tuple with:
 
             - a generator over transcribed segments
             - an instance of TranscriptionInfo
         """
+        # The checkpoint is only resumed with the same arguments.
+        arguments = dict(locals())
+        for name in (
+            "self",
+            "audio",
+            "log_progress",
+            "checkpoint_path",
+            "checkpoint_interval",
+            "cancellation_token",
+            "deadline",
+            "progress_callback",
+            "telemetry",
+        ):
+            arguments.pop(name)
+
+        start_time = time.perf_counter()
+        cancellation_token = get_cancellation_token(cancellation_token, deadline)
+
         sampling_rate = self.feature_extractor.sampling_rate
 
         if multilingual and not self.model.is_multilingual:
@@ -858,25 +1959,69 @@ class WhisperModel:
             )
             multilingual = False
 
-        if not isinstance(audio, np.ndarray):
-            audio = decode_audio(audio, sampling_rate=sampling_rate)
+        use_vad = vad_filter and clip_timestamps == "0"
+        if use_vad:
+            if vad_parameters is None:
+                vad_parameters = VadOptions()
+            elif isinstance(vad_parameters, dict):
+                vad_parameters = VadOptions(**vad_parameters)
 
-        duration = audio.shape[0] / sampling_rate
+        speech_chunks = None
+
+        audio_hash = None
+        if long_audio:
+            audio = AudioSource(audio, sampling_rate)
+            blocks = audio.blocks()
+            if checkpoint_path is not None:
+                # The waveform is not kept, so it is hashed during this first pass.
+                audio_hash = hashlib.sha1()
+                blocks = hash_blocks(blocks, audio_hash)
+            if use_vad:
+                speech_chunks, num_samples = get_speech_timestamps_streaming(
+                    blocks,
+                    vad_parameters,
+                    sampling_rate,
+                    cancellation_token=cancellation_token,
+                )
+            else:
+                num_samples = sum(block.shape[0] for block in blocks)
+        else:
+            if not isinstance(audio, np.ndarray):
+                audio = decode_audio(audio, sampling_rate=sampling_rate)
+            num_samples = audio.shape[0]
+
+        checkpoint = None
+        state = None
+        if checkpoint_path is not None:
+            checkpoint = TranscriptionCheckpoint(checkpoint_path, checkpoint_interval)
+            fingerprint = get_fingerprint(
+                audio_hash if long_audio else audio,
+                dict(arguments, num_samples=num_samples),
+            )
+            state = checkpoint.load(fingerprint)
+
+        duration = num_samples / sampling_rate
         duration_after_vad = duration
 
         self.logger.info(
             "Processing audio with duration %s", format_timestamp(duration)
         )
 
-        if vad_filter and clip_timestamps == "0":
-            if vad_parameters is None:
-                vad_parameters = VadOptions()
-            elif isinstance(vad_parameters, dict):
-                vad_parameters = VadOptions(**vad_parameters)
-            speech_chunks = get_speech_timestamps(audio, vad_parameters)
-            audio_chunks, chunks_metadata = collect_chunks(audio, speech_chunks)
-            audio = np.concatenate(audio_chunks, axis=0)
-            duration_after_vad = audio.shape[0] / sampling_rate
+        if use_vad:
+            if long_audio:
+                duration_after_vad = (
+                    get_speech_num_samples(speech_chunks, num_samples) / sampling_rate
+                )
+            else:
+                if state is not None:
+                    speech_chunks = state.speech_chunks
+                else:
+                    speech_chunks = get_speech_timestamps(
+                        audio, vad_parameters, cancellation_token=cancellation_token
+                    )
+                audio_chunks, chunks_metadata = collect_chunks(audio, speech_chunks)
+                audio = np.concatenate(audio_chunks, axis=0)
+                duration_after_vad = audio.shape[0] / sampling_rate
 
             self.logger.info(
                 "VAD filter removed %s of audio",
@@ -896,16 +2041,26 @@ class WhisperModel:
                     ),
                 )
 
+        if long_audio:
+            features = LongAudioFeatures(
+                self.feature_extractor,
+                audio,
+                speech_chunks,
+                num_samples,
+                chunk_length=chunk_length,
+            )
         else:
-            speech_chunks = None
-
-        features = self.feature_extractor(audio, chunk_length=chunk_length)
+            features = self.feature_extractor(audio, chunk_length=chunk_length)
 
         encoder_output = None
         all_language_probs = None
 
+        if state is not None:
+            language = state.language
+            language_probability = state.language_probability
+            all_language_probs = state.all_language_probs
         # detecting the language if not provided
-        if language is None:
+        elif language is None:
             if not self.model.is_multilingual:
                 language = "en"
                 language_probability = 1
@@ -921,15 +2076,28 @@ class WhisperModel:
                     if start_timestamp * self.frames_per_second < content_frames
                     else 0
                 )
+                # The windows end at the content frames like the decoded windows.
                 (
                     language,
                     language_probability,
                     all_language_probs,
-                ) = self.detect_language(
-                    features=features[..., seek:],
-                    language_detection_segments=language_detection_segments,
-                    language_detection_threshold=language_detection_threshold,
+                    first_encoder_output,
+                ) = self._detect_language(
+                    features[
+                        ...,
+                        seek : min(
+                            content_frames,
+                            seek
+                            + language_detection_segments
+                            * self.feature_extractor.nb_max_frames,
+                        ),
+                    ],
+                    language_detection_segments,
+                    language_detection_threshold,
                 )
+                if clip_timestamps == "0":
+                    # The first decoded window is the first detection window.
+                    encoder_output = first_encoder_output
 
                 self.logger.info(
                     "Detected language '%s' with probability %.2f",
@@ -946,12 +2114,17 @@ class WhisperModel:
 
             language_probability = 1
 
-        tokenizer = Tokenizer(
-            self.hf_tokenizer,
-            self.model.is_multilingual,
-            task=task,
-            language=language,
-        )
+        tokenizer = self._get_tokenizer(task, language)
+
+        if adaptive_beam:
+            if adaptive_beam_parameters is None:
+                adaptive_beam_parameters = AdaptiveBeamOptions()
+            elif isinstance(adaptive_beam_parameters, dict):
+                adaptive_beam_parameters = AdaptiveBeamOptions(
+                    **adaptive_beam_parameters
+                )
+        else:
+            adaptive_beam_parameters = None
 
         options = TranscriptionOptions(
             beam_size=beam_size,
@@ -971,11 +2144,7 @@ class WhisperModel:
             initial_prompt=initial_prompt,
             prefix=prefix,
             suppress_blank=suppress_blank,
-            suppress_tokens=(
-                get_suppressed_tokens(tokenizer, suppress_tokens)
-                if suppress_tokens
-                else suppress_tokens
-            ),
+            suppress_tokens=self._get_suppressed_tokens(tokenizer, suppress_tokens),
             without_timestamps=without_timestamps,
             max_initial_timestamp=max_initial_timestamp,
             word_timestamps=word_timestamps,
@@ -986,11 +2155,46 @@ class WhisperModel:
             clip_timestamps=clip_timestamps,
             hallucination_silence_threshold=hallucination_silence_threshold,
             hotwords=hotwords,
+            speculative_fallback=speculative_fallback,
+            adaptive_beam=adaptive_beam_parameters,
         )
 
+        if checkpoint is not None and state is None:
+            state = TranscriptionState(
+                fingerprint=fingerprint,
+                language=language,
+                language_probability=language_probability,
+                all_language_probs=all_language_probs,
+                speech_chunks=speech_chunks,
+            )
+
+        decoding_stats = DecodingStats()
+        decode_telemetry = DecodeTelemetry() if telemetry else None
+        progress = None
+        if progress_callback is not None:
+            progress = ProgressTracker(
+                progress_callback,
+                duration,
+                duration_after_vad,
+                decoding_stats,
+                start_time,
+            )
+
         segments = self.generate_segments(
-            features, tokenizer, options, log_progress, encoder_output
+            features,
+            tokenizer,
+            options,
+            log_progress,
+            encoder_output,
+            stats=decoding_stats,
+            checkpoint=checkpoint,
+            state=state,
+            cancellation_token=cancellation_token,
+            progress=progress,
+            telemetry=decode_telemetry,
         )
+        if checkpoint is not None:
+            segments = save_checkpoint_on_cancel(segments, checkpoint, state)
 
         if speech_chunks:
             segments = restore_speech_timestamps(segments, speech_chunks, sampling_rate)
@@ -1003,6 +2207,8 @@ class WhisperModel:
             transcription_options=options,
             vad_options=vad_parameters,
             all_language_probs=all_language_probs,
+            decoding_stats=decoding_stats,
+            telemetry=decode_telemetry,
         )
 
         return segments, info
@@ -1093,6 +2299,12 @@ class WhisperModel:
         options: TranscriptionOptions,
         log_progress,
         encoder_output: Optional[ctranslate2.StorageView] = None,
+        stats: Optional[DecodingStats] = None,
+        checkpoint: Optional[TranscriptionCheckpoint] = None,
+        state: Optional[TranscriptionState] = None,
+        cancellation_token: Optional[CancellationToken] = None,
+        progress: Optional[ProgressTracker] = None,
+        telemetry: Optional[DecodeTelemetry] = None,
     ) -> Iterable[Segment]:
         content_frames = features.shape[-1] - 1
         content_duration = float(content_frames * self.feature_extractor.time_per_frame)
@@ -1125,8 +2337,31 @@ class WhisperModel:
         seek = seek_clips[clip_idx][0]
         all_tokens = []
         prompt_reset_since = 0
+        last_speech_timestamp = 0.0
+
+        if state is not None and state.seek is not None:
+            # Resume from the checkpoint: the saved segments are generated again and the
+            # decoding continues with the saved prompt state.
+            for segment in state.segments:
+                idx += 1
+                yield segment_from_dict(segment)
+
+            seek = state.seek
+            clip_idx = state.clip_idx
+            all_tokens = list(state.all_tokens)
+            prompt_reset_since = state.prompt_reset_since
+            last_speech_timestamp = state.last_speech_timestamp
+            if state.tokenizer_language is not None:
+                tokenizer.language = tokenizer.tokenizer.token_to_id(
+                    "<|%s|>" % state.tokenizer_language
+                )
+                tokenizer.language_code = state.tokenizer_language
+            if progress is not None:
+                progress.skip(
+                    min(content_frames, seek) * self.feature_extractor.time_per_frame
+                )
 
-        if options.initial_prompt is not None:
+        elif options.initial_prompt is not None:
             if isinstance(options.initial_prompt, str):
                 initial_prompt = " " + options.initial_prompt.strip()
                 initial_prompt_tokens = tokenizer.encode(initial_prompt)
@@ -1135,12 +2370,23 @@ class WhisperModel:
                 all_tokens.extend(options.initial_prompt)
 
         pbar = tqdm(total=content_duration, unit="seconds", disable=not log_progress)
-        last_speech_timestamp = 0.0
         # NOTE: This loop is obscurely flattened to make the diff readable.
         # A later commit should turn this into a simpler nested loop.
         # for seek_clip_start, seek_clip_end in seek_clips:
         #     while seek < seek_clip_end
         while clip_idx < len(seek_clips):
+            if checkpoint is not None:
+                state.seek = seek
+                state.clip_idx = clip_idx
+                state.all_tokens = all_tokens
+                state.prompt_reset_since = prompt_reset_since
+                state.last_speech_timestamp = last_speech_timestamp
+                if options.multilingual:
+                    state.tokenizer_language = tokenizer.language_code
+                checkpoint.maybe_save(state)
+
+            check_cancelled(cancellation_token)
+
             seek_clip_start, seek_clip_end = seek_clips[clip_idx]
             if seek_clip_end > content_frames:
                 seek_clip_end = content_frames
@@ -1165,6 +2411,11 @@ class WhisperModel:
             segment_duration = segment_size * self.feature_extractor.time_per_frame
             segment = pad_or_trim(segment)
 
+            window = None
+            if telemetry is not None:
+                window = WindowTelemetry(start=time_offset, duration=segment_duration)
+                telemetry.windows.append(window)
+
             if self.logger.isEnabledFor(logging.DEBUG):
                 self.logger.debug(
                     "Processing segment at %s", format_timestamp(time_offset)
@@ -1173,7 +2424,10 @@ class WhisperModel:
             previous_tokens = all_tokens[prompt_reset_since:]
 
             if seek > 0 or encoder_output is None:
+                encode_start = time.perf_counter()
                 encoder_output = self.encode(segment)
+                if window is not None:
+                    window.encode_time = time.perf_counter() - encode_start
 
             if options.multilingual:
                 results = self.model.detect_language(encoder_output)
@@ -1196,7 +2450,17 @@ class WhisperModel:
                 avg_logprob,
                 temperature,
                 compression_ratio,
-            ) = self.generate_with_fallback(encoder_output, prompt, tokenizer, options)
+            ) = self.generate_with_fallback(
+                encoder_output,
+                prompt,
+                tokenizer,
+                options,
+                stats=stats,
+                cancellation_token=cancellation_token,
+                telemetry=window,
+                time_offset=time_offset,
+            )
+            postprocess_start = time.perf_counter()
 
             if options.no_speech_threshold is not None:
                 # no voice activity check
@@ -1262,6 +2526,7 @@ class WhisperModel:
             )
 
             if options.word_timestamps:
+                alignment_start = time.perf_counter()
                 self.add_word_timestamps(
                     [current_segments],
                     tokenizer,
@@ -1271,6 +2536,8 @@ class WhisperModel:
                     options.append_punctuations,
                     last_speech_timestamp=last_speech_timestamp,
                 )
+                if window is not None:
+                    window.alignment_time = time.perf_counter() - alignment_start
                 if not single_timestamp_ending:
                     last_word_end = get_end(current_segments)
                     if last_word_end is not None and last_word_end > time_offset:
@@ -1327,6 +2594,12 @@ class WhisperModel:
                 last_word_end = get_end(current_segments)
                 if last_word_end is not None:
                     last_speech_timestamp = last_word_end
+
+            if window is not None:
+                window.postprocess_time = (
+                    time.perf_counter() - postprocess_start - window.alignment_time
+                )
+
             for segment in current_segments:
                 tokens = segment["tokens"]
                 text = tokenizer.decode(tokens)
@@ -1337,7 +2610,7 @@ class WhisperModel:
                 all_tokens.extend(tokens)
                 idx += 1
 
-                yield Segment(
+                segment = Segment(
                     id=idx,
                     seek=previous_seek,
                     start=segment["start"],
@@ -1354,6 +2627,11 @@ class WhisperModel:
                         else None
                     ),
                 )
+                if checkpoint is not None:
+                    # The segment is copied before the timestamps are restored.
+                    state.segments.append(asdict(segment))
+
+                yield segment
 
             if (
                 not options.condition_on_previous_text
@@ -1372,8 +2650,19 @@ class WhisperModel:
                 (min(content_frames, seek) - previous_seek)
                 * self.feature_extractor.time_per_frame,
             )
+            if progress is not None:
+                progress.update(
+                    (min(content_frames, seek) - previous_seek)
+                    * self.feature_extractor.time_per_frame
+                )
         pbar.close()
 
+        if checkpoint is not None:
+            state.seek = seek
+            state.clip_idx = clip_idx
+            state.finished = True
+            checkpoint.save(state)
+
     def encode(self, features: np.ndarray) -> ctranslate2.StorageView:
         # When the model is running on multiple GPUs, the encoder output should be moved
         # to the CPU since we don't know which GPU will handle the next job.
@@ -1391,6 +2680,10 @@ class WhisperModel:
         prompt: List[int],
         tokenizer: Tokenizer,
         options: TranscriptionOptions,
+        stats: Optional[DecodingStats] = None,
+        cancellation_token: Optional[CancellationToken] = None,
+        telemetry: Optional[WindowTelemetry] = None,
+        time_offset: float = 0.0,
     ) -> Tuple[ctranslate2.models.WhisperGenerationResult, float, float, float]:
         decode_result = None
         all_results = []
@@ -1415,92 +2708,162 @@ class WhisperModel:
                 f"so that their combined length is less that {self.max_length}."
             )
 
-        for temperature in options.temperatures:
-            if temperature > 0:
-                kwargs = {
-                    "beam_size": 1,
-                    "num_hypotheses": options.best_of,
-                    "sampling_topk": 0,
-                    "sampling_temperature": temperature,
-                }
-            else:
-                kwargs = {
-                    "beam_size": options.beam_size,
-                    "patience": options.patience,
-                }
-
-            result = self.model.generate(
-                encoder_output,
-                [prompt],
-                length_penalty=options.length_penalty,
-                repetition_penalty=options.repetition_penalty,
-                no_repeat_ngram_size=options.no_repeat_ngram_size,
-                max_length=max_length,
-                return_scores=True,
-                return_no_speech_prob=True,
-                suppress_blank=options.suppress_blank,
-                suppress_tokens=options.suppress_tokens,
-                max_initial_timestamp_index=max_initial_timestamp_index,
-                **kwargs,
-            )[0]
+        # In speculative mode, the temperatures that remain after the first failure are
+        # submitted in waves of `num_workers` concurrent requests. The results are still
+        # checked in temperature order so the selected result is the same as in the
+        # sequential mode.
+        wave_size = (
+            max(1, self.model.num_workers) if options.speculative_fallback else 1
+        )
+        pending_temperatures = list(options.temperatures)
+        needs_fallback = True
 
-            tokens = result.sequences_ids[0]
+        # With the adaptive beam policy, the temperature 0 decoding is first done greedily
+        # and beam search only runs when the greedy result is not confident enough.
+        greedy_first = options.adaptive_beam is not None and options.beam_size > 1
 
-            # Recover the average log prob from the returned score.
-            seq_len = len(tokens)
-            cum_logprob = result.scores[0] * (seq_len**options.length_penalty)
-            avg_logprob = cum_logprob / (seq_len + 1)
+        if stats is not None:
+            stats.num_windows += 1
 
-            text = tokenizer.decode(tokens).strip()
-            compression_ratio = get_compression_ratio(text)
+        while pending_temperatures and needs_fallback:
+            check_cancelled(cancellation_token)
+            num_temperatures = wave_size if all_results else 1
+            wave = pending_temperatures[:num_temperatures]
+            pending_temperatures = pending_temperatures[num_temperatures:]
 
-            decode_result = (
-                result,
-                avg_logprob,
-                temperature,
-                compression_ratio,
-            )
-            all_results.append(decode_result)
+            attempt_start = time.perf_counter()
+            results = [
+                self._generate_with_temperature(
+                    encoder_output,
+                    prompt,
+                    temperature,
+                    options,
+                    max_length,
+                    max_initial_timestamp_index,
+                    asynchronous=len(wave) > 1,
+                    beam_size=1 if greedy_first else None,
+                )
+                for temperature in wave
+            ]
 
-            needs_fallback = False
+            for temperature, result in zip(wave, results):
+                if len(wave) > 1:
+                    result = result.result()
 
-            if options.compression_ratio_threshold is not None:
-                if compression_ratio > options.compression_ratio_threshold:
-                    needs_fallback = True  # too repetitive
+                avg_logprob, compression_ratio = self._get_result_scores(
+                    result, tokenizer, options
+                )
+                beam_size = 1 if temperature > 0 or greedy_first else options.beam_size
 
+                if (
+                    greedy_first
+                    and temperature == 0
+                    and not is_confident_result(
+                        result, avg_logprob, compression_ratio, options.adaptive_beam
+                    )
+                ):
                     self.logger.debug(
-                        "Compression ratio threshold is not met with temperature %.1f (%f > %f)",
-                        temperature,
+                        "Greedy result is not confident enough (avg_logprob=%f, "
+                        "compression_ratio=%f, no_speech_prob=%f), using beam search",
+                        avg_logprob,
                         compression_ratio,
-                        options.compression_ratio_threshold,
+                        result.no_speech_prob,
                     )
-                else:
-                    below_cr_threshold_results.append(decode_result)
+                    if stats is not None:
+                        stats.num_beam_escalations += 1
+                        stats.beam_escalation_starts.append(time_offset)
+                    if telemetry is not None:
+                        attempt_start = telemetry.add_attempt(
+                            attempt_start,
+                            temperature,
+                            beam_size,
+                            len(result.sequences_ids[0]),
+                            avg_logprob,
+                            compression_ratio,
+                            "low_confidence",
+                        )
+                    check_cancelled(cancellation_token)
 
-            if (
-                options.log_prob_threshold is not None
-                and avg_logprob < options.log_prob_threshold
-            ):
-                needs_fallback = True  # average log probability is too low
+                    result = self._generate_with_temperature(
+                        encoder_output,
+                        prompt,
+                        temperature,
+                        options,
+                        max_length,
+                        max_initial_timestamp_index,
+                    )
+                    avg_logprob, compression_ratio = self._get_result_scores(
+                        result, tokenizer, options
+                    )
+                    beam_size = options.beam_size
 
-                self.logger.debug(
-                    "Log probability threshold is not met with temperature %.1f (%f < %f)",
-                    temperature,
+                decode_result = (
+                    result,
                     avg_logprob,
-                    options.log_prob_threshold,
+                    temperature,
+                    compression_ratio,
                 )
+                all_results.append(decode_result)
 
-            if (
-                options.no_speech_threshold is not None
-                and result.no_speech_prob > options.no_speech_threshold
-                and options.log_prob_threshold is not None
-                and avg_logprob < options.log_prob_threshold
-            ):
-                needs_fallback = False  # silence
+                needs_fallback = False
 
-            if not needs_fallback:
-                break
-        else:
+                if options.compression_ratio_threshold is not None:
+                    if compression_ratio > options.compression_ratio_threshold:
+                        needs_fallback = True  # too repetitive
+
+                        self.logger.debug(
+                            "Compression ratio threshold is not met "
+                            "with temperature %.1f (%f > %f)",
+                            temperature,
+                            compression_ratio,
+                            options.compression_ratio_threshold,
+                        )
+                    else:
+                        below_cr_threshold_results.append(decode_result)
+
+                if (
+                    options.log_prob_threshold is not None
+                    and avg_logprob < options.log_prob_threshold
+                ):
+                    needs_fallback = True  # average log probability is too low
+
+                    self.logger.debug(
+                        "Log probability threshold is not met with temperature %.1f (%f < %f)",
+                        temperature,
+                        avg_logprob,
+                        options.log_prob_threshold,
+                    )
+
+                if (
+                    options.no_speech_threshold is not None
+                    and result.no_speech_prob > options.no_speech_threshold
+                    and options.log_prob_threshold is not None
+                    and avg_logprob < options.log_prob_threshold
+                ):
+                    needs_fallback = False  # silence
+
+                if telemetry is not None:
+                    attempt_start = telemetry.add_attempt(
+                        attempt_start,
+                        temperature,
+                        beam_size,
+                        len(result.sequences_ids[0]),
+                        avg_logprob,
+                        compression_ratio,
+                        get_fallback_reason(
+                            dict(
+                                avg_logprob=avg_logprob,
+                                compression_ratio=compression_ratio,
+                                no_speech_prob=result.no_speech_prob,
+                            ),
+                            options,
+                        ),
+                    )
+
+                if not needs_fallback:
+                    break
+
+        if needs_fallback:
             # all failed, select the result with the highest average log probability
             decode_result = max(
                 below_cr_threshold_results or all_results, key=lambda x: x[1]
@@ -1513,8 +2876,72 @@ class WhisperModel:
                 decode_result[3],
             )
 
+        if stats is not None:
+            stats.num_fallbacks += len(all_results) - 1
+
         return decode_result
 
+    def _generate_with_temperature(
+        self,
+        encoder_output: ctranslate2.StorageView,
+        prompt: List[int],
+        temperature: float,
+        options: TranscriptionOptions,
+        max_length: int,
+        max_initial_timestamp_index: int,
+        asynchronous: bool = False,
+        beam_size: Optional[int] = None,
+    ) -> Union[
+        ctranslate2.models.WhisperGenerationResult,
+        ctranslate2.models.WhisperGenerationResultAsync,
+    ]:
+        if temperature > 0:
+            kwargs = {
+                "beam_size": 1,
+                "num_hypotheses": options.best_of,
+                "sampling_topk": 0,
+                "sampling_temperature": temperature,
+            }
+        else:
+            kwargs = {
+                "beam_size": beam_size or options.beam_size,
+                "patience": options.patience,
+            }
+
+        return self.model.generate(
+            encoder_output,
+            [prompt],
+            asynchronous=asynchronous,
+            length_penalty=options.length_penalty,
+            repetition_penalty=options.repetition_penalty,
+            no_repeat_ngram_size=options.no_repeat_ngram_size,
+            max_length=max_length,
+            return_scores=True,
+            return_no_speech_prob=True,
+            suppress_blank=options.suppress_blank,
+            suppress_tokens=options.suppress_tokens,
+            max_initial_timestamp_index=max_initial_timestamp_index,
+            **kwargs,
+        )[0]
+
+    def _get_result_scores(
+        self,
+        result: ctranslate2.models.WhisperGenerationResult,
+        tokenizer: Tokenizer,
+        options: TranscriptionOptions,
+    ) -> Tuple[float, float]:
+        tokens = result.sequences_ids[0]
+
+        # Recover the average log prob from the returned score.
+        seq_len = len(tokens)
+        cum_logprob = result.scores[0] * (seq_len**options.length_penalty)
+        avg_logprob = cum_logprob / (seq_len + 1)
+
+        text = tokenizer.decode(tokens).strip()
+        compression_ratio = get_compression_ratio(text)
+
+        return avg_logprob, compression_ratio
+
     def get_prompt(
         self,
         tokenizer: Tokenizer,
@@ -1796,18 +3223,42 @@ class WhisperModel:
             ]
             features = self.feature_extractor(audio)
 
-        features = features[
-            ..., : language_detection_segments * self.feature_extractor.nb_max_frames
+        language, language_probability, all_language_probs, _ = self._detect_language(
+            features, language_detection_segments, language_detection_threshold
+        )
+        return language, language_probability, all_language_probs
+
+    def _detect_language(
+        self,
+        features: np.ndarray,
+        language_detection_segments: int,
+        language_detection_threshold: float,
+    ) -> Tuple[str, float, List[Tuple[str, float]], ctranslate2.StorageView]:
+        """Detects the language in the first 30-second windows of the features.
+
+        The first window is encoded alone, so that the detection stops there when its
+        language probability is above the threshold. Otherwise the other windows are
+        encoded in a single batch. The encoder output of the first window is also
+        returned, so that the window is not encoded again when it is decoded.
+        """
+        nb_max_frames = self.feature_extractor.nb_max_frames
+        features = features[..., : language_detection_segments * nb_max_frames]
+        windows = [
+            pad_or_trim(features[..., i : i + nb_max_frames])
+            for i in range(0, max(features.shape[-1], 1), nb_max_frames)
         ]
 
-        detected_language_info = {}
-        for i in range(0, features.shape[-1], self.feature_extractor.nb_max_frames):
-            encoder_output = self.encode(
-                pad_or_trim(features[..., i : i + self.feature_extractor.nb_max_frames])
+        first_encoder_output = self.encode(windows[0])
+        # Each result is a list of tuple[str, float] with language names and
+        # probabilities.
+        all_results = self.model.detect_language(first_encoder_output)
+        if len(windows) > 1 and all_results[0][0][1] <= language_detection_threshold:
+            all_results.extend(
+                self.model.detect_language(self.encode(np.stack(windows[1:])))
             )
-            # results is a list of tuple[str, float] with language names and probabilities.
-            results = self.model.detect_language(encoder_output)[0]
 
+        detected_language_info = {}
+        for results in all_results:
             # Parse language names to strip out markers
             all_language_probs = [(token[2:-2], prob) for (token, prob) in results]
             # Get top language token and probability
@@ -1824,7 +3275,12 @@ class WhisperModel:
             )
             language_probability = max(detected_language_info[language])
 
-        return language, language_probability, all_language_probs
+        return (
+            language,
+            language_probability,
+            all_language_probs,
+            first_encoder_output,
+        )
 
 
 def restore_speech_timestamps(
@@ -1856,12 +3312,111 @@ def restore_speech_timestamps(
         yield segment
 
 
+def save_checkpoint_on_cancel(
+    segments: Iterable[Segment],
+    checkpoint: TranscriptionCheckpoint,
+    state: TranscriptionState,
+) -> Iterable[Segment]:
+    """Saves the checkpoint when the transcription is cancelled, so it can be resumed
+    from the last decoded window or batch."""
+    try:
+        yield from segments
+    except TranscriptionCancelled:
+        checkpoint.save(state)
+        raise
+
+
+def segment_from_dict(segment: dict) -> Segment:
+    words = segment["words"]
+    if words is not None:
+        words = [Word(**word) for word in words]
+    return Segment(**dict(segment, words=words))
+
+
 def get_ctranslate2_storage(segment: np.ndarray) -> ctranslate2.StorageView:
     segment = np.ascontiguousarray(segment)
     segment = ctranslate2.StorageView.from_array(segment)
     return segment
 
 
+def is_confident_result(
+    result: ctranslate2.models.WhisperGenerationResult,
+    avg_logprob: float,
+    compression_ratio: float,
+    adaptive_beam: AdaptiveBeamOptions,
+) -> bool:
+    return (
+        avg_logprob >= adaptive_beam.log_prob_threshold
+        and compression_ratio <= adaptive_beam.compression_ratio_threshold
+        and result.no_speech_prob <= adaptive_beam.no_speech_threshold
+    )
+
+
+def get_adaptive_batch_sizer(
+    adaptive_batch_parameters: Optional[Union[dict, AdaptiveBatchOptions]],
+) -> AdaptiveBatchSizer:
+    if adaptive_batch_parameters is None:
+        adaptive_batch_parameters = AdaptiveBatchOptions()
+    elif isinstance(adaptive_batch_parameters, dict):
+        adaptive_batch_parameters = AdaptiveBatchOptions(**adaptive_batch_parameters)
+
+    return AdaptiveBatchSizer(adaptive_batch_parameters)
+
+
+# The arguments of `BatchedInferencePipeline.transcribe` that `transcribe_many` passes
+# to each input.
+_TRANSCRIBE_MANY_ARGUMENTS = set(
+    signature(BatchedInferencePipeline._prepare_transcription).parameters
+) - {"self", "audio", "speech_chunks", "cancellation_token"}
+
+
+def get_batch_size(batch_size: Union[int, AdaptiveBatchSizer]) -> int:
+    """Returns the size of the next batch."""
+    if isinstance(batch_size, AdaptiveBatchSizer):
+        return batch_size.batch_size
+    return batch_size
+
+
+def iter_batches(
+    items: list, batch_size: Union[int, AdaptiveBatchSizer]
+) -> Iterable[Tuple[list, int]]:
+    """Splits the items in batches and yields each batch with the size it was built with.
+    With an AdaptiveBatchSizer, the size of each batch is read when the batch is
+    requested."""
+    start = 0
+    while start < len(items):
+        size = get_batch_size(batch_size)
+        yield items[start : start + size], size
+        start += size
+
+
+def get_fallback_reason(output: dict, options: TranscriptionOptions) -> Optional[str]:
+    """Returns why a decoding result should be decoded again at the next temperature
+    ("compression_ratio", "log_prob" or both joined by "+"), or None if the result is
+    accepted, following the same rules as `WhisperModel.generate_with_fallback`."""
+    reasons = []
+
+    if (
+        options.compression_ratio_threshold is not None
+        and output["compression_ratio"] > options.compression_ratio_threshold
+    ):
+        reasons.append("compression_ratio")  # too repetitive
+
+    if (
+        options.log_prob_threshold is not None
+        and output["avg_logprob"] < options.log_prob_threshold
+    ):
+        if (
+            options.no_speech_threshold is not None
+            and output["no_speech_prob"] > options.no_speech_threshold
+        ):
+            return None  # silence
+
+        reasons.append("log_prob")  # average log probability is too low
+
+    return "+".join(reasons) or None
+
+
 def get_compression_ratio(text: str) -> float:
     text_bytes = text.encode("utf-8")
     return len(text_bytes) / len(zlib.compress(text_bytes))
@@ -1,14 +1,18 @@
 import logging
 import os
+import queue
 import re
+import threading
 
-from typing import List, Optional, Union
+from typing import Iterable, Iterator, List, Optional, TypeVar, Union
 
 import huggingface_hub
 import requests
 
 from tqdm.auto import tqdm
 
+T = TypeVar("T")
+
 _MODELS = {
     "tiny.en": "Systran/faster-whisper-tiny.en",
     "tiny": "Systran/faster-whisper-tiny",
@@ -163,8 +167,62 @@ class disabled_tqdm(tqdm):
         super().__init__(*args, **kwargs)
 
 
+def get_model_workers(model) -> int:
+    """Returns the number of model replicas that can run concurrently."""
+    # BatchedInferencePipeline -> WhisperModel -> ctranslate2 model.
+    while model is not None:
+        num_workers = getattr(model, "num_workers", None)
+        if isinstance(num_workers, int):
+            return num_workers
+        model = getattr(model, "model", None)
+    return 1
+
+
 def get_end(segments: List[dict]) -> Optional[float]:
     return next(
         (w["end"] for s in reversed(segments) for w in reversed(s["words"])),
         segments[-1]["end"] if segments else None,
     )
+
+
+def prefetch(iterable: Iterable[T], depth: int = 2) -> Iterator[T]:
+    """Consumes the iterable in a background thread, at most `depth` items ahead of the
+    caller. Exceptions raised by the iterable are raised again in the caller."""
+    items = queue.Queue(maxsize=depth)
+    stop = threading.Event()
+    end = object()
+
+    def put(item) -> bool:
+        while not stop.is_set():
+            try:
+                items.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def produce():
+        try:
+            for item in iterable:
+                if not put((item, None)):
+                    return
+        except BaseException as e:
+            put((None, e))
+        else:
+            put((end, None))
+
+    thread = threading.Thread(target=produce, daemon=True)
+    thread.start()
+
+    try:
+        while True:
+            item, error = items.get()
+            if error is not None:
+                raise error
+            if item is end:
+                break
+            yield item
+    finally:
+        # The caller may stop early, release the producer thread.
+        stop.set()
+        thread.join()
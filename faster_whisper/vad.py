@@ -3,10 +3,11 @@ import functools
 import os
 
 from dataclasses import dataclass
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterable, List, Optional, Tuple
 
 import numpy as np
 
+from faster_whisper.cancellation import CancellationToken, check_cancelled
 from faster_whisper.utils import get_assets_path
 
 
@@ -46,6 +47,7 @@ def get_speech_timestamps(
     audio: np.ndarray,
     vad_options: Optional[VadOptions] = None,
     sampling_rate: int = 16000,
+    cancellation_token: Optional[CancellationToken] = None,
     **kwargs,
 ) -> List[dict]:
     """This method is used for splitting long audios into speech chunks using silero VAD.
@@ -54,6 +56,7 @@ def get_speech_timestamps(
       audio: One dimensional float array.
       vad_options: Options for VAD processing.
       sampling rate: Sampling rate of the audio.
+      cancellation_token: Raise `TranscriptionCancelled` when this token is cancelled.
       kwargs: VAD options passed as keyword arguments for backward compatibility.
 
     Returns:
@@ -62,6 +65,70 @@ def get_speech_timestamps(
     if vad_options is None:
         vad_options = VadOptions(**kwargs)
 
+    window_size_samples = 512
+    model = get_vad_model()
+
+    padded_audio = np.pad(
+        audio, (0, window_size_samples - audio.shape[0] % window_size_samples)
+    )
+    speech_probs = model(
+        padded_audio.reshape(1, -1), cancellation_token=cancellation_token
+    ).squeeze(0)
+
+    return get_speech_timestamps_from_probs(
+        speech_probs, len(audio), vad_options, sampling_rate
+    )
+
+
+def get_speech_timestamps_streaming(
+    audio_blocks: Iterable[np.ndarray],
+    vad_options: Optional[VadOptions] = None,
+    sampling_rate: int = 16000,
+    cancellation_token: Optional[CancellationToken] = None,
+) -> Tuple[List[dict], int]:
+    """Same as `get_speech_timestamps` but reads the audio block by block, so the whole
+    audio is never in memory.
+
+    Args:
+      audio_blocks: Iterable of one dimensional float arrays.
+      vad_options: Options for VAD processing.
+      sampling rate: Sampling rate of the audio.
+      cancellation_token: Raise `TranscriptionCancelled` when this token is cancelled.
+
+    Returns:
+      A tuple with the list of dicts containing begin and end samples of each speech chunk,
+      and the total number of samples.
+    """
+    if vad_options is None:
+        vad_options = VadOptions()
+
+    model = get_vad_model()
+    speech_probs = []
+    num_samples = 0
+
+    def counted_blocks():
+        nonlocal num_samples
+        for block in audio_blocks:
+            num_samples += block.shape[0]
+            yield block
+
+    for probs in model.stream(counted_blocks(), cancellation_token=cancellation_token):
+        speech_probs.append(probs)
+
+    speech_probs = np.concatenate(speech_probs)
+    speech_timestamps = get_speech_timestamps_from_probs(
+        speech_probs, num_samples, vad_options, sampling_rate
+    )
+    return speech_timestamps, num_samples
+
+
+def get_speech_timestamps_from_probs(
+    speech_probs: np.ndarray,
+    audio_length_samples: int,
+    vad_options: VadOptions,
+    sampling_rate: int = 16000,
+) -> List[dict]:
+    """Converts the speech probabilities of each 512 samples window to speech chunks."""
     threshold = vad_options.threshold
     neg_threshold = vad_options.neg_threshold
     min_speech_duration_ms = vad_options.min_speech_duration_ms
@@ -79,15 +146,6 @@ def get_speech_timestamps(
     min_silence_samples = sampling_rate * min_silence_duration_ms / 1000
     min_silence_samples_at_max_speech = sampling_rate * 98 / 1000
 
-    audio_length_samples = len(audio)
-
-    model = get_vad_model()
-
-    padded_audio = np.pad(
-        audio, (0, window_size_samples - audio.shape[0] % window_size_samples)
-    )
-    speech_probs = model(padded_audio.reshape(1, -1)).squeeze(0)
-
     triggered = False
     speeches = []
     current_speech = {}
@@ -320,7 +378,11 @@ class SileroVADModel:
         )
 
     def __call__(
-        self, audio: np.ndarray, num_samples: int = 512, context_size_samples: int = 64
+        self,
+        audio: np.ndarray,
+        num_samples: int = 512,
+        context_size_samples: int = 64,
+        cancellation_token: Optional[CancellationToken] = None,
     ):
         assert (
             audio.ndim == 2
@@ -349,6 +411,7 @@ class SileroVADModel:
         num_segments = batched_audio.shape[0]
         encoder_outputs = []
         for i in range(0, num_segments, encoder_batch_size):
+            check_cancelled(cancellation_token)
             encoder_output = self.encoder_session.run(
                 None, {"input": batched_audio[i : i + encoder_batch_size]}
             )[0]
@@ -359,6 +422,7 @@ class SileroVADModel:
 
         decoder_outputs = []
         for window in np.split(encoder_output, encoder_output.shape[1], axis=1):
+            check_cancelled(cancellation_token)
             out, state = self.decoder_session.run(
                 None, {"input": window.squeeze(1), "state": state}
             )
@@ -366,3 +430,70 @@ class SileroVADModel:
 
         out = np.stack(decoder_outputs, axis=1).squeeze(-1)
         return out
+
+    def stream(
+        self,
+        audio_blocks: Iterable[np.ndarray],
+        num_samples: int = 512,
+        context_size_samples: int = 64,
+        encoder_batch_size: int = 10000,
+        cancellation_token: Optional[CancellationToken] = None,
+    ) -> Iterable[np.ndarray]:
+        """Yields the speech probabilities of a single audio stream read block by block.
+
+        The context and decoder state are carried between blocks, and the audio is padded
+        like in `get_speech_timestamps`, so the probabilities are the same as when
+        calling the model on the whole padded audio.
+        """
+        state = np.zeros((2, 1, 128), dtype="float32")
+        previous_context = np.zeros((1, context_size_samples), dtype="float32")
+        pending = np.zeros((0,), dtype="float32")
+        blocks = iter(audio_blocks)
+        finished = False
+
+        while not finished:
+            # Read a full encoder batch of windows, or the rest of the audio.
+            parts = [pending]
+            num_pending = pending.shape[0]
+            while num_pending < encoder_batch_size * num_samples:
+                block = next(blocks, None)
+                if block is None:
+                    finished = True
+                    break
+                parts.append(block.astype("float32", copy=False))
+                num_pending += block.shape[0]
+
+            pending = np.concatenate(parts)
+            if finished:
+                pending = np.pad(
+                    pending, (0, num_samples - pending.shape[0] % num_samples)
+                )
+                audio = pending
+                pending = pending[:0]
+            else:
+                audio = pending[: encoder_batch_size * num_samples].copy()
+                pending = pending[encoder_batch_size * num_samples :]
+
+            windows = audio.reshape(-1, num_samples)
+            if finished:
+                # The model call zeroes the end of the last window of the audio.
+                windows[-1, -context_size_samples:] = 0
+
+            contexts = np.concatenate(
+                [previous_context, windows[:-1, -context_size_samples:]], axis=0
+            )
+            previous_context = windows[-1:, -context_size_samples:].copy()
+
+            encoder_output = self.encoder_session.run(
+                None, {"input": np.concatenate([contexts, windows], axis=1)}
+            )[0]
+
+            outputs = []
+            for window in encoder_output:
+                check_cancelled(cancellation_token)
+                out, state = self.decoder_session.run(
+                    None, {"input": window.reshape(1, -1), "state": state}
+                )
+                outputs.append(out)
+
+            yield np.concatenate(outputs, axis=0).squeeze(-1)
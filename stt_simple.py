@@ -1,6 +1,6 @@
 #!/usr/bin/env python3
 
-from faster_whisper import WhisperModel
+from faster_whisper.model_pool import configure_default_pool, get_memory_budget_mb, get_model
 import sys
 import os
 from datetime import datetime
@@ -18,8 +18,8 @@ def transcribe_audio(audio_file):
     print(f"🎤 파일: {os.path.basename(audio_file)}")
     print("🔄 Large-v3 모델로 전사 중...")
     
-    # Large 모델로 최고 품질
-    model = WhisperModel("large-v3", device="cpu", compute_type="int8")
+    # Large 모델로 최고 품질 (프로세스에 상주, 두 번째 파일부터 로딩 생략)
+    model = get_model("large-v3", device="cpu", compute_type="int8")
     
     segments, info = model.transcribe(
         audio_file,
@@ -271,6 +271,12 @@ def create_docx_structure(temp_dir, analysis, base_name):
         f.write(document_xml)
 
 if __name__ == "__main__":
+    # 상주 모델 메모리 예산 (STT_MODEL_MEMORY_MB, 기본: 시스템 메모리의 절반)
+    import psutil
+    configure_default_pool(
+        get_memory_budget_mb() or psutil.virtual_memory().total / (1024 * 1024) / 2
+    )
+    
     if len(sys.argv) == 2:
         # 명령행 인수가 있는 경우 (드래그 앤 드롭 또는 직접 입력)
         audio_file = sys.argv[1].strip().strip('"').strip("'")
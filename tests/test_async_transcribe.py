@@ -0,0 +1,103 @@
+import asyncio
+import threading
+
+from faster_whisper import AsyncWhisperModel, BatchedInferencePipeline, WhisperModel
+from faster_whisper.transcribe import Segment
+
+
+class StubModel:
+    num_workers = 2
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.produced = 0
+        self.running = 0
+        self.max_running = 0
+
+    def transcribe(self, audio, **options):
+        return self._segments(audio), None
+
+    def _segments(self, audio):
+        with self.lock:
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+        try:
+            for i in range(10):
+                with self.lock:
+                    self.produced += 1
+                yield Segment(i, 0, i, i + 1, audio, [], 0, 1, 0, None, 0)
+                if audio == "error":
+                    raise RuntimeError("decoding failed")
+        finally:
+            with self.lock:
+                self.running -= 1
+
+
+def test_async_concurrency_limit():
+    model = StubModel()
+
+    async def consume(async_model, audio):
+        segments, _ = await async_model.transcribe(audio)
+        return [segment.text async for segment in segments]
+
+    async def main():
+        async with AsyncWhisperModel(model, buffer_size=2) as async_model:
+            assert async_model.max_concurrency == 2
+            return await asyncio.gather(
+                *(consume(async_model, str(i)) for i in range(5))
+            )
+
+    results = asyncio.run(main())
+
+    assert results == [[str(i)] * 10 for i in range(5)]
+    assert model.max_running == 2
+
+
+def test_async_backpressure_and_errors():
+    model = StubModel()
+
+    async def main():
+        async_model = AsyncWhisperModel(model, buffer_size=2)
+
+        segments, _ = await async_model.transcribe("a")
+        assert (await segments.__anext__()).text == "a"
+        await asyncio.sleep(0.3)
+        # One segment consumed, two buffered and one waiting for a free slot.
+        assert model.produced == 4
+        await segments.aclose()
+
+        segments, _ = await async_model.transcribe("error")
+        texts = []
+        try:
+            async for segment in segments:
+                texts.append(segment.text)
+        except RuntimeError as e:
+            assert str(e) == "decoding failed"
+        else:
+            raise AssertionError("the error was not raised")
+        assert texts == ["error"]
+
+        async_model.close()
+
+    asyncio.run(main())
+    assert model.running == 0
+
+
+def test_async_transcribe(jfk_path):
+    model = WhisperModel("tiny")
+    options = dict(language="en", temperature=0, max_new_tokens=8)
+    segments, _ = model.transcribe(jfk_path, **options)
+    expected = list(segments)
+
+    async def transcribe(async_model, **kwargs):
+        segments, info = await async_model.transcribe(jfk_path, **options, **kwargs)
+        assert info.language == "en"
+        return [segment async for segment in segments]
+
+    async def main():
+        async with AsyncWhisperModel(model) as async_model:
+            assert await transcribe(async_model) == expected
+        async with AsyncWhisperModel(BatchedInferencePipeline(model)) as async_model:
+            assert len(await transcribe(async_model, batch_size=4)) > 0
+
+    asyncio.run(main())
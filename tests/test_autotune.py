@@ -0,0 +1,86 @@
+import pytest
+
+from faster_whisper.autotune import (
+    TuneResult,
+    autotune,
+    character_error_rate,
+    load_profile,
+    pareto_front,
+    save_profile,
+    select_profile,
+)
+
+
+def _result(model, rtf, peak_rss, cer):
+    return TuneResult(
+        model=model,
+        compute_type="int8",
+        device="cpu",
+        beam_size=1,
+        batched=False,
+        batch_size=8,
+        rtf=rtf,
+        peak_rss=peak_rss,
+        cer=cer,
+    )
+
+
+def test_character_error_rate():
+    assert (
+        character_error_rate(
+            "안녕하세요. 회의를 시작합니다", "안녕 하세요 회의를 시작합니다."
+        )
+        == 0
+    )
+    assert character_error_rate("abcd", "abed") == 0.25
+    assert character_error_rate("abcd", "") == 1
+    assert character_error_rate("", "") == 0
+
+
+def test_select_profile():
+    small = _result("small", 0.1, 1000, 0.2)
+    medium = _result("medium", 0.3, 2000, 0.08)
+    large = _result("large-v3", 0.6, 4000, 0.05)
+    slow_small = _result("small", 0.2, 1000, 0.2)
+    results = [small, medium, large, slow_small]
+
+    assert pareto_front(results) == [small, medium, large]
+    assert select_profile(results, target_cer=0.1) == medium
+    assert select_profile(results, target_cer=0.01) == large
+    with pytest.raises(ValueError):
+        select_profile([], target_cer=0.1)
+
+
+def test_autotune(jfk_path, tmp_path):
+    reference = (
+        "And so my fellow Americans ask not what your country can do for you, "
+        "ask what you can do for your country."
+    )
+    results = autotune(
+        jfk_path,
+        reference,
+        models=["tiny"],
+        compute_types=["int8"],
+        beam_sizes=[1, 2],
+        batch_size=2,
+        language="en",
+        transcribe_options=dict(max_new_tokens=8),
+        isolate=False,
+    )
+
+    assert [(result.batched, result.beam_size) for result in results] == [
+        (False, 1),
+        (False, 2),
+        (True, 1),
+        (True, 2),
+    ]
+    for result in results:
+        assert result.rtf > 0
+        assert result.peak_rss > 0
+        assert result.cer >= 0
+
+    path = str(tmp_path / "profile.json")
+    profile = save_profile(path, results, target_cer=1.0)
+    assert load_profile(path, device="cpu") == profile
+    assert load_profile(path, device="cuda") is None
+    assert load_profile(str(tmp_path / "missing.json")) is None
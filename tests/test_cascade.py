@@ -0,0 +1,88 @@
+from unittest.mock import MagicMock
+
+import numpy as np
+
+from faster_whisper.cascade import CascadeInferencePipeline
+from faster_whisper.transcribe import Segment, TranscriptionInfo
+
+
+def _segment(id, start, end, text, avg_logprob=-0.2, compression_ratio=1.5):
+    return Segment(
+        id=id,
+        seek=0,
+        start=start,
+        end=end,
+        text=text,
+        tokens=[],
+        avg_logprob=avg_logprob,
+        compression_ratio=compression_ratio,
+        no_speech_prob=0.0,
+        words=None,
+        temperature=0.0,
+    )
+
+
+def _info(duration):
+    return TranscriptionInfo(
+        language="ko",
+        language_probability=1.0,
+        duration=duration,
+        duration_after_vad=duration,
+        all_language_probs=None,
+        transcription_options=None,
+        vad_options=None,
+    )
+
+
+def test_cascade_escalates_low_confidence_segments():
+    fast_model = MagicMock()
+    fast_model.feature_extractor.sampling_rate = 16000
+    fast_model.transcribe.return_value = (
+        iter(
+            [
+                _segment(1, 0.0, 2.0, "a"),
+                _segment(2, 2.0, 4.0, "b", avg_logprob=-1.2),
+                _segment(3, 4.5, 6.0, "c", compression_ratio=3.0),
+                _segment(4, 6.0, 10.0, "d"),
+            ]
+        ),
+        _info(10.0),
+    )
+
+    model = MagicMock()
+    model.transcribe.return_value = (
+        iter([_segment(1, 2.0, 3.0, "B"), _segment(2, 3.0, 6.0, "C")]),
+        _info(10.0),
+    )
+
+    pipeline = CascadeInferencePipeline(fast_model, model)
+    audio = np.zeros(16000 * 10, dtype=np.float32)
+    segments, info = pipeline.transcribe(audio, beam_size=5)
+
+    _, kwargs = model.transcribe.call_args
+    assert kwargs["clip_timestamps"] == [2.0, 6.0]
+    assert kwargs["language"] == "ko"
+    assert kwargs["beam_size"] == 5
+
+    assert [segment.text for segment in segments] == ["a", "B", "C", "d"]
+    assert [segment.id for segment in segments] == [1, 2, 3, 4]
+    assert info.num_escalated_segments == 2
+    assert info.escalated_spans == [(2.0, 6.0)]
+    assert info.escalated_fraction == 0.4
+
+
+def test_cascade_without_escalation():
+    fast_model = MagicMock()
+    fast_model.feature_extractor.sampling_rate = 16000
+    fast_model.transcribe.return_value = (
+        iter([_segment(1, 0.0, 2.0, "a")]),
+        _info(2.0),
+    )
+    model = MagicMock()
+
+    pipeline = CascadeInferencePipeline(fast_model, model)
+    segments, info = pipeline.transcribe(np.zeros(32000, dtype=np.float32))
+
+    model.transcribe.assert_not_called()
+    assert [segment.text for segment in segments] == ["a"]
+    assert info.escalated_fraction == 0.0
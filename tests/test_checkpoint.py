@@ -0,0 +1,155 @@
+import itertools
+import json
+
+import numpy as np
+import pytest
+
+from faster_whisper import (
+    BatchedInferencePipeline,
+    CancellationToken,
+    TranscriptionCancelled,
+    WhisperModel,
+    decode_audio,
+)
+
+
+def _interrupt(segments, num_segments):
+    list(itertools.islice(segments, num_segments))
+    segments.close()
+
+
+def test_transcribe_resume(multilingual_path, tmp_path):
+    model = WhisperModel("tiny")
+    checkpoint_path = str(tmp_path / "checkpoint.json")
+
+    for options in [
+        dict(),
+        dict(vad_filter=True),
+        dict(word_timestamps=True),
+        dict(multilingual=True),
+    ]:
+        options.update(temperature=0, max_new_tokens=8)
+        if not options.get("multilingual"):
+            options.update(language="en")
+
+        segments, info = model.transcribe(multilingual_path, **options)
+        expected = list(segments)
+
+        segments, _ = model.transcribe(
+            multilingual_path,
+            checkpoint_path=checkpoint_path,
+            checkpoint_interval=0,
+            **options,
+        )
+        _interrupt(segments, 2)
+        with open(checkpoint_path) as f:
+            state = json.load(f)
+        assert state["seek"] > 0
+        assert not state["finished"]
+
+        segments, resumed_info = model.transcribe(
+            multilingual_path,
+            checkpoint_path=checkpoint_path,
+            checkpoint_interval=0,
+            **options,
+        )
+        assert list(segments) == expected
+        assert resumed_info.language == info.language
+        assert resumed_info.duration_after_vad == info.duration_after_vad
+
+
+def test_batched_transcribe_resume(multilingual_path, tmp_path):
+    pipeline = BatchedInferencePipeline(WhisperModel("tiny"))
+    audio = np.tile(decode_audio(multilingual_path), 4)
+    checkpoint_path = str(tmp_path / "checkpoint.json")
+
+    for options in [dict(), dict(vad_filter=True, duration_bucketing=True)]:
+        options.update(language="en", temperature=0, max_new_tokens=8, batch_size=2)
+
+        segments, info = pipeline.transcribe(audio, **options)
+        expected = list(segments)
+        num_chunks = sum(info.decoding_stats.batch_sizes)
+
+        segments, _ = pipeline.transcribe(
+            audio, checkpoint_path=checkpoint_path, checkpoint_interval=0, **options
+        )
+        _interrupt(segments, 1)
+
+        segments, info = pipeline.transcribe(
+            audio, checkpoint_path=checkpoint_path, checkpoint_interval=0, **options
+        )
+        assert list(segments) == expected
+        # The chunks saved in the checkpoint are not decoded again.
+        assert sum(info.decoding_stats.batch_sizes) < num_chunks
+
+
+def test_checkpoint_other_arguments(jfk_path, tmp_path):
+    model = WhisperModel("tiny")
+    checkpoint_path = str(tmp_path / "checkpoint.json")
+    options = dict(language="en", temperature=0, max_new_tokens=5)
+
+    segments, _ = model.transcribe(jfk_path, checkpoint_path=checkpoint_path, **options)
+    list(segments)
+
+    segments, _ = model.transcribe(jfk_path, beam_size=1, **options)
+    expected = list(segments)
+    segments, _ = model.transcribe(
+        jfk_path, beam_size=1, checkpoint_path=checkpoint_path, **options
+    )
+    assert list(segments) == expected
+
+
+def test_resume_after_cancellation(multilingual_path, tmp_path):
+    model = WhisperModel("tiny")
+    checkpoint_path = str(tmp_path / "checkpoint.json")
+    options = dict(language="en", temperature=0, max_new_tokens=8)
+
+    segments, _ = model.transcribe(multilingual_path, **options)
+    expected = list(segments)
+
+    token = CancellationToken()
+    segments, _ = model.transcribe(
+        multilingual_path,
+        checkpoint_path=checkpoint_path,
+        # The checkpoint is only saved when the transcription is cancelled.
+        checkpoint_interval=3600,
+        cancellation_token=token,
+        **options,
+    )
+    next(segments)
+    token.cancel()
+    with pytest.raises(TranscriptionCancelled):
+        list(segments)
+
+    with open(checkpoint_path) as f:
+        state = json.load(f)
+    assert state["seek"] > 0
+
+    segments, _ = model.transcribe(
+        multilingual_path, checkpoint_path=checkpoint_path, **options
+    )
+    assert list(segments) == expected
+
+
+def test_long_audio_checkpoint_other_audio(multilingual_path, tmp_path, caplog):
+    model = WhisperModel("tiny")
+    checkpoint_path = str(tmp_path / "checkpoint.json")
+    options = dict(language="en", temperature=0, max_new_tokens=8, long_audio=True)
+    audio = decode_audio(multilingual_path)
+    other_audio = np.random.RandomState(0).uniform(-0.1, 0.1, audio.shape[0])
+    other_audio = other_audio.astype(np.float32)
+
+    segments, _ = model.transcribe(other_audio, **options)
+    expected = list(segments)
+
+    segments, _ = model.transcribe(
+        audio, checkpoint_path=checkpoint_path, checkpoint_interval=0, **options
+    )
+    _interrupt(segments, 2)
+
+    # Same length and arguments: the checkpoint of the first audio must not be resumed.
+    segments, _ = model.transcribe(
+        other_audio, checkpoint_path=checkpoint_path, checkpoint_interval=0, **options
+    )
+    assert list(segments) == expected
+    assert "Ignoring the checkpoint" in caplog.text
@@ -0,0 +1,82 @@
+import pytest
+
+from faster_whisper import CompactSegments, WhisperModel
+from faster_whisper.compact import CompactSegmentsBuilder
+from faster_whisper.transcribe import Segment, Word
+
+
+def _segment(id, text, words=None, temperature=0.0):
+    return Segment(
+        id=id,
+        seek=id * 100,
+        start=id * 1.5,
+        end=id * 1.5 + 1.25,
+        text=text,
+        tokens=list(range(id, id + 3)),
+        avg_logprob=-0.25,
+        compression_ratio=1.5,
+        no_speech_prob=0.01,
+        words=words,
+        temperature=temperature,
+    )
+
+
+def test_compact_segments():
+    segments = [
+        _segment(
+            1,
+            " 안녕하세요",
+            words=[Word(0.0, 0.5, " 안녕", 0.9), Word(0.5, 1.0, "하세요", 0.8)],
+        ),
+        _segment(2, " Hello", words=[]),
+        _segment(3, "", temperature=None),
+    ]
+
+    compact = CompactSegments.from_segments(iter(segments))
+
+    assert len(compact) == 3
+    assert compact.num_words == 2
+    assert compact.to_segments() == segments
+    assert compact[-1].temperature is None
+    assert compact[0].words[1].word == "하세요"
+    assert compact[1].words == []
+    assert compact[2].words is None
+    assert compact.get_tokens(1).tolist() == [2, 3, 4]
+    assert compact.columns["start"].tolist() == [1.5, 3.0, 4.5]
+    assert [segment.text for segment in compact[1:]] == [" Hello", ""]
+
+    with pytest.raises(IndexError):
+        compact[3]
+
+
+def test_compact_segments_with_texts():
+    compact = CompactSegments.from_segments([_segment(1, " a"), _segment(2, " b")])
+    corrected = compact.with_texts([" 가나", ""])
+
+    assert [segment.text for segment in corrected] == [" 가나", ""]
+    assert corrected[1].tokens == compact[1].tokens
+
+    with pytest.raises(ValueError):
+        compact.with_texts([" a"])
+
+
+def test_builder_is_frozen_after_build():
+    builder = CompactSegmentsBuilder()
+    builder.append(_segment(1, " a"))
+    compact = builder.build()
+
+    with pytest.raises(BufferError):
+        builder.append(_segment(2, " b"))
+    assert len(compact) == 1
+
+
+def test_compact_transcription(jfk_path):
+    model = WhisperModel("tiny")
+    options = dict(language="en", temperature=0, max_new_tokens=8, word_timestamps=True)
+
+    segments, _ = model.transcribe(jfk_path, **options)
+    expected = list(segments)
+    segments, _ = model.transcribe(jfk_path, **options)
+    compact = CompactSegments.from_segments(segments)
+
+    assert compact.to_segments() == expected
@@ -0,0 +1,106 @@
+import numpy as np
+
+from faster_whisper import WhisperModel
+
+from faster_whisper.audio import decode_audio, decode_audio_blocks
+from faster_whisper.feature_extractor import FeatureExtractor
+from faster_whisper.long_audio import (
+    AudioSource,
+    LongAudioFeatures,
+    SpeechAudioReader,
+    iter_speech_blocks,
+)
+from faster_whisper.vad import (
+    VadOptions,
+    collect_chunks,
+    get_speech_timestamps,
+    get_speech_timestamps_streaming,
+)
+
+
+def test_decode_audio_blocks(jfk_path):
+    audio = decode_audio(jfk_path)
+    blocks = list(decode_audio_blocks(jfk_path))
+
+    np.testing.assert_array_equal(np.concatenate(blocks), audio)
+
+
+def test_streaming_vad(multilingual_path):
+    audio = decode_audio(multilingual_path)
+    vad_options = VadOptions(min_silence_duration_ms=500)
+
+    speech_chunks, num_samples = get_speech_timestamps_streaming(
+        AudioSource(audio, block_size=123457).blocks(), vad_options
+    )
+
+    assert num_samples == audio.shape[0]
+    assert speech_chunks == get_speech_timestamps(audio, vad_options)
+
+
+def test_speech_audio_reader():
+    audio = np.arange(100, dtype=np.float32)
+    speech_chunks = [{"start": 5, "end": 20}, {"start": 40, "end": 95}]
+    speech = np.concatenate(collect_chunks(audio, speech_chunks)[0])
+
+    blocks = iter_speech_blocks(
+        AudioSource(audio, block_size=7).blocks(), speech_chunks
+    )
+    np.testing.assert_array_equal(np.concatenate(list(blocks)), speech)
+
+    reader = SpeechAudioReader(
+        AudioSource(audio, block_size=7), speech_chunks, speech.shape[0]
+    )
+    np.testing.assert_array_equal(reader.read(3, 30), speech[3:30])
+    np.testing.assert_array_equal(reader.read(25, 80), np.pad(speech[25:], (0, 10)))
+    # Reading backward restarts from the beginning.
+    np.testing.assert_array_equal(reader.read(0, 10), speech[:10])
+
+
+def test_long_audio_features(multilingual_path):
+    feature_extractor = FeatureExtractor()
+    audio = decode_audio(multilingual_path)
+    speech_chunks = get_speech_timestamps(audio)
+
+    for source, chunks in [
+        (multilingual_path, None),
+        (audio, None),
+        (open(multilingual_path, "rb"), None),
+        (multilingual_path, speech_chunks),
+    ]:
+        if chunks is None:
+            expected = feature_extractor(audio)
+        else:
+            expected = feature_extractor(
+                np.concatenate(collect_chunks(audio, chunks)[0])
+            )
+
+        features = LongAudioFeatures(
+            feature_extractor,
+            AudioSource(source, block_size=100000),
+            chunks,
+            audio.shape[0],
+        )
+        num_frames = expected.shape[-1]
+
+        assert features.shape == expected.shape
+        for start, size in [(0, 3000), (2999, 3000), (num_frames - 13, 3000), (7, 5)]:
+            np.testing.assert_array_equal(
+                features[:, start : start + size], expected[:, start : start + size]
+            )
+        np.testing.assert_array_equal(features[..., 100:3100], expected[..., 100:3100])
+
+
+def test_transcribe_long_audio(multilingual_path):
+    model = WhisperModel("tiny")
+
+    for options in [dict(), dict(vad_filter=True), dict(word_timestamps=True)]:
+        options.update(language="en", temperature=0, max_new_tokens=5)
+
+        segments, info = model.transcribe(multilingual_path, **options)
+        long_segments, long_info = model.transcribe(
+            multilingual_path, long_audio=True, **options
+        )
+
+        assert list(long_segments) == list(segments)
+        assert long_info.duration == info.duration
+        assert long_info.duration_after_vad == info.duration_after_vad
@@ -0,0 +1,69 @@
+import json
+import time
+
+from faster_whisper.metrics import JobMetrics, ResourceSampler
+
+
+def test_resource_sampler():
+    sampler = ResourceSampler(interval=0.01, capacity=5)
+    with sampler:
+        time.sleep(0.2)
+
+    samples = sampler.samples()
+    assert len(samples) == 5
+    assert all(sample.rss > 0 for sample in samples)
+    assert sampler.latest == samples[-1]
+    assert samples == sorted(samples, key=lambda sample: sample.time)
+
+
+def test_job_metrics(tmp_path):
+    sampler = ResourceSampler(interval=0.01).start()
+    metrics = JobMetrics("meeting", sampler, labels=dict(app="test"))
+
+    metrics.start_stage("stt")
+    time.sleep(0.05)
+    metrics.start_stage("llm_analysis")
+    metrics.end_stage()
+    with metrics.stage("stt"):
+        pass
+    metrics.set_value("audio_duration_seconds", 60)
+    metrics.finish()
+    sampler.stop()
+
+    assert [stage.name for stage in metrics.stages] == ["stt", "llm_analysis", "stt"]
+    assert metrics.stages[0].duration >= 0.05
+    assert all(stage.peak_rss > 0 for stage in metrics.stages)
+    assert list(metrics.stage_durations()) == ["stt", "llm_analysis"]
+
+    json_path = tmp_path / "metrics.json"
+    metrics.save_json(str(json_path))
+    data = json.loads(json_path.read_text())
+    assert data["job_id"] == "meeting"
+    assert len(data["stages"]) == 3
+
+    prom_path = tmp_path / "textfile" / "stt.prom"
+    metrics.write_prometheus(str(prom_path))
+    lines = prom_path.read_text().splitlines()
+    assert "# TYPE stt_stage_duration_seconds gauge" in lines
+    assert any(
+        line.startswith('stt_stage_duration_seconds{app="test",stage="stt"} ')
+        for line in lines
+    )
+    assert any(
+        line.startswith('stt_job_audio_duration_seconds{app="test"} 60.0')
+        for line in lines
+    )
+    assert list(prom_path.parent.iterdir()) == [prom_path]
+
+
+def test_job_metrics_without_sampler():
+    metrics = JobMetrics("meeting", labels=dict(file='a "b"'))
+    with metrics.stage("decode"):
+        pass
+    metrics.finish()
+
+    assert metrics.stages[0].peak_rss is None
+    assert metrics.peak_rss is None
+    text = metrics.to_prometheus()
+    assert "stt_stage_peak_rss_bytes" not in text
+    assert 'stt_stage_duration_seconds{file="a \\"b\\"",stage="decode"}' in text
@@ -0,0 +1,91 @@
+import threading
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from faster_whisper import ModelPool, model_pool
+
+
+def test_model_pool_reuses_models():
+    pool = ModelPool()
+
+    model = pool.get("tiny", device="cpu")
+    assert pool.get("tiny", device="cpu") is model
+    assert pool.get("tiny", device="cpu", cpu_threads=1) is not model
+    assert len(pool.models) == 2
+
+    pool.clear()
+    assert pool.models == []
+
+
+def test_model_pool_evicts_least_recently_used():
+    pytest.importorskip("psutil")
+
+    # Each model appears to use 100 MB.
+    rss = iter(range(0, 1000 * 1024 * 1024, 100 * 1024 * 1024))
+    pool = ModelPool(memory_budget_mb=250, warmup=False)
+    pool._get_rss = lambda: next(rss)
+
+    first = pool.get("tiny", device="cpu", cpu_threads=1)
+    pool.get("tiny", device="cpu", cpu_threads=2)
+    assert pool.get("tiny", device="cpu", cpu_threads=1) is first
+    pool.get("tiny", device="cpu", cpu_threads=3)
+
+    assert [pooled.key[3] for pooled in pool.models] == [1, 3]
+    assert pool.memory_usage == 200 * 1024 * 1024
+
+
+def test_model_pool_loads_keys_concurrently(monkeypatch):
+    pool = ModelPool(warmup=False)
+    started = threading.Event()
+    release = threading.Event()
+    load = pool._load
+    loads = []
+
+    def slow_load(key, *args, **kwargs):
+        loads.append(key[3])
+        if key[3] == 1:
+            started.set()
+            assert release.wait(30)
+        return load(key, *args, **kwargs)
+
+    monkeypatch.setattr(pool, "_load", slow_load)
+
+    with ThreadPoolExecutor(3) as executor:
+        first = executor.submit(pool.get, "tiny", device="cpu", cpu_threads=1)
+        assert started.wait(30)
+        same = executor.submit(pool.get, "tiny", device="cpu", cpu_threads=1)
+        # Another model is not blocked by the slow load.
+        other = pool.get("tiny", device="cpu", cpu_threads=2)
+        assert not first.done()
+        release.set()
+
+        assert same.result() is first.result()
+        assert other is not first.result()
+
+    assert sorted(loads) == [1, 2]
+
+
+def test_default_pool_memory_budget(monkeypatch):
+    pytest.importorskip("psutil")
+    monkeypatch.setattr(model_pool, "_default_pool", None)
+    monkeypatch.setenv("STT_MODEL_MEMORY_MB", "250")
+
+    pool = model_pool.get_default_pool()
+    assert pool.memory_budget == 250 * 1024 * 1024
+    assert model_pool.get_default_pool() is pool
+
+    # Each model appears to use 100 MB.
+    rss = iter(range(0, 1000 * 1024 * 1024, 100 * 1024 * 1024))
+    pool._get_rss = lambda: next(rss)
+    pool.warmup = False
+    model_pool.get_model("tiny", device="cpu", cpu_threads=1)
+    model_pool.get_model("tiny", device="cpu", cpu_threads=2)
+
+    assert model_pool.configure_default_pool(150, warmup=False) is pool
+    assert [pooled.key[3] for pooled in pool.models] == [2]
+
+    monkeypatch.setenv("STT_MODEL_MEMORY_MB", "a lot")
+    with pytest.raises(ValueError, match="STT_MODEL_MEMORY_MB"):
+        model_pool.get_memory_budget_mb()
@@ -0,0 +1,89 @@
+import time
+
+import pytest
+
+from faster_whisper import (
+    BatchedInferencePipeline,
+    StreamingInferencePipeline,
+    WhisperModel,
+)
+from faster_whisper.audio import get_audio_duration
+from faster_whisper.progress import ProgressTracker
+
+
+def test_progress_tracker():
+    events = []
+    start_time = time.perf_counter() - 10
+    tracker = ProgressTracker(events.append, 100.0, 80.0, start_time=start_time)
+
+    tracker.skip(20)
+    tracker.update(20)
+
+    progress = events[-1]
+    assert progress.processed == 40
+    assert progress.fraction == 0.5
+    # The skipped audio is not included in the real-time factor.
+    assert progress.real_time_factor == pytest.approx(0.5, rel=0.01)
+    assert progress.eta == pytest.approx(20, rel=0.01)
+    assert progress.num_fallbacks == 0
+
+
+def test_transcribe_progress(multilingual_path):
+    model = WhisperModel("tiny")
+    events = []
+    segments, info = model.transcribe(
+        multilingual_path,
+        language="en",
+        temperature=[0.0, 0.5],
+        compression_ratio_threshold=0,
+        max_new_tokens=8,
+        progress_callback=events.append,
+    )
+    assert not events
+    list(segments)
+
+    assert len(events) == info.decoding_stats.num_windows
+    assert [event.processed for event in events] == sorted(
+        event.processed for event in events
+    )
+    assert events[-1].processed == pytest.approx(info.duration_after_vad)
+    assert events[-1].eta == 0
+    # Every window fails the compression ratio check at the first temperature.
+    assert events[-1].num_fallbacks == info.decoding_stats.num_windows
+    assert info.decoding_stats.num_fallbacks == info.decoding_stats.num_windows
+
+
+def test_batched_transcribe_progress(multilingual_path):
+    pipeline = BatchedInferencePipeline(WhisperModel("tiny"))
+    events = []
+    segments, info = pipeline.transcribe(
+        multilingual_path,
+        language="en",
+        temperature=[0.0, 0.5],
+        compression_ratio_threshold=0,
+        max_new_tokens=8,
+        batch_size=1,
+        progress_callback=events.append,
+    )
+    list(segments)
+
+    assert len(events) == len(info.decoding_stats.batch_sizes)
+    assert events[-1].processed == pytest.approx(info.duration_after_vad)
+    assert events[-1].num_fallbacks == len(events)
+
+
+def test_streaming_transcribe_progress(multilingual_path):
+    pipeline = StreamingInferencePipeline(WhisperModel("tiny"), section_length=20)
+    events = []
+    segments, info = pipeline.transcribe(
+        multilingual_path,
+        language="en",
+        temperature=0,
+        max_new_tokens=8,
+        vad_filter=True,
+        progress_callback=events.append,
+    )
+    list(segments)
+
+    assert events[-1].duration == get_audio_duration(multilingual_path)
+    assert events[-1].processed == pytest.approx(info.duration)
@@ -0,0 +1,220 @@
+import http.client
+import json
+import os
+import socket
+import threading
+
+import pytest
+
+from faster_whisper import WhisperModel
+from faster_whisper.server import (
+    TranscriptionServer,
+    TranscriptionService,
+    UnixTranscriptionServer,
+)
+from faster_whisper.transcribe import Segment
+
+
+class StubModel:
+    """Produces one segment each time the release event is set."""
+
+    def __init__(self, num_segments=2):
+        self.num_segments = num_segments
+        self.release = threading.Semaphore(0)
+        self.started = threading.Event()
+        self.segments_hook = None
+
+    def transcribe(self, audio, **options):
+        if audio == "missing.wav":
+            raise FileNotFoundError(audio)
+        self.started.set()
+        return self._segments(audio), None
+
+    def _segments(self, audio):
+        for i in range(self.num_segments):
+            self.release.acquire()
+            if self.segments_hook is not None:
+                self.segments_hook()
+            yield Segment(i, 0, i, i + 1, " %s %d" % (audio, i), [], 0, 1, 0, None, 0)
+
+
+def test_service_streams_segments():
+    model = StubModel()
+    service = TranscriptionService(model, num_workers=1)
+
+    first = service.submit("a.wav")
+    second = service.submit("b.wav")
+    model.started.wait(5)
+    assert service.running == 1
+    assert service.queue_depth == 1
+
+    segments = first.iter_segments(timeout=5)
+    model.release.release()
+    assert next(segments).text == " a.wav 0"
+    assert first.status == "running"
+    model.release.release()
+    assert next(segments).text == " a.wav 1"
+    assert list(segments) == []
+    assert first.status == "done"
+
+    for _ in range(2):
+        model.release.release()
+    assert second.wait(5)
+    assert [segment.text for segment in second.segments] == [" b.wav 0", " b.wav 1"]
+    assert service.queue_depth == 0
+
+    failed = service.submit("missing.wav")
+    assert failed.wait(5)
+    assert failed.status == "failed"
+    assert "FileNotFoundError" in failed.error
+
+    service.close()
+
+
+def test_service_cancels_jobs():
+    model = StubModel()
+    service = TranscriptionService(model, num_workers=1)
+
+    running = service.submit("a.wav")
+    queued = service.submit("b.wav")
+    model.started.wait(5)
+
+    queued.cancel()
+    running.cancel()
+    assert running.options["cancellation_token"].cancelled
+    # The stub stops at its next segment like the real model.
+    model.segments_hook = running.options["cancellation_token"].raise_if_cancelled
+    model.release.release()
+
+    assert running.wait(5)
+    assert queued.wait(5)
+    assert running.status == "cancelled"
+    assert queued.status == "cancelled"
+    assert queued.segments == []
+
+    service.close()
+
+
+def test_http_server(jfk_path):
+    service = TranscriptionService(WhisperModel("tiny"))
+    server = TranscriptionServer(
+        service, "127.0.0.1", 0, audio_dir=os.path.dirname(jfk_path)
+    )
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host, port = server.server_address
+
+    try:
+        connection = http.client.HTTPConnection(host, port, timeout=30)
+        options = dict(language="en", temperature=0, max_new_tokens=8)
+        connection.request(
+            "POST",
+            "/jobs",
+            json.dumps(dict(audio=os.path.basename(jfk_path), options=options)),
+            {"Content-Type": "application/json"},
+        )
+        response = connection.getresponse()
+        assert response.status == 202
+        job_id = json.loads(response.read())["id"]
+
+        connection.request("GET", "/jobs/%s/segments" % job_id)
+        response = connection.getresponse()
+        lines = [json.loads(line) for line in response.read().splitlines()]
+        assert all("segment" in line for line in lines[:-1])
+        assert lines[-1]["status"] == "done"
+        assert lines[-1]["num_segments"] == len(lines) - 1
+        assert lines[-1]["info"]["language"] == "en"
+
+        with open(jfk_path, "rb") as audio_file:
+            connection.request(
+                "POST",
+                "/jobs?language=%22en%22&temperature=0&max_new_tokens=8",
+                audio_file.read(),
+                {"Content-Type": "application/octet-stream"},
+            )
+        response = connection.getresponse()
+        job_id = json.loads(response.read())["id"]
+        service.get_job(job_id).wait(30)
+
+        connection.request("GET", "/jobs/%s" % job_id)
+        job = json.loads(connection.getresponse().read())
+        assert job["status"] == "done"
+        assert len(job["segments"]) == len(lines) - 1
+        assert job["progress"]["processed"] == pytest.approx(job["info"]["duration"])
+
+        connection.request("GET", "/status")
+        status = json.loads(connection.getresponse().read())
+        assert status == dict(queue_depth=0, running=0, num_workers=1)
+
+        connection.request("GET", "/jobs/unknown")
+        response = connection.getresponse()
+        response.read()
+        assert response.status == 404
+    finally:
+        server.shutdown()
+        server.server_close()
+        service.close()
+
+
+def test_http_server_rejects_unsafe_requests(tmp_path):
+    service = TranscriptionService(StubModel())
+    audio_dir = tmp_path / "audio"
+    audio_dir.mkdir()
+    (tmp_path / "secret.wav").write_bytes(b"")
+    server = TranscriptionServer(service, "127.0.0.1", 0, audio_dir=str(audio_dir))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host, port = server.server_address
+
+    def post(path, body, content_type="application/json"):
+        connection = http.client.HTTPConnection(host, port, timeout=30)
+        connection.request("POST", path, body, {"Content-Type": content_type})
+        response = connection.getresponse()
+        return response.status, json.loads(response.read())
+
+    try:
+        for audio in ["../secret.wav", str(tmp_path / "secret.wav"), 1]:
+            status, result = post("/jobs", json.dumps(dict(audio=audio)))
+            assert status == 400
+        assert "outside" in result["error"] or "string" in result["error"]
+
+        status, result = post(
+            "/jobs",
+            json.dumps(dict(audio="a.wav", options=dict(checkpoint_path="x.json"))),
+        )
+        assert status == 400
+        assert "checkpoint_path" in result["error"]
+
+        status, result = post(
+            "/jobs?checkpoint_path=%22x.json%22", b"", "application/octet-stream"
+        )
+        assert status == 400
+
+        server.audio_dir = None
+        status, result = post("/jobs", json.dumps(dict(audio="a.wav")))
+        assert status == 400
+        assert service.queue_depth == service.running == 0
+    finally:
+        server.shutdown()
+        server.server_close()
+        service.close(wait=False)
+
+
+@pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="requires Unix sockets")
+def test_unix_socket_server(tmp_path):
+    service = TranscriptionService(StubModel())
+    path = str(tmp_path / "stt.sock")
+    server = UnixTranscriptionServer(service, path)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    try:
+        connection = http.client.HTTPConnection("localhost")
+        connection.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        connection.sock.connect(path)
+        connection.request("GET", "/status")
+        response = connection.getresponse()
+        assert response.status == 200
+        assert json.loads(response.read())["queue_depth"] == 0
+    finally:
+        server.shutdown()
+        server.server_close()
+        service.close(wait=False)
+        os.unlink(path)
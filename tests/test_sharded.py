@@ -0,0 +1,220 @@
+import threading
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from faster_whisper import sharded
+from faster_whisper.cancellation import CancellationToken, TranscriptionCancelled
+from faster_whisper.sharded import (
+    Shard,
+    ShardedInferencePipeline,
+    split_shards,
+    stitch_shard_segments,
+)
+from faster_whisper.transcribe import DecodingStats, Segment, TranscriptionInfo, Word
+
+
+def _segment(start, end, words=None, text=""):
+    return Segment(
+        id=1,
+        seek=0,
+        start=start,
+        end=end,
+        text=text,
+        tokens=[],
+        avg_logprob=-0.2,
+        compression_ratio=1.5,
+        no_speech_prob=0.0,
+        words=words,
+        temperature=0.0,
+    )
+
+
+def test_split_shards_at_silences():
+    sampling_rate = 16000
+    speech_chunks = [
+        {"start": 0, "end": 9 * sampling_rate},
+        {"start": 11 * sampling_rate, "end": 19 * sampling_rate},
+        {"start": 21 * sampling_rate, "end": 30 * sampling_rate},
+    ]
+
+    shards = split_shards(30 * sampling_rate, speech_chunks, 3, overlap=0.5)
+
+    assert [(shard.start, shard.end) for shard in shards] == [
+        (0.0, 10.0),
+        (10.0, 20.0),
+        (20.0, 30.0),
+    ]
+    assert shards[0].audio_start == 0.0
+    assert shards[0].audio_end == 10.5
+    assert shards[1].audio_start == 9.5
+    assert shards[2].audio_end == 30.0
+
+
+def test_split_shards_without_silence():
+    shards = split_shards(16000 * 20, [{"start": 0, "end": 16000 * 20}], 2)
+    assert [(shard.start, shard.end) for shard in shards] == [(0.0, 10.0), (10.0, 20.0)]
+
+
+def test_stitch_shard_segments():
+    shard = Shard(start=10.0, end=20.0, audio_start=9.0, audio_end=21.0)
+    words = [
+        Word(start=0.2, end=0.8, word=" cut", probability=0.9),
+        Word(start=1.2, end=1.8, word=" hello", probability=0.9),
+        Word(start=1.8, end=2.4, word=" world", probability=0.9),
+    ]
+    segments = [
+        _segment(0.2, 2.4, words=words, text=" cut hello world"),
+        _segment(10.5, 11.5, words=[Word(10.5, 11.5, " next", 0.9)], text=" next"),
+    ]
+
+    stitched = stitch_shard_segments(segments, shard)
+
+    assert len(stitched) == 1
+    assert stitched[0].text == " hello world"
+    assert stitched[0].start == 10.2
+    assert stitched[0].end == 11.4
+    assert stitched[0].seek == 900
+
+
+def test_stitch_shard_segments_in_speech():
+    # The boundary at 10s is inside speech: both shards decode the words of the overlap.
+    first = Shard(start=0.0, end=10.0, audio_start=0.0, audio_end=11.0)
+    second = Shard(start=10.0, end=20.0, audio_start=9.0, audio_end=20.0)
+    first_words = [
+        Word(start=8.0, end=8.5, word=" a", probability=0.9),
+        Word(start=9.7, end=10.2, word=" b", probability=0.9),
+        Word(start=10.3, end=10.8, word=" c", probability=0.9),
+    ]
+    second_words = [
+        Word(start=0.7, end=1.2, word=" b", probability=0.9),
+        Word(start=1.3, end=1.8, word=" c", probability=0.9),
+        Word(start=2.0, end=2.5, word=" d", probability=0.9),
+    ]
+
+    stitched = stitch_shard_segments(
+        [_segment(8.0, 10.8, words=first_words, text=" a b c")], first
+    ) + stitch_shard_segments(
+        [_segment(0.7, 2.5, words=second_words, text=" b c d")], second
+    )
+
+    assert [segment.text for segment in stitched] == [" a b", " c d"]
+    assert [segment.end for segment in stitched] == [10.2, 11.5]
+
+
+class _FakeModel:
+    """Emits a word every 0.5s of the global timeline, which is read from the first
+    sample of a ramp waveform."""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.calls = []
+        self.num_segments = 0
+
+    def detect_language(self, audio):
+        self.calls.append("detect_language")
+        return "en", 1.0, []
+
+    def transcribe(self, audio, cancellation_token=None, **kwargs):
+        self.calls.append(kwargs)
+        offset = float(audio[0])
+        duration = audio.shape[0] / 16000
+        words = [
+            Word(start=t - offset, end=t - offset + 0.4, word=" w%d" % i, probability=1)
+            for i, t in ((i, i * 0.5) for i in range(100))
+            if offset <= t and t + 0.4 <= offset + duration
+        ]
+        segments = [
+            _segment(
+                group[0].start,
+                group[-1].end,
+                words=group,
+                text="".join(word.word for word in group),
+            )
+            for group in (words[i : i + 4] for i in range(0, len(words), 4))
+        ]
+
+        def generator():
+            for segment in segments:
+                time.sleep(self.delay)
+                cancellation_token.raise_if_cancelled()
+                self.num_segments += 1
+                yield segment
+
+        info = TranscriptionInfo(
+            language="en",
+            language_probability=1.0,
+            duration=duration,
+            duration_after_vad=duration,
+            all_language_probs=None,
+            transcription_options=None,
+            vad_options=None,
+            decoding_stats=DecodingStats(
+                num_windows=1, num_fallbacks=1, beam_escalation_starts=[1.0]
+            ),
+        )
+        return generator(), info
+
+
+@pytest.fixture
+def fake_pipeline(monkeypatch):
+    def make(model):
+        pipeline = ShardedInferencePipeline("tiny", num_workers=2)
+        # The workers run in threads of this process with the fake model.
+        pipeline._executor = ThreadPoolExecutor(2)
+        pipeline._cancel_event = threading.Event()
+        monkeypatch.setattr(sharded, "_worker_model", model)
+        monkeypatch.setattr(sharded, "_worker_cancel_event", pipeline._cancel_event)
+        monkeypatch.setattr(
+            sharded,
+            "get_speech_timestamps",
+            lambda audio, *args, **kwargs: [{"start": 0, "end": audio.shape[0]}],
+        )
+        return pipeline
+
+    return make
+
+
+def test_sharded_transcribe_boundary_in_speech(fake_pipeline):
+    model = _FakeModel()
+    audio = (np.arange(20 * 16000) / 16000).astype(np.float32)
+
+    with fake_pipeline(model) as pipeline:
+        segments, info = pipeline.transcribe(audio, num_shards=2, task="translate")
+
+    # Each word of the overlap is kept once, and the words were only used to stitch.
+    expected = "".join(" w%d" % i for i in range(40) if i * 0.5 + 0.4 <= 20)
+    assert "".join(segment.text for segment in segments) == expected
+    assert all(segment.words is None for segment in segments)
+
+    # The language is detected once, also when translating.
+    assert model.calls[0] == "detect_language"
+    assert all(
+        call["language"] == "en" and call["word_timestamps"] for call in model.calls[1:]
+    )
+    assert info.decoding_stats.num_windows == 2
+    assert info.decoding_stats.num_fallbacks == 2
+    # The escalated windows are in the time of the whole audio.
+    first, second = info.decoding_stats.beam_escalation_starts
+    assert first == 1.0 and second > 1.0
+
+
+def test_sharded_transcribe_cancel_running_shards(fake_pipeline):
+    model = _FakeModel(delay=0.2)
+    audio = (np.arange(20 * 16000) / 16000).astype(np.float32)
+
+    with fake_pipeline(model) as pipeline:
+        with pytest.raises(TranscriptionCancelled):
+            pipeline.transcribe(
+                audio,
+                num_shards=2,
+                language="en",
+                cancellation_token=CancellationToken(timeout=0.3),
+            )
+
+        # The running shards stopped at their next segment.
+        assert model.num_segments < 8
+        assert not pipeline._cancel_event.is_set()
@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+
+from faster_whisper import StreamingInferencePipeline, WhisperModel, decode_audio
+from faster_whisper.cancellation import CancellationToken, TranscriptionCancelled
+from faster_whisper.streaming import find_section_cut, iter_sections
+from faster_whisper.vad import VadOptions
+
+
+def test_find_section_cut():
+    speech_chunks = [
+        {"start": 0, "end": 100},
+        {"start": 300, "end": 600},
+        {"start": 700, "end": 1200},
+    ]
+
+    assert find_section_cut(speech_chunks, 1000) == 650
+    # The silence between 100 and 300 is in the first half of the section.
+    assert find_section_cut(speech_chunks[:2], 800) == 700
+    assert find_section_cut(speech_chunks[:2], 1000) == 800
+    assert find_section_cut([{"start": 0, "end": 1000}], 1000) == 1000
+    assert find_section_cut([], 1000) == 1000
+
+
+def test_iter_sections(jfk_path):
+    audio = decode_audio(jfk_path)
+    blocks = (audio[i : i + 10000] for i in range(0, audio.shape[0], 10000))
+
+    sections = list(iter_sections(blocks, 3 * 16000, VadOptions()))
+
+    assert len(sections) > 1
+    offset = 0
+    for section in sections:
+        assert section.offset == offset
+        assert section.audio.shape[0] <= 3 * 16000 + 10000
+        for chunk in section.speech_chunks:
+            assert 0 <= chunk["start"] < chunk["end"] <= section.audio.shape[0]
+        offset += section.audio.shape[0]
+
+    np.testing.assert_array_equal(
+        np.concatenate([section.audio for section in sections]), audio
+    )
+
+
+def test_iter_sections_cancelled(jfk_path):
+    audio = decode_audio(jfk_path)
+    token = CancellationToken()
+    token.cancel()
+
+    with pytest.raises(TranscriptionCancelled):
+        next(iter_sections(iter([audio]), 3 * 16000, VadOptions(), 16000, token))
+
+
+def test_streaming_transcribe(multilingual_path):
+    model = WhisperModel("tiny")
+    pipeline = StreamingInferencePipeline(model, section_length=20)
+
+    segments, info = pipeline.transcribe(
+        multilingual_path,
+        language="en",
+        temperature=0,
+        max_new_tokens=5,
+        vad_filter=True,
+        word_timestamps=True,
+    )
+    segments = list(segments)
+
+    assert info.language == "en"
+    assert info.duration == decode_audio(multilingual_path).shape[0] / 16000
+    assert 0 < info.duration_after_vad <= info.duration
+    assert [segment.id for segment in segments] == list(range(1, len(segments) + 1))
+    # The segments of the next sections are moved to the audio timeline.
+    assert segments[-1].start > 20
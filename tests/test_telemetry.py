@@ -0,0 +1,64 @@
+import json
+
+from faster_whisper import BatchedInferencePipeline, WhisperModel
+
+
+def test_transcribe_telemetry(multilingual_path, tmp_path):
+    model = WhisperModel("tiny")
+    segments, info = model.transcribe(
+        multilingual_path,
+        language="en",
+        temperature=[0.0, 0.5],
+        compression_ratio_threshold=0,
+        log_prob_threshold=None,
+        max_new_tokens=8,
+        telemetry=True,
+    )
+    list(segments)
+
+    telemetry = info.telemetry
+    assert len(telemetry.windows) == info.decoding_stats.num_windows
+    for window in telemetry.windows:
+        assert [attempt.temperature for attempt in window.attempts] == [0.0, 0.5]
+        assert window.attempts[0].fallback_reason == "compression_ratio"
+        assert window.attempts[0].beam_size == 5
+        assert window.generate_time > 0
+        assert window.num_tokens > 0
+
+    summary = telemetry.summary
+    assert summary["num_attempts"] == 2 * len(telemetry.windows)
+    # Both temperatures fail the compression ratio check.
+    assert summary["fallback_reasons"] == dict(
+        compression_ratio=summary["num_attempts"]
+    )
+    assert summary["generate_time"] > summary["postprocess_time"]
+
+    path = str(tmp_path / "telemetry.json")
+    telemetry.save(path)
+    with open(path) as file:
+        data = json.load(file)
+    assert data["summary"] == json.loads(json.dumps(summary))
+    assert len(data["windows"]) == len(telemetry.windows)
+
+    segments, info = model.transcribe(multilingual_path, language="en", temperature=0)
+    assert info.telemetry is None
+
+
+def test_batched_transcribe_telemetry(jfk_path):
+    pipeline = BatchedInferencePipeline(WhisperModel("tiny"))
+    segments, info = pipeline.transcribe(
+        jfk_path,
+        language="en",
+        temperature=0,
+        max_new_tokens=8,
+        word_timestamps=True,
+        telemetry=True,
+    )
+    list(segments)
+
+    windows = info.telemetry.windows
+    assert len(windows) == sum(info.decoding_stats.batch_sizes)
+    assert all(window.batch_size == len(windows) for window in windows)
+    assert all(window.encode_time > 0 for window in windows)
+    assert all(window.alignment_time > 0 for window in windows)
+    assert all(len(window.attempts) == 1 for window in windows)
@@ -0,0 +1,78 @@
+import numpy as np
+
+from faster_whisper import WhisperModel
+from faster_whisper.feature_extractor import FeatureExtractor
+from faster_whisper.threads import get_cpu_budget, get_cpu_quota, plan_threads
+
+
+def test_cpu_quota(tmp_path):
+    assert get_cpu_quota(str(tmp_path)) is None
+
+    (tmp_path / "cpu.max").write_text("max 100000\n")
+    assert get_cpu_quota(str(tmp_path)) is None
+    (tmp_path / "cpu.max").write_text("250000 100000\n")
+    assert get_cpu_quota(str(tmp_path)) == 2.5
+    assert get_cpu_budget(str(tmp_path)) <= 2
+
+    (tmp_path / "cpu.max").unlink()
+    (tmp_path / "cpu").mkdir()
+    (tmp_path / "cpu" / "cpu.cfs_quota_us").write_text("-1\n")
+    (tmp_path / "cpu" / "cpu.cfs_period_us").write_text("100000\n")
+    assert get_cpu_quota(str(tmp_path)) is None
+    (tmp_path / "cpu" / "cpu.cfs_quota_us").write_text("400000\n")
+    assert get_cpu_quota(str(tmp_path)) == 4
+
+
+def test_plan_threads(monkeypatch):
+    monkeypatch.delenv("OMP_NUM_THREADS", raising=False)
+
+    plan = plan_threads(num_workers=2, cpu_budget=16)
+    assert plan.inter_threads == 2
+    assert plan.intra_threads == 6
+    assert plan.fft_workers == 2
+    # The FFT workers run while the replicas decode: the total stays in the budget.
+    for num_workers, cpu_budget in [(1, 1), (1, 4), (3, 8), (1, 64)]:
+        plan = plan_threads(num_workers=num_workers, cpu_budget=cpu_budget)
+        total = (plan.intra_threads + plan.fft_workers) * plan.inter_threads
+        assert total <= max(cpu_budget, 2 * num_workers)
+    assert plan_threads(num_workers=1, cpu_budget=64).fft_workers == 4
+    assert plan_threads(num_workers=4, cpu_budget=2).intra_threads == 1
+
+    plan = plan_threads(cpu_threads=3, cpu_budget=8)
+    assert plan.intra_threads == 3
+    assert plan.fft_workers == 4
+    plan = plan_threads(cpu_threads=6, cpu_budget=8)
+    assert plan.fft_workers == 2
+    # No CPU is left for the FFT: it runs in the prefetch thread only.
+    plan = plan_threads(cpu_threads=8, cpu_budget=8)
+    assert plan.intra_threads == 8
+    assert plan.fft_workers == 1
+    plan = plan_threads(num_workers=2, cpu_threads=3, cpu_budget=8)
+    assert plan.fft_workers == 1
+
+    monkeypatch.setenv("OMP_NUM_THREADS", "5")
+    assert plan_threads(cpu_budget=8).intra_threads == 5
+
+
+def test_model_thread_plan(monkeypatch):
+    monkeypatch.delenv("OMP_NUM_THREADS", raising=False)
+
+    model = WhisperModel("tiny", cpu_threads=6)
+    assert model.thread_plan.intra_threads == 6
+    fft_workers = model.feature_extractor.fft_workers
+    assert fft_workers == model.thread_plan.fft_workers
+
+    # The plan belongs to the model: another model does not change it.
+    other_model = WhisperModel("tiny", cpu_threads=1)
+    assert other_model.thread_plan.intra_threads == 1
+    assert model.thread_plan.intra_threads == 6
+    assert model.feature_extractor.fft_workers == fft_workers
+
+
+def test_stft_workers():
+    audio = np.random.RandomState(0).uniform(-1, 1, 16000 * 30).astype("float32")
+    feature_extractor = FeatureExtractor()
+    features = feature_extractor(audio)
+
+    feature_extractor.fft_workers = 3
+    np.testing.assert_allclose(feature_extractor(audio), features, rtol=1e-5)
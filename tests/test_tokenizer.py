@@ -1,3 +1,5 @@
+import random
+
 from faster_whisper import WhisperModel
 from faster_whisper.tokenizer import Tokenizer
 from faster_whisper.transcribe import get_suppressed_tokens
@@ -118,3 +120,53 @@ def test_split_on_unicode():
 
     assert words == [" elle", " est", " l", "'", "\ufffd", "é", "rit", "oire"]
     assert word_tokens == [[8404], [871], [287], [6], [246], [526], [3210], [20378]]
+
+
+def test_split_on_unicode_parity():
+    model = WhisperModel("tiny")
+    tokenizer = Tokenizer(model.hf_tokenizer, True, task="transcribe", language="ko")
+    assert tokenizer.token_bytes is not None
+
+    texts = [
+        " 안녕하세요 여러분, 오늘 회의를 시작하겠습니다.",
+        "你好，世界。",
+        " elle est l'écritoire",
+        " 🎉 ✅ ♪♪",
+    ]
+    byte_tokens = [
+        token
+        for token, token_bytes in enumerate(tokenizer.token_bytes)
+        if len(token_bytes) == 1 and token_bytes[0] >= 0x80
+    ]
+    special_tokens = [tokenizer.eot, tokenizer.sot, tokenizer.no_timestamps]
+
+    rng = random.Random(0)
+    for _ in range(500):
+        tokens = []
+        for _ in range(rng.randint(1, 8)):
+            choice = rng.random()
+            if choice < 0.4:
+                tokens += tokenizer.encode(rng.choice(texts))[: rng.randint(1, 20)]
+            elif choice < 0.7:
+                tokens += rng.sample(byte_tokens, rng.randint(1, 4))
+            elif choice < 0.85:
+                tokens.append(tokenizer.timestamp_begin + rng.randint(0, 1500))
+            else:
+                tokens.append(rng.choice(special_tokens))
+
+        assert tokenizer.split_tokens_on_unicode(
+            tokens
+        ) == tokenizer._split_tokens_on_unicode_by_prefix(tokens)
+
+
+def test_split_on_spaces_korean():
+    model = WhisperModel("tiny")
+    tokenizer = Tokenizer(model.hf_tokenizer, True, task="transcribe", language="ko")
+    text = " 안녕하세요 여러분, 오늘 회의를 시작하겠습니다."
+    tokens = tokenizer.encode(text) + [tokenizer.eot]
+
+    words, word_tokens = tokenizer.split_to_word_tokens(tokens)
+
+    assert "".join(words) == text
+    assert words[:3] == [" 안녕하세요", " 여러분", ","]
+    assert sum(word_tokens, []) == tokens
@@ -1,9 +1,20 @@
 import inspect
 import os
 
+from unittest.mock import MagicMock
+
+import ctranslate2
 import numpy as np
+import pytest
 
-from faster_whisper import BatchedInferencePipeline, WhisperModel, decode_audio
+from faster_whisper import (
+    BatchedInferencePipeline,
+    CancellationToken,
+    TranscriptionCancelled,
+    WhisperModel,
+    decode_audio,
+)
+from faster_whisper.transcribe import TranscriptionOptions, get_suppressed_tokens
 
 
 def test_supported_languages():
@@ -88,6 +99,107 @@ def test_batched_transcribe(physcisworks_path):
     assert len(segments) > 7
 
 
+def test_batched_transcribe_many(jfk_path):
+    model = WhisperModel("tiny")
+    batched_model = BatchedInferencePipeline(model=model)
+    audio = decode_audio(jfk_path)
+    inputs = [audio, audio[: 5 * 16000], np.asarray([], dtype="float32")]
+
+    expected = []
+    for audio_input in inputs:
+        result, _ = batched_model.transcribe(audio_input, language="en")
+        expected.append([(segment.start, segment.text) for segment in result])
+
+    batch_sizes = []
+    forward = batched_model.forward
+
+    def recording_forward(features, *args):
+        batch_sizes.append(len(features))
+        return forward(features, *args)
+
+    batched_model.forward = recording_forward
+    results = list(batched_model.transcribe_many(inputs, batch_size=8, language="en"))
+
+    assert len(results) == 3
+    # consume the streams out of order
+    for index in (1, 0, 2):
+        result, info = results[index]
+        assert info.duration == inputs[index].shape[0] / 16000
+        assert [(segment.start, segment.text) for segment in result] == expected[index]
+
+    # the chunks of the two non-empty inputs are decoded in a single batch
+    assert batch_sizes == [2]
+    assert [info.decoding_stats.batch_sizes for _, info in results] == [[2], [2], []]
+
+    with pytest.raises(ValueError, match="checkpoint_path"):
+        batched_model.transcribe_many(inputs, checkpoint_path="checkpoint.json")
+
+
+def test_batched_transcribe_many_prepares_lazily(jfk_path):
+    model = WhisperModel("tiny")
+    batched_model = BatchedInferencePipeline(model=model)
+    audio = decode_audio(jfk_path)[: 3 * 16000]
+    num_read = 0
+
+    def inputs():
+        nonlocal num_read
+        for _ in range(12):
+            num_read += 1
+            yield audio.copy()
+
+    results = batched_model.transcribe_many(
+        inputs(),
+        batch_size=1,
+        language="en",
+        vad_filter=False,
+        temperature=0,
+        max_new_tokens=4,
+    )
+    segments, _ = next(results)
+    next(iter(segments))
+    # Only the inputs of the next few batches are prepared.
+    assert num_read < 12
+
+    for segments, _ in results:
+        list(segments)
+    assert num_read == 12
+
+
+def test_batched_transcribe_duration_bucketing(jfk_path):
+    model = WhisperModel("tiny")
+    batched_model = BatchedInferencePipeline(model=model)
+    clip_timestamps = [
+        {"start": 0.0, "end": 1.0},
+        {"start": 1.5, "end": 10.0},
+        {"start": 10.0, "end": 10.5},
+        {"start": 10.5, "end": 11.0},
+    ]
+
+    result, _ = batched_model.transcribe(
+        jfk_path, language="en", clip_timestamps=clip_timestamps, batch_size=2
+    )
+    expected = [(segment.start, segment.text) for segment in result]
+
+    batch_durations = []
+    forward = batched_model.forward
+
+    def recording_forward(features, tokenizer, chunks_metadata, *args):
+        batch_durations.append([chunk["duration"] for chunk in chunks_metadata])
+        return forward(features, tokenizer, chunks_metadata, *args)
+
+    batched_model.forward = recording_forward
+    result, _ = batched_model.transcribe(
+        jfk_path,
+        language="en",
+        clip_timestamps=clip_timestamps,
+        batch_size=2,
+        duration_bucketing=True,
+    )
+
+    assert [(segment.start, segment.text) for segment in result] == expected
+    assert batch_durations == [[0.5, 0.5], [1.0, 8.5]]
+
+
 def test_empty_audio():
     audio = np.asarray([], dtype="float32")
     model = WhisperModel("tiny")
@@ -240,6 +352,8 @@ def test_transcribe_signature():
         inspect.getargs(BatchedInferencePipeline.transcribe.__code__).args
     )
     pipeline_transcribe_args.remove("batch_size")
+    pipeline_transcribe_args.remove("duration_bucketing")
+    pipeline_transcribe_args.remove("adaptive_batch_parameters")
 
     assert model_transcribe_args == pipeline_transcribe_args
 
@@ -290,3 +404,381 @@ def test_cliptimestamps_segments(jfk_path):
             " And so my fellow Americans ask not what your country can do for you, "
             "ask what you can do for your country."
         )
+
+
+class _FakeGenerationResult:
+    def __init__(self, avg_logprob, tokens=(1, 2, 3)):
+        self.sequences_ids = [list(tokens)]
+        self.scores = [avg_logprob * (len(tokens) + 1) / len(tokens)]
+        self.no_speech_prob = 0.0
+
+    def result(self):
+        return self
+
+
+def _fake_fallback_model(logprobs_per_temperature, num_workers):
+    calls = []
+
+    def generate(encoder_output, prompts, asynchronous=False, **kwargs):
+        temperature = kwargs.get("sampling_temperature", 0.0)
+        calls.append((temperature, asynchronous))
+        return [_FakeGenerationResult(logprobs_per_temperature[temperature])]
+
+    model = WhisperModel.__new__(WhisperModel)
+    model.logger = MagicMock()
+    model.max_length = 448
+    model.time_precision = 0.02
+    model.model = MagicMock(num_workers=num_workers)
+    model.model.generate.side_effect = generate
+    return model, calls
+
+
+def _fallback_options(**kwargs):
+    options = dict(
+        beam_size=5,
+        best_of=5,
+        patience=1,
+        length_penalty=1,
+        repetition_penalty=1,
+        no_repeat_ngram_size=0,
+        log_prob_threshold=-1.0,
+        no_speech_threshold=0.6,
+        compression_ratio_threshold=2.4,
+        condition_on_previous_text=True,
+        prompt_reset_on_temperature=0.5,
+        temperatures=[0.0, 0.2, 0.4, 0.6, 0.8, 1.0],
+        initial_prompt=None,
+        prefix=None,
+        suppress_blank=True,
+        suppress_tokens=[-1],
+        without_timestamps=False,
+        max_initial_timestamp=1.0,
+        word_timestamps=False,
+        prepend_punctuations="",
+        append_punctuations="",
+        multilingual=False,
+        max_new_tokens=None,
+        clip_timestamps="0",
+        hallucination_silence_threshold=None,
+        hotwords=None,
+    )
+    options.update(kwargs)
+    return TranscriptionOptions(**options)
+
+
+def test_speculative_fallback_selects_same_temperature():
+    logprobs = {0.0: -2.0, 0.2: -1.5, 0.4: -0.5, 0.6: -0.1, 0.8: -0.1, 1.0: -0.1}
+    tokenizer = MagicMock()
+    tokenizer.decode.return_value = "hello world"
+
+    model, calls = _fake_fallback_model(logprobs, num_workers=3)
+    _, avg_logprob, temperature, _ = model.generate_with_fallback(
+        None, [1], tokenizer, _fallback_options()
+    )
+    assert temperature == 0.4
+    assert avg_logprob == pytest.approx(-0.5)
+    assert calls == [(0.0, False), (0.2, False), (0.4, False)]
+
+    model, calls = _fake_fallback_model(logprobs, num_workers=3)
+    _, avg_logprob, temperature, _ = model.generate_with_fallback(
+        None, [1], tokenizer, _fallback_options(speculative_fallback=True)
+    )
+    assert temperature == 0.4
+    assert avg_logprob == pytest.approx(-0.5)
+    assert calls == [(0.0, False), (0.2, True), (0.4, True), (0.6, True)]
+
+
+def test_batched_speculative_fallback_warning(caplog):
+    pipeline = BatchedInferencePipeline(model=WhisperModel("tiny"))
+    audio = np.zeros(16000, dtype=np.float32)
+
+    pipeline.transcribe(audio, language="en", speculative_fallback=True)
+
+    assert "speculative_fallback" in caplog.text
+
+
+def test_speculative_fallback_all_failed():
+    logprobs = {t: -2.0 - t for t in (0.0, 0.2, 0.4, 0.6, 0.8, 1.0)}
+    tokenizer = MagicMock()
+    tokenizer.decode.return_value = "hello world"
+
+    model, calls = _fake_fallback_model(logprobs, num_workers=4)
+    _, avg_logprob, temperature, _ = model.generate_with_fallback(
+        None, [1], tokenizer, _fallback_options(speculative_fallback=True)
+    )
+    assert len(calls) == 6
+    assert temperature == 1.0
+    assert avg_logprob == pytest.approx(-2.0)
+
+
+def test_adaptive_beam_escalation():
+    from faster_whisper.transcribe import AdaptiveBeamOptions, DecodingStats
+
+    tokenizer = MagicMock()
+    tokenizer.decode.return_value = "hello world"
+
+    def run(greedy_logprob):
+        beam_sizes = []
+
+        def generate(encoder_output, prompts, asynchronous=False, **kwargs):
+            beam_sizes.append(kwargs["beam_size"])
+            logprob = greedy_logprob if kwargs["beam_size"] == 1 else -0.1
+            return [_FakeGenerationResult(logprob)]
+
+        model, _ = _fake_fallback_model({}, num_workers=1)
+        model.model.generate.side_effect = generate
+        stats = DecodingStats()
+        options = _fallback_options(adaptive_beam=AdaptiveBeamOptions())
+        _, avg_logprob, temperature, _ = model.generate_with_fallback(
+            None, [1], tokenizer, options, stats=stats, time_offset=30.0
+        )
+        assert temperature == 0.0
+        return avg_logprob, beam_sizes, stats
+
+    avg_logprob, beam_sizes, stats = run(-0.2)
+    assert avg_logprob == pytest.approx(-0.2)
+    assert beam_sizes == [1]
+    assert stats == DecodingStats(num_windows=1, num_beam_escalations=0)
+
+    avg_logprob, beam_sizes, stats = run(-0.8)
+    assert avg_logprob == pytest.approx(-0.1)
+    assert beam_sizes == [1, 5]
+    assert stats == DecodingStats(
+        num_windows=1, num_beam_escalations=1, beam_escalation_starts=[30.0]
+    )
+
+
+def test_batched_adaptive_beam_warning(caplog):
+    pipeline = BatchedInferencePipeline(model=WhisperModel("tiny"))
+    audio = np.zeros(16000, dtype=np.float32)
+
+    pipeline.transcribe(audio, language="en", adaptive_beam=True)
+
+    assert "adaptive_beam" in caplog.text
+
+
+def test_batched_fallback_decodes_failed_items():
+    calls = []
+    logprobs = {(0.0, 1): -2.0, (0.2, 1): -0.5}
+
+    def generate(encoder_output, prompts, **kwargs):
+        temperature = kwargs.get("sampling_temperature", 0.0)
+        item_indices = np.asarray(encoder_output)[:, 0, 0].astype(int).tolist()
+        calls.append((temperature, item_indices))
+        return [
+            _FakeGenerationResult(logprobs.get((temperature, index), -0.1))
+            for index in item_indices
+        ]
+
+    encoder_output = np.repeat(np.arange(3, dtype=np.float32), 8).reshape(3, 2, 4)
+    model = MagicMock(max_length=448)
+    model.get_prompt.return_value = [1, 2]
+    model.encode.return_value = ctranslate2.StorageView.from_array(encoder_output)
+    model.model.generate.side_effect = generate
+
+    tokenizer = MagicMock()
+    tokenizer.decode.return_value = "hello world"
+
+    batched_model = BatchedInferencePipeline(model=model)
+    _, outputs = batched_model.generate_segment_batched(
+        np.zeros((3, 80, 3000), dtype=np.float32), tokenizer, _fallback_options()
+    )
+
+    assert calls == [(0.0, [0, 1, 2]), (0.2, [1])]
+    assert [output["temperature"] for output in outputs] == [0.0, 0.2, 0.0]
+    assert outputs[1]["avg_logprob"] == pytest.approx(-0.5)
+
+
+def test_adaptive_batch_sizer():
+    from faster_whisper.transcribe import AdaptiveBatchOptions, AdaptiveBatchSizer
+
+    sizer = AdaptiveBatchSizer(
+        AdaptiveBatchOptions(initial_batch_size=2, max_batch_size=16)
+    )
+    sizer.process = MagicMock()
+    sizer.process.memory_info.return_value.rss = sizer.base_rss
+
+    sizer.update(2, 1.0)
+    assert sizer.batch_size == 4
+    sizer.update(4, 1.0)
+    assert sizer.batch_size == 8
+    # the throughput dropped, so the previous size is kept
+    sizer.update(8, 4.0)
+    assert sizer.batch_size == 4
+    sizer.update(4, 0.1)
+    assert sizer.batch_size == 4
+
+    sizer.process.memory_info.return_value.rss = sizer.memory_limit + 1
+    sizer.update(4, 1.0)
+    assert sizer.batch_size == 2
+    # a batch built before the reduction does not reduce the size again
+    sizer.update(4, 1.0, 4)
+    assert sizer.batch_size == 2
+
+
+def test_adaptive_batch_sizer_prefetched_batches():
+    from faster_whisper.transcribe import AdaptiveBatchOptions, AdaptiveBatchSizer
+
+    sizer = AdaptiveBatchSizer(
+        AdaptiveBatchOptions(initial_batch_size=2, max_batch_size=16)
+    )
+    sizer.process = MagicMock()
+    sizer.process.memory_info.return_value.rss = sizer.base_rss
+
+    sizer.update(2, 1.0, 2)
+    assert sizer.batch_size == 4
+    # the next batches were built with the previous size before the update
+    sizer.update(2, 1.0, 2)
+    sizer.update(2, 1.0, 2)
+    assert sizer.batch_size == 4
+    sizer.update(4, 1.0, 4)
+    assert sizer.batch_size == 8
+
+
+def test_batched_transcribe_auto_batch_size(jfk_path):
+    model = WhisperModel("tiny")
+    batched_model = BatchedInferencePipeline(model=model)
+    clip_timestamps = [
+        {"start": float(start), "end": float(start + 1)} for start in range(10)
+    ]
+
+    result, info = batched_model.transcribe(
+        jfk_path,
+        language="en",
+        temperature=0.0,
+        clip_timestamps=clip_timestamps,
+        batch_size="auto",
+        adaptive_batch_parameters=dict(initial_batch_size=1, max_batch_size=4),
+    )
+    list(result)
+
+    assert sum(info.decoding_stats.batch_sizes) == 10
+    assert info.decoding_stats.batch_sizes[0] == 1
+    assert max(info.decoding_stats.batch_sizes) <= 4
+
+    audio = decode_audio(jfk_path)
+    results = batched_model.transcribe_many(
+        [audio[: 5 * 16000], audio[5 * 16000 :]],
+        language="en",
+        temperature=0.0,
+        vad_filter=False,
+        batch_size="auto",
+        adaptive_batch_parameters=dict(initial_batch_size=1, max_batch_size=4),
+    )
+    for result, info in results:
+        list(result)
+        assert info.decoding_stats.batch_sizes[0] == 1
+
+
+def test_language_detection_encoder_calls(multilingual_path):
+    model = WhisperModel("tiny")
+    audio = np.tile(decode_audio(multilingual_path), 3)
+    batch_sizes = []
+    encode = model.encode
+
+    def counting_encode(features):
+        batch_sizes.append(1 if features.ndim == 2 else features.shape[0])
+        return encode(features)
+
+    model.encode = counting_encode
+
+    segments, _ = model.transcribe(
+        audio, language="en", temperature=0, max_new_tokens=5
+    )
+    list(segments)
+    num_windows = len(batch_sizes)
+
+    for language_detection_segments in (1, 4):
+        batch_sizes.clear()
+        segments, _ = model.transcribe(
+            audio,
+            temperature=0,
+            max_new_tokens=5,
+            language_detection_segments=language_detection_segments,
+            # The random model is never confident, so all windows are detected.
+            language_detection_threshold=1,
+        )
+        list(segments)
+
+        # The first window is encoded once and the other detection windows are
+        # encoded in a single batch.
+        assert batch_sizes[0] == 1
+        if language_detection_segments > 1:
+            assert batch_sizes[1] == language_detection_segments - 1
+        assert len(batch_sizes) == num_windows + (language_detection_segments > 1)
+
+
+def test_setup_cache():
+    model = WhisperModel("tiny")
+
+    tokenizer = model._get_tokenizer("transcribe", "ko")
+    tokenizer.language = tokenizer.tokenizer.token_to_id("<|en|>")
+    tokenizer.language_code = "en"
+
+    # The cached tokenizer is not changed by the multilingual mode.
+    other = model._get_tokenizer("transcribe", "ko")
+    assert other.language_code == "ko"
+    assert other.non_speech_tokens is tokenizer.non_speech_tokens
+
+    suppress_tokens = [-1]
+    suppressed = model._get_suppressed_tokens(tokenizer, suppress_tokens)
+    assert suppressed == get_suppressed_tokens(tokenizer, [-1])
+    assert model._get_suppressed_tokens(other, [-1]) is suppressed
+    assert suppress_tokens == [-1]
+    assert model._get_suppressed_tokens(tokenizer, []) == []
+
+
+def test_cancellation(jfk_path):
+    model = WhisperModel("tiny")
+    pipeline = BatchedInferencePipeline(model)
+    options = dict(language="en", temperature=0, max_new_tokens=5)
+
+    token = CancellationToken()
+    token.cancel()
+
+    # The VAD runs when transcribe is called.
+    with pytest.raises(TranscriptionCancelled):
+        model.transcribe(jfk_path, vad_filter=True, cancellation_token=token, **options)
+    with pytest.raises(TranscriptionCancelled):
+        pipeline.transcribe(jfk_path, cancellation_token=token, **options)
+
+    for transcriber in (model, pipeline):
+        segments, _ = transcriber.transcribe(
+            jfk_path, vad_filter=False, cancellation_token=token, **options
+        )
+        with pytest.raises(TranscriptionCancelled, match="cancelled"):
+            next(segments)
+
+    segments, _ = model.transcribe(jfk_path, deadline=0, **options)
+    with pytest.raises(TranscriptionCancelled, match="deadline"):
+        next(segments)
+
+
+def test_cancellation_between_fallback_temperatures(jfk_path):
+    model = WhisperModel("tiny")
+    token = CancellationToken()
+    generate_with_temperature = model._generate_with_temperature
+    temperatures = []
+
+    def cancel_after_first_temperature(
+        encoder_output, prompt, temperature, *args, **kwargs
+    ):
+        temperatures.append(temperature)
+        token.cancel()
+        return generate_with_temperature(
+            encoder_output, prompt, temperature, *args, **kwargs
+        )
+
+    model._generate_with_temperature = cancel_after_first_temperature
+    segments, _ = model.transcribe(
+        jfk_path,
+        language="en",
+        max_new_tokens=5,
+        # Every temperature fails the compression ratio check.
+        compression_ratio_threshold=0,
+        cancellation_token=token,
+    )
+
+    with pytest.raises(TranscriptionCancelled):
+        list(segments)
+    assert temperatures == [0.0]
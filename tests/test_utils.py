@@ -1,6 +1,9 @@
 import os
 
+import pytest
+
 from faster_whisper import available_models, download_model
+from faster_whisper.utils import prefetch
 
 
 def test_available_models():
@@ -27,3 +30,34 @@ def test_download_model_in_cache(tmpdir):
     cache_dir = str(tmpdir.join("model"))
     download_model("tiny", cache_dir=cache_dir)
     assert os.path.isdir(cache_dir)
+
+
+def test_prefetch():
+    assert list(prefetch(range(10), depth=2)) == list(range(10))
+
+
+def test_prefetch_error():
+    def items():
+        yield 1
+        raise ValueError("failed")
+
+    iterator = prefetch(items())
+    assert next(iterator) == 1
+    with pytest.raises(ValueError, match="failed"):
+        next(iterator)
+
+
+def test_prefetch_early_stop():
+    produced = []
+
+    def items():
+        for i in range(100):
+            produced.append(i)
+            yield i
+
+    iterator = prefetch(items(), depth=2)
+    assert next(iterator) == 0
+    iterator.close()
+
+    # the producer stops a few items ahead of the consumer
+    assert len(produced) <= 4